@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import base64
 import logging
 import time
 from typing import Any
@@ -16,7 +15,7 @@ logger = logging.getLogger(__name__)
 class AudioStreamer:
     """Streams audio chunks to the home server via MQTT.
 
-    Handles chunking, encoding, quality scoring, and noise filtering
+    Handles chunking, framing, quality scoring, and noise filtering
     before publishing audio data to the MQTT broker.
     """
 
@@ -49,15 +48,11 @@ class AudioStreamer:
         # Compute quality score
         quality = self._noise_filter.compute_audio_quality(filtered)
 
-        # Encode for MQTT transport
-        audio_b64 = base64.b64encode(filtered).decode("ascii")
-
         duration_ms = len(filtered) // (self._sample_rate * 2) * 1000  # 2 bytes per int16 sample
         if duration_ms == 0 and len(filtered) > 0:
             duration_ms = int(len(filtered) / (self._sample_rate * 2) * 1000)
 
         payload = {
-            "audio_b64": audio_b64,
             "sample_rate": self._sample_rate,
             "duration_ms": duration_ms,
             "quality_score": float(quality),
@@ -65,7 +60,8 @@ class AudioStreamer:
             "encoding": "pcm_s16le",
         }
 
-        self._mqtt.publish(self._topic, payload, qos=0)
+        # PCM travels as the binary body of the message, not inside the JSON
+        self._mqtt.publish(self._topic, payload, qos=0, data=filtered)
         self._chunks_sent += 1
 
         return {
@@ -16,6 +16,22 @@ logger = logging.getLogger(__name__)
 
 MessageCallback = Callable[[str, dict[str, Any]], None]
 
+# Byte length of the big-endian header-size prefix on binary messages
+BINARY_HEADER_PREFIX = 4
+
+
+def encode_message(envelope: dict[str, Any], data: bytes | None = None) -> str | bytes:
+    """Serialize an envelope, framing it with a binary body if one is given.
+
+    Binary messages are a 4-byte big-endian length, the JSON envelope,
+    then the raw body, so bulk data such as PCM audio needs no base64.
+    """
+    message = json.dumps(envelope)
+    if data is None:
+        return message
+    header = message.encode("utf-8")
+    return len(header).to_bytes(BINARY_HEADER_PREFIX, "big") + header + data
+
 
 class MqttClient:
     """MQTT client for communication with the Sotto home server.
@@ -33,7 +49,7 @@ class MqttClient:
         )
         self._connected = False
         self._subscriptions: dict[str, list[MessageCallback]] = {}
-        self._offline_buffer: list[tuple[str, dict[str, Any], int]] = []
+        self._offline_buffer: list[tuple[str, dict[str, Any], int, bytes | None]] = []
         self._max_offline_buffer = 1000
 
         # Set up callbacks
@@ -77,13 +93,20 @@ class MqttClient:
         self._connected = False
         logger.info("Disconnected from MQTT broker")
 
-    def publish(self, topic: str, payload: dict[str, Any], qos: int = 0) -> None:
+    def publish(
+        self,
+        topic: str,
+        payload: dict[str, Any],
+        qos: int = 0,
+        data: bytes | None = None,
+    ) -> None:
         """Publish a message with the standard Sotto envelope.
 
         Args:
             topic: MQTT topic to publish to.
             payload: Message payload (will be wrapped in envelope).
             qos: MQTT QoS level (0, 1, or 2).
+            data: Optional binary body sent after the envelope (see encode_message).
         """
         envelope = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -91,17 +114,17 @@ class MqttClient:
             "type": topic.split("/")[-1],
             "payload": payload,
         }
-        message = json.dumps(envelope)
+        message = encode_message(envelope, data)
 
         if self._connected:
             result = self._client.publish(topic, message, qos=qos)
             if result.rc != mqtt.MQTT_ERR_SUCCESS:
                 logger.warning("Publish to %s failed (rc=%d), buffering", topic, result.rc)
-                self._buffer_message(topic, envelope, qos)
+                self._buffer_message(topic, envelope, qos, data)
             else:
                 logger.debug("Published to %s", topic)
         else:
-            self._buffer_message(topic, envelope, qos)
+            self._buffer_message(topic, envelope, qos, data)
 
     def subscribe(self, topic: str, callback: MessageCallback, qos: int = 0) -> None:
         """Subscribe to an MQTT topic with a callback.
@@ -172,12 +195,14 @@ class MqttClient:
                     except Exception as e:
                         logger.error("Callback error on %s: %s", topic, e)
 
-    def _buffer_message(self, topic: str, envelope: dict[str, Any], qos: int) -> None:
+    def _buffer_message(
+        self, topic: str, envelope: dict[str, Any], qos: int, data: bytes | None = None
+    ) -> None:
         """Buffer a message for later delivery."""
         if len(self._offline_buffer) >= self._max_offline_buffer:
             self._offline_buffer.pop(0)  # Drop oldest
             logger.warning("Offline buffer full, dropping oldest message")
-        self._offline_buffer.append((topic, envelope, qos))
+        self._offline_buffer.append((topic, envelope, qos, data))
         logger.debug("Buffered message for %s (buffer_size=%d)", topic, len(self._offline_buffer))
 
     def _flush_offline_buffer(self) -> None:
@@ -187,7 +212,6 @@ class MqttClient:
         count = len(self._offline_buffer)
         buffer = self._offline_buffer.copy()
         self._offline_buffer.clear()
-        for topic, envelope, qos in buffer:
-            message = json.dumps(envelope)
-            self._client.publish(topic, message, qos=qos)
+        for topic, envelope, qos, data in buffer:
+            self._client.publish(topic, encode_message(envelope, data), qos=qos)
         logger.info("Flushed %d buffered messages", count)
@@ -6,7 +6,6 @@ the pipeline: transcription -> agent-brain -> TTS responses.
 
 from __future__ import annotations
 
-import base64
 import json
 import sys
 import time
@@ -17,6 +16,8 @@ import numpy as np
 import paho.mqtt.client as mqtt
 import yaml
 
+from comms.mqtt_client import encode_message
+
 
 def main() -> int:
     config_path = Path(__file__).parent / "config.yaml"
@@ -73,14 +74,12 @@ def main() -> int:
     t = np.linspace(0, duration_s, sample_rate * duration_s, dtype=np.float32)
     # 440 Hz sine wave at moderate volume
     audio = (np.sin(2 * np.pi * 440 * t) * 8000).astype(np.int16)
-    audio_b64 = base64.b64encode(audio.tobytes()).decode("ascii")
 
     envelope = {
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "source": "sotto-e2e-test",
         "type": "raw",
         "payload": {
-            "audio_b64": audio_b64,
             "sample_rate": sample_rate,
             "duration_ms": duration_s * 1000,
             "quality_score": 0.5,
@@ -90,7 +89,7 @@ def main() -> int:
     }
 
     print(f"\nPublishing {duration_s}s test audio to sotto/audio/raw...")
-    client.publish("sotto/audio/raw", json.dumps(envelope), qos=1)
+    client.publish("sotto/audio/raw", encode_message(envelope, audio.tobytes()), qos=1)
 
     # Wait for pipeline responses
     print(f"Waiting 15s for pipeline responses...\n")
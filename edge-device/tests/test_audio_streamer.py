@@ -55,13 +55,14 @@ class TestAudioStreamer:
         streamer.reset_counter()
         assert streamer.chunks_sent == 0
 
-    def test_payload_contains_base64_audio(self, streamer: AudioStreamer, mock_mqtt: MagicMock) -> None:
+    def test_audio_sent_as_binary_body(self, streamer: AudioStreamer, mock_mqtt: MagicMock) -> None:
         audio = np.ones(800, dtype=np.int16).tobytes()
         streamer.stream_chunk(audio)
 
         call_args = mock_mqtt.publish.call_args
         payload = call_args[0][1]
-        assert "audio_b64" in payload
+        assert "audio_b64" not in payload
+        assert len(call_args.kwargs["data"]) == len(audio)
         assert "sample_rate" in payload
         assert payload["sample_rate"] == 16000
         assert payload["encoding"] == "pcm_s16le"
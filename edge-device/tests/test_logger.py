@@ -70,3 +70,9 @@ class TestSetupLogging:
         root.addHandler(logging.StreamHandler())
         setup_logging()
         assert len(root.handlers) == 1
+
+    def test_reuses_formatter_across_calls(self) -> None:
+        setup_logging(json_output=True)
+        first = logging.getLogger().handlers[0].formatter
+        setup_logging(json_output=True)
+        assert logging.getLogger().handlers[0].formatter is first
@@ -7,7 +7,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from comms.mqtt_client import MqttClient
+from comms.mqtt_client import BINARY_HEADER_PREFIX, MqttClient
 from utils.config_loader import MqttConfig, MqttTopics
 
 
@@ -86,6 +86,23 @@ class TestPublish:
         payloads = [item[1]["payload"]["i"] for item in client._offline_buffer]
         assert payloads == [2, 3, 4]
 
+    def test_publish_binary_body(self, client: MqttClient) -> None:
+        client.publish("sotto/audio/raw", {"duration_ms": 500}, data=b"\x01\x02\x03")
+
+        message = client._client.publish.call_args[0][1]
+        header_len = int.from_bytes(message[:BINARY_HEADER_PREFIX], "big")
+        header = json.loads(message[BINARY_HEADER_PREFIX:BINARY_HEADER_PREFIX + header_len])
+        assert header["payload"] == {"duration_ms": 500}
+        assert message[BINARY_HEADER_PREFIX + header_len:] == b"\x01\x02\x03"
+
+    def test_binary_body_survives_offline_buffer(self, client: MqttClient) -> None:
+        client._connected = False
+        client.publish("sotto/audio/raw", {"duration_ms": 500}, data=b"\x01\x02")
+        client._flush_offline_buffer()
+
+        message = client._client.publish.call_args[0][1]
+        assert message.endswith(b"\x01\x02")
+
 
 class TestSubscribe:
     def test_subscribe_stores_callback(self, client: MqttClient) -> None:
@@ -138,7 +155,7 @@ class TestConnectionEvents:
 
     def test_on_connect_flushes_buffer(self, client: MqttClient) -> None:
         client._connected = False
-        client._offline_buffer.append(("sotto/test", {"data": "buffered"}, 0))
+        client._offline_buffer.append(("sotto/test", {"data": "buffered"}, 0, None))
         client._on_connect(client._client, None, None, 0)
         assert len(client._offline_buffer) == 0
 
@@ -150,8 +167,8 @@ class TestConnectionEvents:
 class TestOfflineBuffer:
     def test_flush_publishes_all_buffered(self, client: MqttClient) -> None:
         client._offline_buffer = [
-            ("sotto/a", {"msg": 1}, 0),
-            ("sotto/b", {"msg": 2}, 1),
+            ("sotto/a", {"msg": 1}, 0, None),
+            ("sotto/b", {"msg": 2}, 1, b"\x00\x01"),
         ]
         client._flush_offline_buffer()
         assert client._client.publish.call_count == 2
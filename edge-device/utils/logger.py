@@ -25,6 +25,10 @@ class JsonFormatter(logging.Formatter):
         return json.dumps(log_entry)
 
 
+_JSON_FMT = JsonFormatter()
+_PLAIN_FMT = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+
 def setup_logging(level: str = "INFO", json_output: bool = True) -> None:
     """Configure the root logger for the Sotto edge device.
 
@@ -38,11 +42,7 @@ def setup_logging(level: str = "INFO", json_output: bool = True) -> None:
     # Remove existing handlers
     root_logger.handlers.clear()
 
+    # Formatters are stateless and shared; only the handler binds to stdout
     handler = logging.StreamHandler(sys.stdout)
-    if json_output:
-        handler.setFormatter(JsonFormatter())
-    else:
-        handler.setFormatter(
-            logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
-        )
+    handler.setFormatter(_JSON_FMT if json_output else _PLAIN_FMT)
     root_logger.addHandler(handler)
@@ -0,0 +1,339 @@
+"""Combined classification and task extraction in a single LLM call."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import string
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import orjson
+
+from classifier import (
+    CLASSIFICATION_SCHEMA,
+    ClassificationResult,
+    classification_from_dict,
+    is_filler,
+)
+from llm_client import OllamaClient, strip_code_fence
+from task_extractor import TASK_EXTRACTION_SCHEMA, ExtractionResult, extraction_from_dict
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+
+_ANALYSIS_RULES = """Classification rules:
+- PUBLIC: Work conversations, family logistics, tasks, appointments, meals, travel planning,
+  general interests, media discussions, health/fitness, home management, shopping, errands.
+- PRIVATE: Adult content, intimate conversations, personal preferences the user would not
+  want spoken aloud, anything explicitly asked to keep private.
+
+When in doubt, classify as PRIVATE. User privacy is always the priority.
+
+For each task found, extract:
+- description: What needs to be done
+- people: Names of people involved (list)
+- due_date: Any mentioned deadline (ISO format or null)
+- source_quote: The relevant part of the conversation
+- urgency: low, medium, or high
+
+Also extract any incomplete information that needs follow-up:
+- incomplete_items: Things mentioned but missing details"""
+
+_ANALYSIS_OBJECT = """{
+  "classification": {
+    "classification": "PUBLIC" or "PRIVATE",
+    "confidence": 0.0-1.0,
+    "reason": "brief reason"
+  },
+  "tasks": [
+    {
+      "description": "...",
+      "people": ["..."],
+      "due_date": null or "YYYY-MM-DD",
+      "source_quote": "...",
+      "urgency": "low|medium|high"
+    }
+  ],
+  "incomplete_items": [
+    {
+      "description": "...",
+      "missing": "what information is missing"
+    }
+  ]
+}"""
+
+ANALYSIS_SYSTEM_PROMPT = f"""You are the analysis system for an ambient AI assistant.
+For each piece of transcribed audio you must classify the content AND extract actionable tasks.
+
+{_ANALYSIS_RULES}
+
+Respond with ONLY a JSON object:
+{_ANALYSIS_OBJECT}
+
+If no tasks are found, use empty lists for "tasks" and "incomplete_items"."""
+
+BATCH_ANALYSIS_SYSTEM_PROMPT = f"""You are the analysis system for an ambient AI assistant.
+You will receive several numbered transcriptions of audio. Analyze each one independently:
+classify its content AND extract its actionable tasks.
+
+{_ANALYSIS_RULES}
+
+Respond with ONLY a JSON object of the form {{"items": [...]}} holding exactly one entry
+per numbered transcription, in the same order. Each entry is an object like:
+{_ANALYSIS_OBJECT}
+
+If a transcription has no tasks, use empty lists for its "tasks" and "incomplete_items"."""
+
+ANALYSIS_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "classification": CLASSIFICATION_SCHEMA,
+        **TASK_EXTRACTION_SCHEMA["properties"],
+    },
+    "required": ["classification", "tasks", "incomplete_items"],
+}
+
+BATCH_ANALYSIS_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {"items": {"type": "array", "items": ANALYSIS_SCHEMA}},
+    "required": ["items"],
+}
+
+# Upper bound on transcriptions folded into one generation
+MAX_BATCH_SIZE = 8
+
+
+@dataclass(slots=True)
+class AnalysisResult:
+    """Classification and extracted tasks for one piece of content."""
+
+    classification: ClassificationResult
+    extraction: ExtractionResult
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, drop ASCII punctuation and collapse whitespace."""
+    return " ".join(text.translate(_PUNCTUATION_TABLE).lower().split())
+
+
+class AnalysisCache:
+    """Bounded LRU cache of analysis results keyed on normalized text.
+
+    Ambient audio repeats short phrases constantly; serving those from
+    memory skips a multi-second LLM round-trip.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, AnalysisResult] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str) -> str:
+        """Hash of the normalized text."""
+        return hashlib.sha1(_normalize(text).encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> AnalysisResult | None:
+        key = self.key(text)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def put(self, text: str, result: AnalysisResult) -> None:
+        key = self.key(text)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CombinedAnalyzer:
+    """Classifies content and extracts tasks with one LLM generation.
+
+    Sharing a single prompt halves prefill work and network round-trips
+    compared to running ContentClassifier and TaskExtractor separately.
+    """
+
+    def __init__(self, llm_client: OllamaClient, cache: AnalysisCache | None = None) -> None:
+        self._llm = llm_client
+        self._cache = cache
+
+    def analyze(self, text: str) -> AnalysisResult:
+        """Classify text and extract tasks from it.
+
+        Args:
+            text: The transcribed text to analyze.
+
+        Returns:
+            AnalysisResult with classification and extraction.
+        """
+        shortcut = self._shortcut(text)
+        if shortcut is not None:
+            return shortcut
+
+        try:
+            response = self._llm.generate(
+                prompt=text,
+                system=ANALYSIS_SYSTEM_PROMPT,
+                temperature=0.1,
+                format=ANALYSIS_SCHEMA,
+            )
+        except (ConnectionError, RuntimeError) as e:
+            logger.error("Analysis failed, defaulting to PRIVATE: %s", e)
+            return _failed_result(e)
+
+        result = self._parse_response(response.text)
+        if result is None:
+            # Not cached, so a repeat of this text gets another attempt
+            return AnalysisResult(
+                classification=ClassificationResult(
+                    "PRIVATE", 0.3, "Parse failed, defaulting to private"
+                ),
+                extraction=ExtractionResult(tasks=[], incomplete_items=[]),
+            )
+
+        if self._cache is not None:
+            self._cache.put(text, result)
+        return result
+
+    def analyze_batch(self, texts: list[str]) -> list[AnalysisResult]:
+        """Analyze several transcriptions, sharing one LLM call where possible.
+
+        Empty, filler and cached texts are resolved locally; the rest go to
+        the model together as a numbered list. If the batched response can't
+        be matched back to its inputs, each text is retried on its own.
+
+        Args:
+            texts: Transcribed texts, typically a burst from the queue.
+
+        Returns:
+            One AnalysisResult per input text, in the same order.
+        """
+        results: list[AnalysisResult | None] = [self._shortcut(text) for text in texts]
+        pending = [i for i, result in enumerate(results) if result is None]
+
+        if len(pending) == 1:
+            results[pending[0]] = self.analyze(texts[pending[0]])
+        elif pending:
+            prompt = "\n".join(f"{n}. {texts[i]}" for n, i in enumerate(pending, 1))
+            try:
+                response = self._llm.generate(
+                    prompt=prompt,
+                    system=BATCH_ANALYSIS_SYSTEM_PROMPT,
+                    temperature=0.1,
+                    format=BATCH_ANALYSIS_SCHEMA,
+                )
+            except (ConnectionError, RuntimeError) as e:
+                logger.error("Batch analysis failed, defaulting to PRIVATE: %s", e)
+                for i in pending:
+                    results[i] = _failed_result(e)
+                return results  # type: ignore[return-value]
+
+            parsed = self._parse_batch_response(response.text, len(pending))
+            if parsed is None:
+                logger.warning("Batch response unusable, analyzing %d items singly", len(pending))
+                for i in pending:
+                    results[i] = self.analyze(texts[i])
+            else:
+                for i, result in zip(pending, parsed):
+                    results[i] = result
+                    if self._cache is not None:
+                        self._cache.put(texts[i], result)
+
+        return results  # type: ignore[return-value]
+
+    def _shortcut(self, text: str) -> AnalysisResult | None:
+        """Resolve text without the LLM when it is empty, filler or cached."""
+        if not text.strip():
+            return AnalysisResult(
+                classification=ClassificationResult(
+                    classification="PUBLIC",
+                    confidence=1.0,
+                    reason="Empty content",
+                ),
+                extraction=ExtractionResult(tasks=[], incomplete_items=[]),
+            )
+
+        if is_filler(text):
+            return AnalysisResult(
+                classification=ClassificationResult(
+                    classification="PUBLIC",
+                    confidence=0.95,
+                    reason="Filler/short",
+                ),
+                extraction=ExtractionResult(tasks=[], incomplete_items=[]),
+            )
+
+        if self._cache is not None:
+            return self._cache.get(text)
+        return None
+
+    def _parse_response(self, response_text: str) -> AnalysisResult | None:
+        """Parse the LLM's combined response into both result types.
+
+        Returns None if the response is not usable JSON.
+        """
+        try:
+            text = strip_code_fence(response_text)
+
+            data = orjson.loads(text)
+            return _result_from_dict(data)
+
+        except (orjson.JSONDecodeError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning("Failed to parse analysis response: %s", e)
+            return None
+
+    def _parse_batch_response(
+        self, response_text: str, expected: int
+    ) -> list[AnalysisResult] | None:
+        """Parse a batched response into one result per input.
+
+        Returns None if the response is not usable JSON or the item count
+        doesn't match, since results can't then be attributed safely.
+        """
+        try:
+            text = strip_code_fence(response_text)
+
+            items = orjson.loads(text)["items"]
+            if len(items) != expected:
+                logger.warning("Batch response has %d items, expected %d", len(items), expected)
+                return None
+            return [_result_from_dict(item) for item in items]
+
+        except (orjson.JSONDecodeError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning("Failed to parse batch analysis response: %s", e)
+            return None
+
+
+def _result_from_dict(data: dict[str, Any]) -> AnalysisResult:
+    """Build an AnalysisResult from one parsed analysis object."""
+    classification_data: Any = data.get("classification", {})
+    if isinstance(classification_data, str):
+        classification_data = {"classification": classification_data}
+
+    return AnalysisResult(
+        classification=classification_from_dict(classification_data),
+        extraction=extraction_from_dict(data),
+    )
+
+
+def _failed_result(error: Exception) -> AnalysisResult:
+    """PRIVATE result used when the LLM could not be reached."""
+    return AnalysisResult(
+        classification=ClassificationResult(
+            classification="PRIVATE",
+            confidence=0.0,
+            reason=f"Analysis failed: {error}",
+        ),
+        extraction=ExtractionResult(tasks=[], incomplete_items=[]),
+    )
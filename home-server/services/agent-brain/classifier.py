@@ -2,15 +2,27 @@
 
 from __future__ import annotations
 
-import json
 import logging
+import re
 from dataclasses import dataclass
 from typing import Any
 
-from llm_client import OllamaClient
+import orjson
+
+from llm_client import OllamaClient, strip_code_fence
 
 logger = logging.getLogger(__name__)
 
+# Short acknowledgements and hesitations that never need an LLM round-trip
+_FILLER_RE = re.compile(
+    r"^[\s,.?!]*(?:(?:uh+|um+|ok(?:ay)?|yeah|hmm+|mhm+|thanks?|bye)[\s,.?!]*)+$",
+    re.IGNORECASE,
+)
+
+# Label keywords for responses that aren't valid JSON
+_PUBLIC_RE = re.compile(r"\bPUBLIC\b", re.IGNORECASE)
+_PRIVATE_RE = re.compile(r"\bPRIVATE\b", re.IGNORECASE)
+
 CLASSIFICATION_SYSTEM_PROMPT = """You are a content classifier for an ambient AI assistant.
 Your job is to classify transcribed audio content as PUBLIC or PRIVATE.
 
@@ -25,8 +37,19 @@ When in doubt, classify as PRIVATE. User privacy is always the priority.
 Respond with ONLY a JSON object:
 {"classification": "PUBLIC" or "PRIVATE", "confidence": 0.0-1.0, "reason": "brief reason"}"""
 
+# JSON schema for Ollama's structured output, mirroring ClassificationResult
+CLASSIFICATION_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "classification": {"type": "string", "enum": ["PUBLIC", "PRIVATE"]},
+        "confidence": {"type": "number"},
+        "reason": {"type": "string"},
+    },
+    "required": ["classification", "confidence", "reason"],
+}
 
-@dataclass
+
+@dataclass(slots=True)
 class ClassificationResult:
     """Result of content classification."""
 
@@ -35,6 +58,25 @@ class ClassificationResult:
     reason: str
 
 
+def classification_from_dict(data: dict[str, Any]) -> ClassificationResult:
+    """Build a ClassificationResult from a decoded LLM JSON object."""
+    classification = data.get("classification", "PRIVATE").upper()
+
+    if classification not in ("PUBLIC", "PRIVATE"):
+        classification = "PRIVATE"
+
+    return ClassificationResult(
+        classification=classification,
+        confidence=float(data.get("confidence", 0.5)),
+        reason=data.get("reason", ""),
+    )
+
+
+def is_filler(text: str) -> bool:
+    """Return True for one- or two-word filler such as "uh", "ok thanks"."""
+    return len(text.split()) < 3 and _FILLER_RE.match(text) is not None
+
+
 class ContentClassifier:
     """Classifies content as public or private using the LLM."""
 
@@ -57,11 +99,19 @@ class ContentClassifier:
                 reason="Empty content",
             )
 
+        if is_filler(text):
+            return ClassificationResult(
+                classification="PUBLIC",
+                confidence=0.95,
+                reason="Filler/short",
+            )
+
         try:
             response = self._llm.generate(
-                prompt=f"Classify this transcribed audio content:\n\n{text}",
+                prompt=text,
                 system=CLASSIFICATION_SYSTEM_PROMPT,
                 temperature=0.1,
+                format=CLASSIFICATION_SCHEMA,
             )
 
             return self._parse_response(response.text)
@@ -77,30 +127,14 @@ class ContentClassifier:
     def _parse_response(self, response_text: str) -> ClassificationResult:
         """Parse the LLM's classification response."""
         try:
-            # Try to extract JSON from the response
-            text = response_text.strip()
             # Handle cases where LLM wraps in markdown code blocks
-            if "```" in text:
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-                text = text.strip()
+            text = strip_code_fence(response_text)
 
-            data = json.loads(text)
-            classification = data.get("classification", "PRIVATE").upper()
-
-            if classification not in ("PUBLIC", "PRIVATE"):
-                classification = "PRIVATE"
-
-            return ClassificationResult(
-                classification=classification,
-                confidence=float(data.get("confidence", 0.5)),
-                reason=data.get("reason", ""),
-            )
-        except (json.JSONDecodeError, ValueError, KeyError) as e:
+            data = orjson.loads(text)
+            return classification_from_dict(data)
+        except (orjson.JSONDecodeError, ValueError, KeyError) as e:
             logger.warning("Failed to parse classification response: %s", e)
             # If we can't parse, check for keywords
-            upper = response_text.upper()
-            if "PUBLIC" in upper and "PRIVATE" not in upper:
+            if _PUBLIC_RE.search(response_text) and not _PRIVATE_RE.search(response_text):
                 return ClassificationResult("PUBLIC", 0.5, "Keyword match")
             return ClassificationResult("PRIVATE", 0.3, "Parse failed, defaulting to private")
@@ -5,12 +5,32 @@ from __future__ import annotations
 import json
 import logging
 import time
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
 
+def _parse_hhmm(value: str) -> int:
+    """Parse an "HH:MM" string into minutes since midnight."""
+    hour, minute = value.split(":")
+    return int(hour) * 60 + int(minute)
+
+
+def _minute_of_day(current_time: datetime) -> int:
+    """Minutes since midnight for a datetime."""
+    return current_time.hour * 60 + current_time.minute
+
+
+def _next_occurrence(after: datetime, minute_of_day: int) -> datetime:
+    """Return the first time strictly after `after` at the given minute of the day."""
+    hour, minute = divmod(minute_of_day, 60)
+    target = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= after:
+        target += timedelta(days=1)
+    return target
+
+
 class HeartbeatScheduler:
     """Manages scheduled heartbeat notifications.
 
@@ -32,31 +52,55 @@ class HeartbeatScheduler:
         self._work_end = work_end
         self._last_work_heartbeat: float = 0
 
+        # Minutes since midnight, parsed once so each tick is an integer compare
+        self._morning_briefing_min = _parse_hhmm(morning_briefing)
+        self._evening_summary_min = _parse_hhmm(evening_summary)
+        self._work_start_min = _parse_hhmm(work_start)
+        self._work_end_min = _parse_hhmm(work_end)
+
+        # Day each fixed-time heartbeat last fired. One already past when the
+        # scheduler starts counts as done, so a restart doesn't replay it.
+        started = datetime.now(timezone.utc)
+        self._morning_fired_on = self._fired_by_start(started, self._morning_briefing_min)
+        self._evening_fired_on = self._fired_by_start(started, self._evening_summary_min)
+
+    @staticmethod
+    def _fired_by_start(started: datetime, minute_of_day: int) -> date | None:
+        return started.date() if _minute_of_day(started) >= minute_of_day else None
+
     def should_fire_morning_briefing(self, current_time: datetime | None = None) -> bool:
-        """Check if it's time for the morning briefing."""
+        """Check if the morning briefing is due and hasn't fired today.
+
+        Due from its minute onwards, so a late check still delivers it.
+        """
         if current_time is None:
             current_time = datetime.now(timezone.utc)
 
-        time_str = current_time.strftime("%H:%M")
-        return time_str == self._morning_briefing
+        return (
+            _minute_of_day(current_time) >= self._morning_briefing_min
+            and self._morning_fired_on != current_time.date()
+        )
 
     def should_fire_evening_summary(self, current_time: datetime | None = None) -> bool:
-        """Check if it's time for the evening summary."""
+        """Check if the evening summary is due and hasn't fired today.
+
+        Due from its minute onwards, so a late check still delivers it.
+        """
         if current_time is None:
             current_time = datetime.now(timezone.utc)
 
-        time_str = current_time.strftime("%H:%M")
-        return time_str == self._evening_summary
+        return (
+            _minute_of_day(current_time) >= self._evening_summary_min
+            and self._evening_fired_on != current_time.date()
+        )
 
     def should_fire_work_heartbeat(self, current_time: datetime | None = None) -> bool:
         """Check if it's time for a work-hours heartbeat."""
         if current_time is None:
             current_time = datetime.now(timezone.utc)
 
-        time_str = current_time.strftime("%H:%M")
-
         # Check if within work hours
-        if not (self._work_start <= time_str <= self._work_end):
+        if not (self._work_start_min <= _minute_of_day(current_time) <= self._work_end_min):
             return False
 
         # Check if enough time has passed since last heartbeat
@@ -78,14 +122,47 @@ class HeartbeatScheduler:
         Returns:
             Heartbeat type string, or None if no heartbeat should fire.
         """
+        if current_time is None:
+            current_time = datetime.now(timezone.utc)
+
+        # Fixed-time heartbeats fire once per day, however late the check
         if self.should_fire_morning_briefing(current_time):
+            self._morning_fired_on = current_time.date()
             return "morning_briefing"
         if self.should_fire_evening_summary(current_time):
+            self._evening_fired_on = current_time.date()
             return "evening_summary"
         if self.should_fire_work_heartbeat(current_time):
             return "work_interval"
         return None
 
+    def seconds_until_next_fire(self, current_time: datetime | None = None) -> float:
+        """Seconds until the earliest moment any heartbeat could fire.
+
+        Lets the caller sleep until the next boundary instead of polling.
+        """
+        if current_time is None:
+            current_time = datetime.now(timezone.utc)
+
+        if self.should_fire_morning_briefing(current_time) or self.should_fire_evening_summary(current_time):
+            return 0.0
+
+        candidates = [
+            _next_occurrence(current_time, self._morning_briefing_min),
+            _next_occurrence(current_time, self._evening_summary_min),
+        ]
+
+        work_due_ts = max(
+            current_time.timestamp(),
+            self._last_work_heartbeat + self._work_interval_minutes * 60,
+        )
+        work_due = datetime.fromtimestamp(work_due_ts, tz=current_time.tzinfo)
+        if not (self._work_start_min <= _minute_of_day(work_due) <= self._work_end_min):
+            work_due = _next_occurrence(work_due, self._work_start_min)
+        candidates.append(work_due)
+
+        return max(0.0, (min(candidates) - current_time).total_seconds())
+
     def build_morning_briefing(
         self,
         calendar_events: list[str],
@@ -2,17 +2,34 @@
 
 from __future__ import annotations
 
-import json
 import logging
+import re
 from dataclasses import dataclass
 from typing import Any
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
 
-@dataclass
+# Markdown code fence around model output, with or without a closing fence
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+
+# Shared per-temperature options dicts; call sites use a handful of fixed values
+_OPTIONS_CACHE: dict[float, dict[str, float]] = {}
+
+
+def _options(temperature: float) -> dict[str, float]:
+    options = _OPTIONS_CACHE.get(temperature)
+    if options is None:
+        options = _OPTIONS_CACHE.setdefault(temperature, {"temperature": temperature})
+    return options
+
+
+@dataclass(slots=True)
 class LLMResponse:
     """Response from the LLM."""
 
@@ -22,6 +39,15 @@ class LLMResponse:
     done: bool
 
 
+def strip_code_fence(text: str) -> str:
+    """Return model output with any surrounding markdown code fence removed."""
+    text = text.strip()
+    if "```" not in text:
+        return text
+    match = _FENCE_RE.search(text)
+    return match.group(1).strip() if match else text
+
+
 class OllamaClient:
     """Client for the Ollama local LLM API."""
 
@@ -34,6 +60,14 @@ class OllamaClient:
         self._base_url = base_url.rstrip("/")
         self._model = model
         self._timeout = timeout
+        self._url_generate = f"{self._base_url}/api/generate"
+        self._url_chat = f"{self._base_url}/api/chat"
+
+        # Reuse pooled keep-alive connections instead of a new socket per call
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
 
     @property
     def model(self) -> str:
@@ -42,18 +76,25 @@ class OllamaClient:
     def check_health(self) -> bool:
         """Check if Ollama is reachable."""
         try:
-            resp = requests.get(f"{self._base_url}/api/tags", timeout=5)
+            resp = self._session.get(f"{self._base_url}/api/tags", timeout=5)
             return resp.status_code == 200
         except requests.RequestException:
             return False
 
-    def generate(self, prompt: str, system: str = "", temperature: float = 0.7) -> LLMResponse:
+    def generate(
+        self,
+        prompt: str,
+        system: str = "",
+        temperature: float = 0.7,
+        format: dict[str, Any] | None = None,
+    ) -> LLMResponse:
         """Generate a response from the LLM.
 
         Args:
             prompt: The user/context prompt.
             system: Optional system prompt.
             temperature: Sampling temperature.
+            format: Optional JSON schema the output is constrained to.
 
         Returns:
             LLMResponse with the generated text.
@@ -62,25 +103,25 @@ class OllamaClient:
             ConnectionError: If Ollama is unreachable.
             RuntimeError: If generation fails.
         """
-        payload = {
-            "model": self._model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": temperature,
-            },
-        }
+        # Keep the system prompt ahead of the varying user text so Ollama can
+        # reuse the cached KV prefix across requests
+        payload: dict[str, Any] = {"model": self._model, "stream": False}
         if system:
             payload["system"] = system
+        payload["prompt"] = prompt
+        payload["options"] = _options(temperature)
+        if format is not None:
+            payload["format"] = format
 
         try:
-            resp = requests.post(
-                f"{self._base_url}/api/generate",
-                json=payload,
+            resp = self._session.post(
+                self._url_generate,
+                data=orjson.dumps(payload),
+                headers=_JSON_HEADERS,
                 timeout=self._timeout,
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = orjson.loads(resp.content)
 
             return LLMResponse(
                 text=data.get("response", ""),
@@ -107,21 +148,20 @@ class OllamaClient:
         """
         payload = {
             "model": self._model,
-            "messages": messages,
             "stream": False,
-            "options": {
-                "temperature": temperature,
-            },
+            "messages": messages,
+            "options": _options(temperature),
         }
 
         try:
-            resp = requests.post(
-                f"{self._base_url}/api/chat",
-                json=payload,
+            resp = self._session.post(
+                self._url_chat,
+                data=orjson.dumps(payload),
+                headers=_JSON_HEADERS,
                 timeout=self._timeout,
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = orjson.loads(resp.content)
 
             message = data.get("message", {})
             return LLMResponse(
@@ -134,3 +174,7 @@ class OllamaClient:
             raise ConnectionError(f"Cannot reach Ollama: {e}") from e
         except requests.HTTPError as e:
             raise RuntimeError(f"Ollama chat failed: {e}") from e
+
+    def close(self) -> None:
+        """Close pooled HTTP connections."""
+        self._session.close()
@@ -2,25 +2,33 @@
 
 from __future__ import annotations
 
-import json
 import logging
 import os
+import queue
 import signal
 import sys
+import threading
 import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
+import orjson
 import paho.mqtt.client as mqtt
 
-from classifier import ContentClassifier
+from analyzer import MAX_BATCH_SIZE, AnalysisCache, AnalysisResult, CombinedAnalyzer
 from heartbeat import HeartbeatScheduler
 from llm_client import OllamaClient
-from task_extractor import TaskExtractor
 
 logger = logging.getLogger(__name__)
 
+TOPIC_TRANSCRIPTION = "sotto/audio/transcription"
+TOPIC_DEVICE_STATE = "sotto/device/state"
+TOPIC_COMMANDS = "sotto/agent/commands"
+
+# How long to wait for more transcriptions before analyzing a burst
+BATCH_WINDOW_SECONDS = 0.1
+
 # Add sibling service paths (for local dev; in Docker these are in /app/ already)
 _services_dir = Path(__file__).parent.parent
 for _subdir in ("operational-db", "vault-manager"):
@@ -58,8 +66,8 @@ class AgentBrain:
 
         # LLM
         self._llm = OllamaClient(base_url=ollama_url, model=ollama_model)
-        self._classifier = ContentClassifier(self._llm)
-        self._task_extractor = TaskExtractor(self._llm)
+        self._analysis_cache = AnalysisCache()
+        self._analyzer = CombinedAnalyzer(self._llm, cache=self._analysis_cache)
 
         # Storage
         self._db = DatabaseClient(db_path)
@@ -68,7 +76,24 @@ class AgentBrain:
         # Heartbeat
         self._heartbeat = HeartbeatScheduler()
 
-        self._running = False
+        self._stop_event = threading.Event()
+
+        # Outbound TTS messages are published from a worker thread so the
+        # heartbeat loop and MQTT callbacks never wait on serialization or I/O
+        self._outbox: queue.Queue[tuple[str, int, datetime] | None] = queue.Queue()
+        self._outbox_thread: threading.Thread | None = None
+
+        # Transcriptions are analyzed on a worker thread; ones that arrive
+        # within a short window of each other share a single LLM call
+        self._transcriptions: queue.Queue[tuple[str, float] | None] = queue.Queue()
+        self._transcription_thread: threading.Thread | None = None
+
+        # Inbound topic -> handler, subscribed in _on_connect
+        self._handlers: dict[str, Callable[[dict[str, Any]], None]] = {
+            TOPIC_TRANSCRIPTION: self._process_transcription,
+            TOPIC_DEVICE_STATE: self._process_device_state,
+            TOPIC_COMMANDS: self._process_command,
+        }
 
     def start(self) -> None:
         """Start the agent brain service."""
@@ -87,47 +112,61 @@ class AgentBrain:
         self._client.connect(self._mqtt_host, self._mqtt_port)
         self._client.loop_start()
 
-        self._running = True
+        self._outbox_thread = threading.Thread(
+            target=self._publish_worker, name="mqtt-outbox", daemon=True
+        )
+        self._outbox_thread.start()
+
+        self._transcription_thread = threading.Thread(
+            target=self._transcription_worker, name="transcription-worker", daemon=True
+        )
+        self._transcription_thread.start()
+
+        self._stop_event.clear()
 
-        # Main loop for heartbeat checking
-        while self._running:
+        # Main loop: sleep until the next heartbeat boundary; stop() wakes it
+        while not self._stop_event.is_set():
             try:
                 self._check_heartbeat()
-                time.sleep(30)  # Check every 30 seconds
+                delay = self._heartbeat.seconds_until_next_fire()
             except Exception as e:
                 logger.error("Heartbeat check error: %s", e)
-                time.sleep(60)
+                delay = 60
+            self._stop_event.wait(timeout=delay)
 
     def stop(self) -> None:
         """Stop the agent brain service."""
-        self._running = False
+        self._stop_event.set()
+        if self._transcription_thread is not None:
+            self._transcriptions.put(None)
+            self._transcription_thread.join(timeout=30)
+        if self._outbox_thread is not None:
+            # Drain queued messages before the connection goes away
+            self._outbox.put(None)
+            self._outbox_thread.join(timeout=5)
         self._client.loop_stop()
         self._client.disconnect()
+        self._llm.close()
         self._db.close()
         logger.info("Agent Brain stopped")
 
     def _on_connect(self, client: Any, userdata: Any, flags: Any, rc: Any, properties: Any = None) -> None:
         logger.info("Agent Brain connected to MQTT")
-        self._client.subscribe("sotto/audio/transcription", qos=1)
-        self._client.subscribe("sotto/device/state", qos=0)
-        self._client.subscribe("sotto/agent/commands", qos=1)
+        self._client.subscribe(
+            [(TOPIC_TRANSCRIPTION, 1), (TOPIC_DEVICE_STATE, 0), (TOPIC_COMMANDS, 1)]
+        )
 
     def _on_message(self, client: Any, userdata: Any, message: mqtt.MQTTMessage) -> None:
+        handler = self._handlers.get(message.topic)
+        if handler is None:
+            return
         try:
-            data = json.loads(message.payload.decode("utf-8"))
-
-            if message.topic == "sotto/audio/transcription":
-                self._process_transcription(data)
-            elif message.topic == "sotto/device/state":
-                self._process_device_state(data)
-            elif message.topic == "sotto/agent/commands":
-                self._process_command(data)
-
+            handler(orjson.loads(message.payload))
         except Exception as e:
             logger.error("Error processing message on %s: %s", message.topic, e)
 
     def _process_transcription(self, data: dict[str, Any]) -> None:
-        """Process a transcription from the STT service."""
+        """Queue a transcription from the STT service for analysis."""
         payload = data.get("payload", {})
         text = payload.get("text", "").strip()
         confidence = payload.get("confidence", 0)
@@ -135,26 +174,83 @@ class AgentBrain:
         if not text:
             return
 
+        self._transcriptions.put_nowait((text, confidence))
+
+    def _transcription_worker(self) -> None:
+        """Analyze queued transcriptions in bursts until a None sentinel is received."""
+        while True:
+            item = self._transcriptions.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+
+            # Collect whatever else arrives shortly after the first item
+            deadline = time.monotonic() + BATCH_WINDOW_SECONDS
+            while len(batch) < MAX_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._transcriptions.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                analyses = self._analyzer.analyze_batch([text for text, _ in batch])
+                for (text, confidence), analysis in zip(batch, analyses):
+                    self._handle_analysis(text, confidence, analysis)
+            except Exception as e:
+                logger.error("Error processing %d transcription(s): %s", len(batch), e)
+
+            if stopping:
+                return
+
+    def _handle_analysis(self, text: str, confidence: float, analysis: AnalysisResult) -> None:
+        """Store tasks and notes for one analyzed transcription."""
         logger.info("Processing transcription: %s", text[:100])
 
-        # Classify content
-        classification = self._classifier.classify(text)
+        classification = analysis.classification
+        extraction = analysis.extraction
         is_private = classification.classification == "PRIVATE"
 
-        # Extract tasks
-        extraction = self._task_extractor.extract(text)
+        now = datetime.now(timezone.utc)
+        date_str = now.strftime("%Y-%m-%d")
+        time_range = f"{now.strftime('%H:%M')}"
 
-        # Create tasks in DB and vault
-        for task in extraction.tasks:
-            task_id = self._db.create_task(
-                description=task.description,
-                source="conversation",
-                context=task.source_quote,
-                due_at=task.due_date,
-                is_private=is_private,
+        # All database writes for this transcription commit together
+        with self._db.transaction():
+            task_ids = self._db.create_tasks(
+                {
+                    "description": task.description,
+                    "source": "conversation",
+                    "context": task.source_quote,
+                    "due_at": task.due_date,
+                    "is_private": is_private,
+                }
+                for task in extraction.tasks
             )
 
-            # Create vault note
+            # Log processing
+            self._db.log_processing(
+                audio_quality=None,
+                transcription_confidence=confidence,
+                action_taken="task_created" if extraction.tasks else "note_updated",
+                notes=f"Classification: {classification.classification}, Tasks: {len(extraction.tasks)}",
+            )
+
+            # Update daily metrics
+            self._db.update_daily_metrics(
+                date=date_str,
+                tasks_created=len(extraction.tasks),
+            )
+
+        # Vault notes are written after the commit, outside the write lock
+        for task_id, task in zip(task_ids, extraction.tasks):
             self._vault.create_task_note(
                 task_id=task_id,
                 title=task.description,
@@ -163,6 +259,7 @@ class AgentBrain:
                 due_date=task.due_date,
                 people=task.people,
                 is_private=is_private,
+                now=now,
             )
 
             # Create people notes
@@ -172,10 +269,6 @@ class AgentBrain:
             logger.info("Task created: %s (private=%s)", task.description[:50], is_private)
 
         # Update daily note with time block
-        now = datetime.now(timezone.utc)
-        date_str = now.strftime("%Y-%m-%d")
-        time_range = f"{now.strftime('%H:%M')}"
-
         summary = text[:200] if len(text) > 200 else text
         task_mentions = ""
         if extraction.tasks:
@@ -188,20 +281,6 @@ class AgentBrain:
         if not is_private:
             self._vault.append_time_block(date_str, time_range, block_content)
 
-        # Log processing
-        self._db.log_processing(
-            audio_quality=None,
-            transcription_confidence=confidence,
-            action_taken="task_created" if extraction.tasks else "note_updated",
-            notes=f"Classification: {classification.classification}, Tasks: {len(extraction.tasks)}",
-        )
-
-        # Update daily metrics
-        self._db.update_daily_metrics(
-            date=date_str,
-            tasks_created=len(extraction.tasks),
-        )
-
     def _process_device_state(self, data: dict[str, Any]) -> None:
         """Process device state update."""
         payload = data.get("payload", data)
@@ -238,14 +317,14 @@ class AgentBrain:
         logger.info("Heartbeat firing: %s", heartbeat_type)
 
         if heartbeat_type == "morning_briefing":
-            self._fire_morning_briefing()
+            self._fire_morning_briefing(now)
         elif heartbeat_type == "evening_summary":
-            self._fire_evening_summary()
+            self._fire_evening_summary(now)
         elif heartbeat_type == "work_interval":
-            self._fire_work_heartbeat()
+            self._fire_work_heartbeat(now)
             self._heartbeat.mark_work_heartbeat_fired()
 
-    def _fire_morning_briefing(self) -> None:
+    def _fire_morning_briefing(self, now: datetime) -> None:
         """Generate and send morning briefing."""
         pending = self._db.get_pending_tasks()
         task_names = [t["description"][:50] for t in pending[:5]]
@@ -256,19 +335,19 @@ class AgentBrain:
             overnight_alerts=[],  # TODO: integrate alerts
         )
 
-        self._send_tts(text, priority=3)
+        self._send_tts(text, priority=3, now=now)
 
         # Update daily note
-        date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        date_str = now.strftime("%Y-%m-%d")
         self._vault.update_morning_briefing(
             date_str,
             calendar="No calendar integration yet",
             tasks=", ".join(task_names) if task_names else "None",
         )
 
-    def _fire_evening_summary(self) -> None:
+    def _fire_evening_summary(self, now: datetime) -> None:
         """Generate and send evening summary."""
-        date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        date_str = now.strftime("%Y-%m-%d")
         metrics = self._db.get_daily_metrics(date_str)
         pending = self._db.get_pending_tasks()
 
@@ -279,9 +358,13 @@ class AgentBrain:
             tomorrow_events=[],  # TODO: integrate calendar
         )
 
-        self._send_tts(text, priority=3)
+        self._send_tts(text, priority=3, now=now)
+
+        # The day's activity is over; tidy the database while it is quiet
+        self._db.optimize()
+        self._db.checkpoint(truncate=True)
 
-    def _fire_work_heartbeat(self) -> None:
+    def _fire_work_heartbeat(self, now: datetime) -> None:
         """Generate and send a work-hours heartbeat."""
         reminders = self._db.get_tasks_needing_reminder()
         task_names = [t["description"][:40] for t in reminders[:3]]
@@ -293,20 +376,49 @@ class AgentBrain:
         )
 
         if text:
-            self._send_tts(text, priority=5)
+            self._send_tts(text, priority=5, now=now)
+
+    def _send_tts(self, text: str, priority: int = 5, now: datetime | None = None) -> None:
+        """Queue text for the TTS service and as a heartbeat notification.
+
+        Args:
+            text: Text to speak.
+            priority: Delivery priority (lower is more urgent).
+            now: Time the caller is handling; sampled here if not given.
+        """
+        if now is None:
+            now = datetime.now(timezone.utc)
+        self._outbox.put_nowait((text, priority, now))
+
+        # Update metrics
+        self._db.update_daily_metrics(date=now.strftime("%Y-%m-%d"), heartbeats_delivered=1)
+
+    def _publish_worker(self) -> None:
+        """Publish queued TTS text until a None sentinel is received."""
+        while True:
+            item = self._outbox.get()
+            if item is None:
+                return
+            text, priority, now = item
+            try:
+                self._publish_tts(text, priority, now)
+            except Exception as e:
+                logger.error("Failed to publish TTS text: %s", e)
+
+    def _publish_tts(self, text: str, priority: int, now: datetime) -> None:
+        """Publish text to the TTS service and the heartbeat topic."""
+        payload = {
+            "text": text,
+            "priority": priority,
+        }
 
-    def _send_tts(self, text: str, priority: int = 5) -> None:
-        """Send text to the TTS service for synthesis."""
         self._client.publish(
             "sotto/audio/tts_text",
-            json.dumps({
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+            orjson.dumps({
+                "timestamp": now,
                 "source": "agent-brain",
                 "type": "tts_text",
-                "payload": {
-                    "text": text,
-                    "priority": priority,
-                },
+                "payload": payload,
             }),
             qos=1,
         )
@@ -314,21 +426,15 @@ class AgentBrain:
         # Also send as heartbeat notification
         self._client.publish(
             "sotto/agent/heartbeat",
-            json.dumps({
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+            orjson.dumps({
+                "timestamp": now,
                 "source": "agent-brain",
                 "type": "heartbeat",
-                "payload": {
-                    "text": text,
-                    "priority": priority,
-                },
+                "payload": payload,
             }),
             qos=1,
         )
 
-        # Update metrics
-        self._db.update_daily_metrics(heartbeats_delivered=1)
-
 
 def main() -> None:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
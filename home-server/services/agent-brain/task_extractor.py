@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
-import json
 import logging
 from dataclasses import dataclass, field
 from typing import Any
 
-from llm_client import OllamaClient
+import orjson
+
+from classifier import is_filler
+from llm_client import OllamaClient, strip_code_fence
 
 logger = logging.getLogger(__name__)
 
@@ -45,8 +47,41 @@ Respond with ONLY a JSON object:
 
 If no tasks are found, return {"tasks": [], "incomplete_items": []}"""
 
+# JSON schema for Ollama's structured output, mirroring ExtractionResult
+TASK_EXTRACTION_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "tasks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "description": {"type": "string"},
+                    "people": {"type": "array", "items": {"type": "string"}},
+                    "due_date": {"type": ["string", "null"]},
+                    "source_quote": {"type": "string"},
+                    "urgency": {"type": "string", "enum": ["low", "medium", "high"]},
+                },
+                "required": ["description", "people", "due_date", "source_quote", "urgency"],
+            },
+        },
+        "incomplete_items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "description": {"type": "string"},
+                    "missing": {"type": "string"},
+                },
+                "required": ["description", "missing"],
+            },
+        },
+    },
+    "required": ["tasks", "incomplete_items"],
+}
+
 
-@dataclass
+@dataclass(slots=True)
 class ExtractedTask:
     """A task extracted from conversation."""
 
@@ -57,7 +92,7 @@ class ExtractedTask:
     urgency: str = "medium"
 
 
-@dataclass
+@dataclass(slots=True)
 class IncompleteItem:
     """An incomplete information item needing follow-up."""
 
@@ -65,7 +100,7 @@ class IncompleteItem:
     missing: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ExtractionResult:
     """Result of task extraction."""
 
@@ -73,6 +108,32 @@ class ExtractionResult:
     incomplete_items: list[IncompleteItem]
 
 
+def extraction_from_dict(data: dict[str, Any]) -> ExtractionResult:
+    """Build an ExtractionResult from a decoded LLM JSON object."""
+    tasks = [
+        ExtractedTask(
+            description=t.get("description", ""),
+            people=t.get("people", []),
+            due_date=t.get("due_date"),
+            source_quote=t.get("source_quote", ""),
+            urgency=t.get("urgency", "medium"),
+        )
+        for t in data.get("tasks", [])
+        if t.get("description")
+    ]
+
+    incomplete = [
+        IncompleteItem(
+            description=i.get("description", ""),
+            missing=i.get("missing", ""),
+        )
+        for i in data.get("incomplete_items", [])
+        if i.get("description")
+    ]
+
+    return ExtractionResult(tasks=tasks, incomplete_items=incomplete)
+
+
 class TaskExtractor:
     """Extracts tasks and action items from transcribed text."""
 
@@ -88,14 +149,15 @@ class TaskExtractor:
         Returns:
             ExtractionResult with tasks and incomplete items.
         """
-        if not text.strip():
+        if not text.strip() or is_filler(text):
             return ExtractionResult(tasks=[], incomplete_items=[])
 
         try:
             response = self._llm.generate(
-                prompt=f"Extract tasks from this conversation:\n\n{text}",
+                prompt=text,
                 system=TASK_EXTRACTION_PROMPT,
                 temperature=0.1,
+                format=TASK_EXTRACTION_SCHEMA,
             )
             return self._parse_response(response.text)
 
@@ -106,38 +168,11 @@ class TaskExtractor:
     def _parse_response(self, response_text: str) -> ExtractionResult:
         """Parse the LLM's extraction response."""
         try:
-            text = response_text.strip()
-            if "```" in text:
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-                text = text.strip()
-
-            data = json.loads(text)
-
-            tasks = [
-                ExtractedTask(
-                    description=t.get("description", ""),
-                    people=t.get("people", []),
-                    due_date=t.get("due_date"),
-                    source_quote=t.get("source_quote", ""),
-                    urgency=t.get("urgency", "medium"),
-                )
-                for t in data.get("tasks", [])
-                if t.get("description")
-            ]
-
-            incomplete = [
-                IncompleteItem(
-                    description=i.get("description", ""),
-                    missing=i.get("missing", ""),
-                )
-                for i in data.get("incomplete_items", [])
-                if i.get("description")
-            ]
-
-            return ExtractionResult(tasks=tasks, incomplete_items=incomplete)
-
-        except (json.JSONDecodeError, ValueError) as e:
+            text = strip_code_fence(response_text)
+
+            data = orjson.loads(text)
+            return extraction_from_dict(data)
+
+        except (orjson.JSONDecodeError, ValueError) as e:
             logger.warning("Failed to parse extraction response: %s", e)
             return ExtractionResult(tasks=[], incomplete_items=[])
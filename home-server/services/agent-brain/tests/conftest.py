@@ -2,6 +2,9 @@
 
 import sys
 from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
 
 # Clear any cached 'main' module from other services to avoid collision
 for mod_name in list(sys.modules):
@@ -12,3 +15,20 @@ service_dir = str(Path(__file__).parent.parent)
 if service_dir in sys.path:
     sys.path.remove(service_dir)
 sys.path.insert(0, service_dir)
+
+
+class StubLLM:
+    """Stand-in for OllamaClient exposing only a mock ``generate``.
+
+    Avoids the attribute introspection ``MagicMock(spec=OllamaClient)``
+    performs on every construction.
+    """
+
+    def __init__(self) -> None:
+        self.generate = MagicMock()
+
+
+@pytest.fixture
+def llm() -> StubLLM:
+    """Fresh LLM stub for each test."""
+    return StubLLM()
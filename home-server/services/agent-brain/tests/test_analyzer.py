@@ -0,0 +1,279 @@
+"""Tests for the combined analyzer."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock
+
+import pytest
+
+from analyzer import AnalysisCache, AnalysisResult, CombinedAnalyzer
+from llm_client import LLMResponse
+
+if TYPE_CHECKING:
+    from conftest import StubLLM
+
+
+def _make_llm_response(text: str) -> LLMResponse:
+    return LLMResponse(text=text, model="test", tokens_used=10, done=True)
+
+
+class TestCombinedAnalyzerEmpty:
+    def test_empty_text(self, llm: StubLLM) -> None:
+        analyzer = CombinedAnalyzer(llm)
+        result = analyzer.analyze("  \n ")
+        assert result.classification.classification == "PUBLIC"
+        assert result.extraction.tasks == []
+        llm.generate.assert_not_called()
+
+    def test_filler_text(self, llm: StubLLM) -> None:
+        analyzer = CombinedAnalyzer(llm)
+        result = analyzer.analyze("uh, yeah")
+        assert result.classification.reason == "Filler/short"
+        assert result.extraction.tasks == []
+        llm.generate.assert_not_called()
+
+
+class TestCombinedAnalyzerAnalyze:
+    def test_single_call_for_both_results(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response(json.dumps({
+            "classification": {
+                "classification": "PUBLIC",
+                "confidence": 0.9,
+                "reason": "Work",
+            },
+            "tasks": [{
+                "description": "Call Bob",
+                "people": ["Bob"],
+                "due_date": None,
+                "source_quote": "call Bob",
+                "urgency": "high",
+            }],
+            "incomplete_items": [{"description": "Report", "missing": "Which report"}],
+        }))
+
+        analyzer = CombinedAnalyzer(llm)
+        result = analyzer.analyze("I need to call Bob about the report")
+
+        assert isinstance(result, AnalysisResult)
+        assert result.classification.classification == "PUBLIC"
+        assert result.classification.confidence == 0.9
+        assert len(result.extraction.tasks) == 1
+        assert result.extraction.tasks[0].people == ["Bob"]
+        assert result.extraction.incomplete_items[0].missing == "Which report"
+        llm.generate.assert_called_once()
+
+    def test_code_block_response(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response(
+            '```json\n{"classification": {"classification": "PRIVATE", "confidence": 0.8, '
+            '"reason": "Personal"}, "tasks": [], "incomplete_items": []}\n```'
+        )
+
+        analyzer = CombinedAnalyzer(llm)
+        result = analyzer.analyze("something personal")
+
+        assert result.classification.classification == "PRIVATE"
+        assert result.extraction.tasks == []
+
+    def test_flat_classification_string(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response(
+            '{"classification": "public", "tasks": []}'
+        )
+
+        analyzer = CombinedAnalyzer(llm)
+        result = analyzer.analyze("groceries")
+
+        assert result.classification.classification == "PUBLIC"
+        assert result.extraction.incomplete_items == []
+
+
+class TestCombinedAnalyzerErrors:
+    @pytest.mark.parametrize("error", [ConnectionError("refused"), RuntimeError("timeout")])
+    def test_llm_error_defaults_private(self, llm: StubLLM, error: Exception) -> None:
+        llm.generate.side_effect = error
+
+        analyzer = CombinedAnalyzer(llm)
+        result = analyzer.analyze("some text")
+
+        assert result.classification.classification == "PRIVATE"
+        assert result.classification.confidence == 0.0
+        assert result.extraction.tasks == []
+
+    def test_malformed_json_defaults_private(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response("not json")
+
+        analyzer = CombinedAnalyzer(llm)
+        result = analyzer.analyze("some text")
+
+        assert result.classification.classification == "PRIVATE"
+        assert result.classification.confidence == 0.3
+        assert result.extraction.tasks == []
+
+    @pytest.mark.parametrize("tasks", [None, 5])
+    def test_non_list_tasks_defaults_private(self, llm: StubLLM, tasks: object) -> None:
+        llm.generate.return_value = _make_llm_response(
+            json.dumps({"classification": "PUBLIC", "confidence": 0.9, "tasks": tasks})
+        )
+
+        analyzer = CombinedAnalyzer(llm)
+        result = analyzer.analyze("some text")
+
+        assert result.classification.classification == "PRIVATE"
+        assert result.classification.confidence == 0.3
+        assert result.extraction.tasks == []
+
+    def test_prompt_is_raw_text(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response('{"classification": "PUBLIC"}')
+
+        analyzer = CombinedAnalyzer(llm)
+        analyzer.analyze("buy milk")
+
+        assert llm.generate.call_args.kwargs["prompt"] == "buy milk"
+
+    def test_requests_schema_constrained_output(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response('{"classification": "PUBLIC"}')
+
+        analyzer = CombinedAnalyzer(llm)
+        analyzer.analyze("buy milk")
+
+        schema = llm.generate.call_args.kwargs["format"]
+        assert schema["required"] == ["classification", "tasks", "incomplete_items"]
+        assert schema["properties"]["classification"]["properties"]["classification"]["enum"] == [
+            "PUBLIC",
+            "PRIVATE",
+        ]
+
+
+class TestAnalysisCache:
+    def test_key_normalizes_case_and_whitespace(self) -> None:
+        assert AnalysisCache.key("  Got  it\n") == AnalysisCache.key("got it")
+        assert AnalysisCache.key("Got it, thanks!") == AnalysisCache.key("got it thanks")
+        assert AnalysisCache.key("got it") != AnalysisCache.key("got this")
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = AnalysisCache(maxsize=2)
+        result = MagicMock(spec=AnalysisResult)
+        cache.put("a", result)
+        cache.put("b", result)
+        cache.get("a")
+        cache.put("c", result)
+        assert len(cache) == 2
+        assert cache.get("a") is result
+        assert cache.get("b") is None
+
+    def test_repeat_text_served_from_cache(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response(
+            '{"classification": {"classification": "PUBLIC", "confidence": 0.9}}'
+        )
+
+        analyzer = CombinedAnalyzer(llm, cache=AnalysisCache())
+        first = analyzer.analyze("Sounds good")
+        second = analyzer.analyze("sounds good ")
+
+        assert second is first
+        llm.generate.assert_called_once()
+
+    def test_failures_not_cached(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response("not json")
+
+        analyzer = CombinedAnalyzer(llm, cache=AnalysisCache())
+        analyzer.analyze("hello there")
+        analyzer.analyze("hello there")
+
+        assert llm.generate.call_count == 2
+
+
+def _item(classification: str, description: str | None = None) -> dict:
+    tasks = []
+    if description is not None:
+        tasks.append({
+            "description": description,
+            "people": [],
+            "due_date": None,
+            "source_quote": description,
+            "urgency": "medium",
+        })
+    return {
+        "classification": {"classification": classification, "confidence": 0.9, "reason": ""},
+        "tasks": tasks,
+        "incomplete_items": [],
+    }
+
+
+class TestCombinedAnalyzerBatch:
+    def test_burst_shares_one_call(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response(json.dumps({
+            "items": [_item("PUBLIC", "Buy milk"), _item("PRIVATE")],
+        }))
+
+        analyzer = CombinedAnalyzer(llm)
+        results = analyzer.analyze_batch(["remember to buy milk", "something personal here"])
+
+        llm.generate.assert_called_once()
+        assert llm.generate.call_args.kwargs["prompt"] == (
+            "1. remember to buy milk\n2. something personal here"
+        )
+        assert results[0].extraction.tasks[0].description == "Buy milk"
+        assert results[1].classification.classification == "PRIVATE"
+
+    def test_shortcuts_resolved_without_llm(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response(json.dumps(_item("PUBLIC", "Call Bob")))
+
+        analyzer = CombinedAnalyzer(llm)
+        results = analyzer.analyze_batch(["", "uh, yeah", "please call Bob tomorrow"])
+
+        assert [r.classification.reason for r in results[:2]] == ["Empty content", "Filler/short"]
+        assert results[2].extraction.tasks[0].description == "Call Bob"
+        assert llm.generate.call_args.kwargs["prompt"] == "please call Bob tomorrow"
+
+    def test_count_mismatch_falls_back_to_single_calls(self, llm: StubLLM) -> None:
+        llm.generate.side_effect = [
+            _make_llm_response(json.dumps({"items": [_item("PUBLIC")]})),
+            _make_llm_response(json.dumps(_item("PUBLIC", "First"))),
+            _make_llm_response(json.dumps(_item("PUBLIC", "Second"))),
+        ]
+
+        analyzer = CombinedAnalyzer(llm)
+        results = analyzer.analyze_batch(["the first thing", "the second thing"])
+
+        assert llm.generate.call_count == 3
+        assert [r.extraction.tasks[0].description for r in results] == ["First", "Second"]
+
+    def test_bad_single_retry_only_affects_its_item(self, llm: StubLLM) -> None:
+        bad = _item("PUBLIC")
+        bad["tasks"] = None
+        llm.generate.side_effect = [
+            _make_llm_response(json.dumps({"items": [_item("PUBLIC")]})),
+            _make_llm_response(json.dumps(_item("PUBLIC", "First"))),
+            _make_llm_response(json.dumps(bad)),
+            _make_llm_response(json.dumps(_item("PUBLIC", "Third"))),
+        ]
+
+        analyzer = CombinedAnalyzer(llm)
+        results = analyzer.analyze_batch(["the first thing", "the second thing", "the third thing"])
+
+        assert results[0].extraction.tasks[0].description == "First"
+        assert results[1].classification.classification == "PRIVATE"
+        assert results[1].extraction.tasks == []
+        assert results[2].extraction.tasks[0].description == "Third"
+
+    def test_llm_error_defaults_private(self, llm: StubLLM) -> None:
+        llm.generate.side_effect = ConnectionError("refused")
+
+        analyzer = CombinedAnalyzer(llm)
+        results = analyzer.analyze_batch(["the first thing", "the second thing"])
+
+        assert [r.classification.confidence for r in results] == [0.0, 0.0]
+        llm.generate.assert_called_once()
+
+    def test_results_cached(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response(json.dumps({
+            "items": [_item("PUBLIC"), _item("PUBLIC")],
+        }))
+
+        analyzer = CombinedAnalyzer(llm, cache=AnalysisCache())
+        analyzer.analyze_batch(["the first thing", "the second thing"])
+        analyzer.analyze_batch(["The first thing.", "the second thing"])
+
+        llm.generate.assert_called_once()
@@ -3,16 +3,46 @@
 from __future__ import annotations
 
 import time
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
 
 import pytest
 
-import sys
-from pathlib import Path
+from heartbeat import HeartbeatScheduler
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Shared instants on one test day; datetime is immutable, so reuse is safe
+T_0630 = datetime(2025, 1, 15, 6, 30, tzinfo=timezone.utc)
+T_0700 = datetime(2025, 1, 15, 7, 0, tzinfo=timezone.utc)
+T_0701 = datetime(2025, 1, 15, 7, 1, tzinfo=timezone.utc)
+T_0702 = datetime(2025, 1, 15, 7, 2, tzinfo=timezone.utc)
+T_0800 = datetime(2025, 1, 15, 8, 0, tzinfo=timezone.utc)
+T_080020 = datetime(2025, 1, 15, 8, 0, 20, tzinfo=timezone.utc)
+T_1000 = datetime(2025, 1, 15, 10, 0, tzinfo=timezone.utc)
+T_1200 = datetime(2025, 1, 15, 12, 0, tzinfo=timezone.utc)
+T_1230 = datetime(2025, 1, 15, 12, 30, tzinfo=timezone.utc)
+T_1730 = datetime(2025, 1, 15, 17, 30, tzinfo=timezone.utc)
+T_1759 = datetime(2025, 1, 15, 17, 59, tzinfo=timezone.utc)
+T_1800 = datetime(2025, 1, 15, 18, 0, tzinfo=timezone.utc)
+T_1802 = datetime(2025, 1, 15, 18, 2, tzinfo=timezone.utc)
+T_2200 = datetime(2025, 1, 15, 22, 0, tzinfo=timezone.utc)
 
-from heartbeat import HeartbeatScheduler
+
+def _scheduled_done(hs: HeartbeatScheduler, day: datetime) -> HeartbeatScheduler:
+    """Mark the morning briefing and evening summary as already fired on day."""
+    hs._morning_fired_on = hs._evening_fired_on = day.date()
+    return hs
+
+
+@pytest.fixture(scope="module")
+def hs() -> HeartbeatScheduler:
+    """Default scheduler shared by tests that only call the build_* methods."""
+    return HeartbeatScheduler()
+
+
+@pytest.fixture
+def work_hs() -> HeartbeatScheduler:
+    """Fresh 08:00-17:00 scheduler for tests that change work-heartbeat state."""
+    return HeartbeatScheduler(work_start="08:00", work_end="17:00", work_interval_minutes=30)
 
 
 class TestHeartbeatSchedulerInit:
@@ -35,99 +65,149 @@ class TestHeartbeatSchedulerInit:
         assert hs._morning_briefing == "06:30"
         assert hs._work_interval_minutes == 15
 
+    def test_times_parsed_once(self) -> None:
+        hs = HeartbeatScheduler(morning_briefing="06:30", work_end="17:45")
+        assert hs._morning_briefing_min == 6 * 60 + 30
+        assert hs._work_end_min == 17 * 60 + 45
+
 
 class TestMorningBriefing:
     def test_fires_at_correct_time(self) -> None:
         hs = HeartbeatScheduler(morning_briefing="07:00")
-        t = datetime(2025, 1, 15, 7, 0, tzinfo=timezone.utc)
-        assert hs.should_fire_morning_briefing(t) is True
+        assert hs.should_fire_morning_briefing(T_0700) is True
 
-    def test_does_not_fire_at_wrong_time(self) -> None:
+    def test_does_not_fire_before_time(self) -> None:
+        hs = HeartbeatScheduler(morning_briefing="07:00")
+        assert hs.should_fire_morning_briefing(T_0630) is False
+
+    def test_fires_when_checked_late(self) -> None:
+        hs = HeartbeatScheduler(morning_briefing="07:00")
+        assert hs.get_heartbeat_type(T_0702) == "morning_briefing"
+        assert hs.should_fire_morning_briefing(T_0701) is False
+
+    def test_fires_again_next_day(self) -> None:
         hs = HeartbeatScheduler(morning_briefing="07:00")
-        t = datetime(2025, 1, 15, 7, 1, tzinfo=timezone.utc)
-        assert hs.should_fire_morning_briefing(t) is False
+        assert hs.get_heartbeat_type(T_0700) == "morning_briefing"
+        assert hs.should_fire_morning_briefing(T_0700 + timedelta(days=1)) is True
+
+    def test_already_past_at_startup(self) -> None:
+        started = datetime(2025, 1, 15, 9, 0, tzinfo=timezone.utc)
+        with patch("heartbeat.datetime") as mock_datetime:
+            mock_datetime.now.return_value = started
+            hs = HeartbeatScheduler(morning_briefing="07:00", evening_summary="18:00")
+        assert hs.should_fire_morning_briefing(started) is False
+        assert hs.should_fire_evening_summary(T_1800) is True
 
 
 class TestEveningSummary:
     def test_fires_at_correct_time(self) -> None:
         hs = HeartbeatScheduler(evening_summary="18:00")
-        t = datetime(2025, 1, 15, 18, 0, tzinfo=timezone.utc)
-        assert hs.should_fire_evening_summary(t) is True
+        assert hs.should_fire_evening_summary(T_1800) is True
 
     def test_does_not_fire_at_wrong_time(self) -> None:
         hs = HeartbeatScheduler(evening_summary="18:00")
-        t = datetime(2025, 1, 15, 17, 59, tzinfo=timezone.utc)
-        assert hs.should_fire_evening_summary(t) is False
+        assert hs.should_fire_evening_summary(T_1759) is False
+
+    def test_fires_when_checked_late(self) -> None:
+        hs = HeartbeatScheduler(evening_summary="18:00")
+        hs._morning_fired_on = T_1800.date()
+        assert hs.get_heartbeat_type(T_1802) == "evening_summary"
+        assert hs.get_heartbeat_type(T_1802) is None
 
 
 class TestWorkHeartbeat:
-    def test_fires_during_work_hours(self) -> None:
-        hs = HeartbeatScheduler(work_start="08:00", work_end="17:00", work_interval_minutes=30)
+    def test_fires_during_work_hours(self, work_hs: HeartbeatScheduler) -> None:
         # Force last heartbeat to be long ago
-        hs._last_work_heartbeat = 0
-        t = datetime(2025, 1, 15, 10, 0, tzinfo=timezone.utc)
-        assert hs.should_fire_work_heartbeat(t) is True
+        work_hs._last_work_heartbeat = 0
+        assert work_hs.should_fire_work_heartbeat(T_1000) is True
 
-    def test_does_not_fire_before_work(self) -> None:
-        hs = HeartbeatScheduler(work_start="08:00", work_end="17:00")
-        hs._last_work_heartbeat = 0
-        t = datetime(2025, 1, 15, 7, 0, tzinfo=timezone.utc)
-        assert hs.should_fire_work_heartbeat(t) is False
+    def test_does_not_fire_before_work(self, work_hs: HeartbeatScheduler) -> None:
+        work_hs._last_work_heartbeat = 0
+        assert work_hs.should_fire_work_heartbeat(T_0700) is False
 
-    def test_does_not_fire_after_work(self) -> None:
-        hs = HeartbeatScheduler(work_start="08:00", work_end="17:00")
-        hs._last_work_heartbeat = 0
-        t = datetime(2025, 1, 15, 18, 0, tzinfo=timezone.utc)
-        assert hs.should_fire_work_heartbeat(t) is False
+    def test_does_not_fire_after_work(self, work_hs: HeartbeatScheduler) -> None:
+        work_hs._last_work_heartbeat = 0
+        assert work_hs.should_fire_work_heartbeat(T_1800) is False
 
-    def test_respects_interval(self) -> None:
-        hs = HeartbeatScheduler(work_start="08:00", work_end="17:00", work_interval_minutes=30)
+    def test_respects_interval(self, work_hs: HeartbeatScheduler) -> None:
         # Set last heartbeat to recent
-        hs._last_work_heartbeat = time.time()
-        t = datetime(2025, 1, 15, 10, 0, tzinfo=timezone.utc)
-        assert hs.should_fire_work_heartbeat(t) is False
+        work_hs._last_work_heartbeat = time.time()
+        assert work_hs.should_fire_work_heartbeat(T_1000) is False
 
-    def test_mark_work_heartbeat_fired(self) -> None:
-        hs = HeartbeatScheduler()
-        assert hs._last_work_heartbeat == 0
-        hs.mark_work_heartbeat_fired()
-        assert hs._last_work_heartbeat > 0
+    def test_mark_work_heartbeat_fired(self, work_hs: HeartbeatScheduler) -> None:
+        assert work_hs._last_work_heartbeat == 0
+        work_hs.mark_work_heartbeat_fired()
+        assert work_hs._last_work_heartbeat > 0
 
 
 class TestGetHeartbeatType:
     def test_morning_briefing(self) -> None:
         hs = HeartbeatScheduler(morning_briefing="07:00")
-        t = datetime(2025, 1, 15, 7, 0, tzinfo=timezone.utc)
-        assert hs.get_heartbeat_type(t) == "morning_briefing"
+        assert hs.get_heartbeat_type(T_0700) == "morning_briefing"
 
     def test_evening_summary(self) -> None:
         hs = HeartbeatScheduler(evening_summary="18:00")
-        t = datetime(2025, 1, 15, 18, 0, tzinfo=timezone.utc)
-        assert hs.get_heartbeat_type(t) == "evening_summary"
+        hs._morning_fired_on = T_1800.date()
+        assert hs.get_heartbeat_type(T_1800) == "evening_summary"
 
     def test_work_interval(self) -> None:
-        hs = HeartbeatScheduler(work_start="08:00", work_end="17:00")
+        hs = _scheduled_done(HeartbeatScheduler(work_start="08:00", work_end="17:00"), T_1200)
         hs._last_work_heartbeat = 0
-        t = datetime(2025, 1, 15, 12, 0, tzinfo=timezone.utc)
-        assert hs.get_heartbeat_type(t) == "work_interval"
+        assert hs.get_heartbeat_type(T_1200) == "work_interval"
 
     def test_no_heartbeat(self) -> None:
-        hs = HeartbeatScheduler()
+        hs = _scheduled_done(HeartbeatScheduler(), T_1230)
         hs._last_work_heartbeat = time.time()
-        t = datetime(2025, 1, 15, 12, 30, tzinfo=timezone.utc)
-        assert hs.get_heartbeat_type(t) is None
+        assert hs.get_heartbeat_type(T_1230) is None
 
     def test_morning_takes_priority(self) -> None:
         hs = HeartbeatScheduler(morning_briefing="08:00", work_start="08:00", work_end="17:00")
         hs._last_work_heartbeat = 0
-        t = datetime(2025, 1, 15, 8, 0, tzinfo=timezone.utc)
         # Morning briefing should take priority
-        assert hs.get_heartbeat_type(t) == "morning_briefing"
+        assert hs.get_heartbeat_type(T_0800) == "morning_briefing"
+
+    def test_scheduled_heartbeat_fires_once_per_day(self) -> None:
+        hs = HeartbeatScheduler(morning_briefing="08:00", work_start="08:00", work_end="17:00")
+        hs._last_work_heartbeat = 0
+        assert hs.get_heartbeat_type(T_0800) == "morning_briefing"
+        assert hs.get_heartbeat_type(T_080020) == "work_interval"
+
+
+class TestSecondsUntilNextFire:
+    def test_until_morning_briefing(self) -> None:
+        hs = HeartbeatScheduler(morning_briefing="07:00")
+        assert hs.seconds_until_next_fire(T_0630) == 30 * 60
+
+    def test_until_evening_summary(self) -> None:
+        hs = HeartbeatScheduler(evening_summary="18:00", work_end="17:00")
+        hs._morning_fired_on = T_1730.date()
+        assert hs.seconds_until_next_fire(T_1730) == 30 * 60
+
+    def test_missed_scheduled_heartbeat_due_now(self) -> None:
+        hs = HeartbeatScheduler(morning_briefing="07:00")
+        hs._last_work_heartbeat = time.time()
+        assert hs.seconds_until_next_fire(T_0702) == 0.0
+
+    def test_work_heartbeat_due_now(self) -> None:
+        hs = HeartbeatScheduler(work_start="08:00", work_end="17:00")
+        hs._last_work_heartbeat = 0
+        assert hs.seconds_until_next_fire(T_1200) == 0.0
+
+    def test_work_heartbeat_after_interval(self) -> None:
+        hs = HeartbeatScheduler(work_start="08:00", work_end="17:00", work_interval_minutes=30)
+        t = T_1200
+        _scheduled_done(hs, t)
+        hs._last_work_heartbeat = t.timestamp() - 10 * 60
+        assert hs.seconds_until_next_fire(t) == pytest.approx(20 * 60)
+
+    def test_overnight_waits_for_morning(self) -> None:
+        hs = _scheduled_done(HeartbeatScheduler(morning_briefing="07:00", work_start="08:00"), T_2200)
+        hs._last_work_heartbeat = 0
+        assert hs.seconds_until_next_fire(T_2200) == 9 * 3600
 
 
 class TestBuildMorningBriefing:
-    def test_full_briefing(self) -> None:
-        hs = HeartbeatScheduler()
+    def test_full_briefing(self, hs: HeartbeatScheduler) -> None:
         text = hs.build_morning_briefing(
             calendar_events=["Team standup at 9am", "Lunch with Bob at 12"],
             pending_tasks=["Review PR", "Update docs"],
@@ -138,8 +218,7 @@ class TestBuildMorningBriefing:
         assert "2 pending tasks" in text
         assert "Server disk usage" in text
 
-    def test_empty_briefing(self) -> None:
-        hs = HeartbeatScheduler()
+    def test_empty_briefing(self, hs: HeartbeatScheduler) -> None:
         text = hs.build_morning_briefing(
             calendar_events=[],
             pending_tasks=[],
@@ -149,8 +228,7 @@ class TestBuildMorningBriefing:
         assert "No meetings" in text
         assert "No pending tasks" in text
 
-    def test_single_task(self) -> None:
-        hs = HeartbeatScheduler()
+    def test_single_task(self, hs: HeartbeatScheduler) -> None:
         text = hs.build_morning_briefing(
             calendar_events=[],
             pending_tasks=["Only task"],
@@ -161,8 +239,7 @@ class TestBuildMorningBriefing:
 
 
 class TestBuildWorkHeartbeat:
-    def test_with_content(self) -> None:
-        hs = HeartbeatScheduler()
+    def test_with_content(self, hs: HeartbeatScheduler) -> None:
         text = hs.build_work_heartbeat(
             new_tasks=["Buy groceries"],
             upcoming_events=["Meeting at 3pm"],
@@ -173,8 +250,7 @@ class TestBuildWorkHeartbeat:
         assert "Meeting at 3pm" in text
         assert "Battery low" in text
 
-    def test_nothing_to_report(self) -> None:
-        hs = HeartbeatScheduler()
+    def test_nothing_to_report(self, hs: HeartbeatScheduler) -> None:
         text = hs.build_work_heartbeat(
             new_tasks=[],
             upcoming_events=[],
@@ -182,8 +258,7 @@ class TestBuildWorkHeartbeat:
         )
         assert text is None
 
-    def test_only_alerts(self) -> None:
-        hs = HeartbeatScheduler()
+    def test_only_alerts(self, hs: HeartbeatScheduler) -> None:
         text = hs.build_work_heartbeat(
             new_tasks=[],
             upcoming_events=[],
@@ -194,8 +269,7 @@ class TestBuildWorkHeartbeat:
 
 
 class TestBuildEveningSummary:
-    def test_full_summary(self) -> None:
-        hs = HeartbeatScheduler()
+    def test_full_summary(self, hs: HeartbeatScheduler) -> None:
         text = hs.build_evening_summary(
             tasks_completed=5,
             tasks_created=3,
@@ -208,8 +282,7 @@ class TestBuildEveningSummary:
         assert "Finish report" in text
         assert "Doctor appointment" in text
 
-    def test_no_incomplete_no_tomorrow(self) -> None:
-        hs = HeartbeatScheduler()
+    def test_no_incomplete_no_tomorrow(self, hs: HeartbeatScheduler) -> None:
         text = hs.build_evening_summary(
             tasks_completed=0,
             tasks_created=0,
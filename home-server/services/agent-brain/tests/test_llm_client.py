@@ -6,13 +6,9 @@ import json
 from unittest.mock import MagicMock, patch
 
 import pytest
+import requests
 
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from llm_client import LLMResponse, OllamaClient
+from llm_client import LLMResponse, OllamaClient, strip_code_fence
 
 
 class TestLLMResponse:
@@ -45,39 +41,49 @@ class TestOllamaClientInit:
         client = OllamaClient(base_url="http://host:1234///")
         assert client._base_url == "http://host:1234"
 
+    def test_uses_pooled_session(self) -> None:
+        client = OllamaClient()
+        adapter = client._session.get_adapter("http://localhost:11434/api/tags")
+        assert adapter._pool_maxsize == 8
+
+    @patch("llm_client.requests.Session.close")
+    def test_close_closes_session(self, mock_close: MagicMock) -> None:
+        client = OllamaClient()
+        client.close()
+        mock_close.assert_called_once()
+
 
 class TestOllamaClientHealthCheck:
-    @patch("llm_client.requests.get")
+    @patch("llm_client.requests.Session.get")
     def test_healthy(self, mock_get: MagicMock) -> None:
         mock_get.return_value.status_code = 200
         client = OllamaClient()
         assert client.check_health() is True
         mock_get.assert_called_once_with("http://localhost:11434/api/tags", timeout=5)
 
-    @patch("llm_client.requests.get")
+    @patch("llm_client.requests.Session.get")
     def test_unhealthy_status(self, mock_get: MagicMock) -> None:
         mock_get.return_value.status_code = 500
         client = OllamaClient()
         assert client.check_health() is False
 
-    @patch("llm_client.requests.get")
+    @patch("llm_client.requests.Session.get")
     def test_connection_error(self, mock_get: MagicMock) -> None:
-        import requests
         mock_get.side_effect = requests.ConnectionError("refused")
         client = OllamaClient()
         assert client.check_health() is False
 
 
 class TestOllamaClientGenerate:
-    @patch("llm_client.requests.post")
+    @patch("llm_client.requests.Session.post")
     def test_generate_success(self, mock_post: MagicMock) -> None:
         mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {
+        mock_post.return_value.content = json.dumps({
             "response": "The answer is 42.",
             "model": "llama3.1:8b",
             "eval_count": 15,
             "done": True,
-        }
+        }).encode()
         mock_post.return_value.raise_for_status = MagicMock()
 
         client = OllamaClient()
@@ -89,60 +95,81 @@ class TestOllamaClientGenerate:
         assert result.done is True
 
         call_kwargs = mock_post.call_args
-        payload = call_kwargs[1]["json"]
+        payload = json.loads(call_kwargs[1]["data"])
         assert payload["prompt"] == "What is the answer?"
         assert payload["system"] == "Be helpful"
         assert payload["options"]["temperature"] == 0.7
         assert payload["stream"] is False
 
-    @patch("llm_client.requests.post")
+    @patch("llm_client.requests.Session.post")
     def test_generate_no_system(self, mock_post: MagicMock) -> None:
         mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {
+        mock_post.return_value.content = json.dumps({
             "response": "ok",
             "done": True,
-        }
+        }).encode()
         mock_post.return_value.raise_for_status = MagicMock()
 
         client = OllamaClient()
         client.generate("hello")
 
-        payload = mock_post.call_args[1]["json"]
+        payload = json.loads(mock_post.call_args[1]["data"])
         assert "system" not in payload
 
-    @patch("llm_client.requests.post")
+    @patch("llm_client.requests.Session.post")
+    def test_generate_with_format(self, mock_post: MagicMock) -> None:
+        mock_post.return_value.content = json.dumps({"response": "{}", "done": True}).encode()
+        mock_post.return_value.raise_for_status = MagicMock()
+        schema = {"type": "object", "properties": {"a": {"type": "string"}}}
+
+        client = OllamaClient()
+        client.generate("hello", format=schema)
+
+        payload = json.loads(mock_post.call_args[1]["data"])
+        assert payload["format"] == schema
+
+    @patch("llm_client.requests.Session.post")
+    def test_generate_without_format(self, mock_post: MagicMock) -> None:
+        mock_post.return_value.content = json.dumps({"response": "ok", "done": True}).encode()
+        mock_post.return_value.raise_for_status = MagicMock()
+
+        client = OllamaClient()
+        client.generate("hello")
+
+        payload = json.loads(mock_post.call_args[1]["data"])
+        assert "format" not in payload
+
+    @patch("llm_client.requests.Session.post")
     def test_generate_custom_temperature(self, mock_post: MagicMock) -> None:
         mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {"response": "ok", "done": True}
+        mock_post.return_value.content = json.dumps({"response": "ok", "done": True}).encode()
         mock_post.return_value.raise_for_status = MagicMock()
 
         client = OllamaClient()
         client.generate("hello", temperature=0.1)
 
-        payload = mock_post.call_args[1]["json"]
+        payload = json.loads(mock_post.call_args[1]["data"])
         assert payload["options"]["temperature"] == 0.1
+        assert mock_post.call_args[1]["headers"]["Content-Type"] == "application/json"
 
-    @patch("llm_client.requests.post")
+    @patch("llm_client.requests.Session.post")
     def test_generate_connection_error(self, mock_post: MagicMock) -> None:
-        import requests
         mock_post.side_effect = requests.ConnectionError("refused")
 
         client = OllamaClient()
         with pytest.raises(ConnectionError, match="Cannot reach Ollama"):
             client.generate("hello")
 
-    @patch("llm_client.requests.post")
+    @patch("llm_client.requests.Session.post")
     def test_generate_http_error(self, mock_post: MagicMock) -> None:
-        import requests
         mock_post.return_value.raise_for_status.side_effect = requests.HTTPError("500")
 
         client = OllamaClient()
         with pytest.raises(RuntimeError, match="Ollama generation failed"):
             client.generate("hello")
 
-    @patch("llm_client.requests.post")
+    @patch("llm_client.requests.Session.post")
     def test_generate_timeout(self, mock_post: MagicMock) -> None:
-        import requests
         mock_post.side_effect = requests.Timeout()
 
         client = OllamaClient()
@@ -151,15 +178,15 @@ class TestOllamaClientGenerate:
 
 
 class TestOllamaClientChat:
-    @patch("llm_client.requests.post")
+    @patch("llm_client.requests.Session.post")
     def test_chat_success(self, mock_post: MagicMock) -> None:
         mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {
+        mock_post.return_value.content = json.dumps({
             "message": {"role": "assistant", "content": "I'm doing well."},
             "model": "llama3.1:8b",
             "eval_count": 8,
             "done": True,
-        }
+        }).encode()
         mock_post.return_value.raise_for_status = MagicMock()
 
         client = OllamaClient()
@@ -171,24 +198,38 @@ class TestOllamaClientChat:
         assert result.text == "I'm doing well."
         assert result.tokens_used == 8
 
-        payload = mock_post.call_args[1]["json"]
+        payload = json.loads(mock_post.call_args[1]["data"])
         assert payload["messages"] == messages
         assert payload["stream"] is False
 
-    @patch("llm_client.requests.post")
+    @patch("llm_client.requests.Session.post")
     def test_chat_connection_error(self, mock_post: MagicMock) -> None:
-        import requests
         mock_post.side_effect = requests.ConnectionError("refused")
 
         client = OllamaClient()
         with pytest.raises(ConnectionError, match="Cannot reach Ollama"):
             client.chat([{"role": "user", "content": "hi"}])
 
-    @patch("llm_client.requests.post")
+    @patch("llm_client.requests.Session.post")
     def test_chat_http_error(self, mock_post: MagicMock) -> None:
-        import requests
         mock_post.return_value.raise_for_status.side_effect = requests.HTTPError("bad")
 
         client = OllamaClient()
         with pytest.raises(RuntimeError, match="Ollama chat failed"):
             client.chat([{"role": "user", "content": "hi"}])
+
+
+class TestStripCodeFence:
+    @pytest.mark.parametrize(
+        "raw",
+        [
+            '{"a": 1}',
+            '```json\n{"a": 1}\n```',
+            '```JSON\n{"a": 1}\n```',
+            '```\n{"a": 1}\n```',
+            'Here you go:\n```json\n{"a": 1}\n```\nDone.',
+            '```json\n{"a": 1}',
+        ],
+    )
+    def test_extracts_json_body(self, raw: str) -> None:
+        assert strip_code_fence(raw) == '{"a": 1}'
@@ -3,16 +3,11 @@
 from __future__ import annotations
 
 import json
-from unittest.mock import MagicMock
+from typing import TYPE_CHECKING
 
 import pytest
 
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from llm_client import LLMResponse, OllamaClient
+from llm_client import LLMResponse
 from task_extractor import (
     ExtractionResult,
     ExtractedTask,
@@ -20,11 +15,76 @@ from task_extractor import (
     TaskExtractor,
 )
 
+if TYPE_CHECKING:
+    from conftest import StubLLM
+
 
 def _make_llm_response(text: str) -> LLMResponse:
     return LLMResponse(text=text, model="test", tokens_used=10, done=True)
 
 
+# Mock LLM payloads, encoded once at import
+_SINGLE_TASK_JSON = json.dumps({
+    "tasks": [{
+        "description": "Call Bob about the project",
+        "people": ["Bob"],
+        "due_date": "2025-01-15",
+        "source_quote": "need to call Bob about the project",
+        "urgency": "high",
+    }],
+    "incomplete_items": [],
+})
+
+_MULTI_TASK_JSON = json.dumps({
+    "tasks": [
+        {
+            "description": "Send report to Alice",
+            "people": ["Alice"],
+            "due_date": None,
+            "source_quote": "send the report to Alice",
+            "urgency": "medium",
+        },
+        {
+            "description": "Book restaurant for dinner",
+            "people": [],
+            "due_date": "2025-01-20",
+            "source_quote": "book a restaurant",
+            "urgency": "low",
+        },
+    ],
+    "incomplete_items": [],
+})
+
+_INCOMPLETE_ITEMS_JSON = json.dumps({
+    "tasks": [{
+        "description": "Order something from Amazon",
+        "people": [],
+        "due_date": None,
+        "source_quote": "order that thing from Amazon",
+        "urgency": "low",
+    }],
+    "incomplete_items": [{
+        "description": "Amazon order",
+        "missing": "What specific item to order",
+    }],
+})
+
+_EMPTY_DESCRIPTIONS_JSON = json.dumps({
+    "tasks": [
+        {"description": "", "people": [], "urgency": "low"},
+        {"description": "Valid task", "people": [], "urgency": "medium"},
+    ],
+    "incomplete_items": [
+        {"description": "", "missing": "everything"},
+        {"description": "Valid incomplete", "missing": "details"},
+    ],
+})
+
+_MINIMAL_TASK_JSON = json.dumps({
+    "tasks": [{"description": "Minimal task"}],
+})
+
+
 class TestExtractedTask:
     def test_defaults(self) -> None:
         task = ExtractedTask(description="Do something")
@@ -43,35 +103,29 @@ class TestExtractionResult:
 
 
 class TestTaskExtractorEmpty:
-    def test_empty_text(self) -> None:
-        llm = MagicMock(spec=OllamaClient)
+    def test_empty_text(self, llm: StubLLM) -> None:
         extractor = TaskExtractor(llm)
         result = extractor.extract("")
         assert result.tasks == []
         assert result.incomplete_items == []
         llm.generate.assert_not_called()
 
-    def test_whitespace_text(self) -> None:
-        llm = MagicMock(spec=OllamaClient)
+    def test_whitespace_text(self, llm: StubLLM) -> None:
         extractor = TaskExtractor(llm)
         result = extractor.extract("   \n  ")
         assert result.tasks == []
         llm.generate.assert_not_called()
 
+    def test_filler_text(self, llm: StubLLM) -> None:
+        extractor = TaskExtractor(llm)
+        result = extractor.extract("Okay, thanks.")
+        assert result.tasks == []
+        llm.generate.assert_not_called()
+
 
 class TestTaskExtractorExtraction:
-    def test_single_task(self) -> None:
-        llm = MagicMock(spec=OllamaClient)
-        llm.generate.return_value = _make_llm_response(json.dumps({
-            "tasks": [{
-                "description": "Call Bob about the project",
-                "people": ["Bob"],
-                "due_date": "2025-01-15",
-                "source_quote": "need to call Bob about the project",
-                "urgency": "high",
-            }],
-            "incomplete_items": [],
-        }))
+    def test_single_task(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response(_SINGLE_TASK_JSON)
 
         extractor = TaskExtractor(llm)
         result = extractor.extract("I need to call Bob about the project by next Wednesday")
@@ -83,27 +137,8 @@ class TestTaskExtractorExtraction:
         assert task.due_date == "2025-01-15"
         assert task.urgency == "high"
 
-    def test_multiple_tasks(self) -> None:
-        llm = MagicMock(spec=OllamaClient)
-        llm.generate.return_value = _make_llm_response(json.dumps({
-            "tasks": [
-                {
-                    "description": "Send report to Alice",
-                    "people": ["Alice"],
-                    "due_date": None,
-                    "source_quote": "send the report to Alice",
-                    "urgency": "medium",
-                },
-                {
-                    "description": "Book restaurant for dinner",
-                    "people": [],
-                    "due_date": "2025-01-20",
-                    "source_quote": "book a restaurant",
-                    "urgency": "low",
-                },
-            ],
-            "incomplete_items": [],
-        }))
+    def test_multiple_tasks(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response(_MULTI_TASK_JSON)
 
         extractor = TaskExtractor(llm)
         result = extractor.extract("I need to send the report to Alice and book a restaurant")
@@ -112,8 +147,7 @@ class TestTaskExtractorExtraction:
         assert result.tasks[0].description == "Send report to Alice"
         assert result.tasks[1].description == "Book restaurant for dinner"
 
-    def test_no_tasks_found(self) -> None:
-        llm = MagicMock(spec=OllamaClient)
+    def test_no_tasks_found(self, llm: StubLLM) -> None:
         llm.generate.return_value = _make_llm_response(
             '{"tasks": [], "incomplete_items": []}'
         )
@@ -124,21 +158,8 @@ class TestTaskExtractorExtraction:
         assert len(result.tasks) == 0
         assert len(result.incomplete_items) == 0
 
-    def test_with_incomplete_items(self) -> None:
-        llm = MagicMock(spec=OllamaClient)
-        llm.generate.return_value = _make_llm_response(json.dumps({
-            "tasks": [{
-                "description": "Order something from Amazon",
-                "people": [],
-                "due_date": None,
-                "source_quote": "order that thing from Amazon",
-                "urgency": "low",
-            }],
-            "incomplete_items": [{
-                "description": "Amazon order",
-                "missing": "What specific item to order",
-            }],
-        }))
+    def test_with_incomplete_items(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response(_INCOMPLETE_ITEMS_JSON)
 
         extractor = TaskExtractor(llm)
         result = extractor.extract("Don't forget to order that thing from Amazon")
@@ -147,8 +168,7 @@ class TestTaskExtractorExtraction:
         assert len(result.incomplete_items) == 1
         assert result.incomplete_items[0].missing == "What specific item to order"
 
-    def test_code_block_response(self) -> None:
-        llm = MagicMock(spec=OllamaClient)
+    def test_code_block_response(self, llm: StubLLM) -> None:
         llm.generate.return_value = _make_llm_response(
             '```json\n{"tasks": [{"description": "Buy milk", "people": [], '
             '"due_date": null, "source_quote": "buy milk", "urgency": "low"}], '
@@ -161,18 +181,8 @@ class TestTaskExtractorExtraction:
         assert len(result.tasks) == 1
         assert result.tasks[0].description == "Buy milk"
 
-    def test_empty_description_filtered(self) -> None:
-        llm = MagicMock(spec=OllamaClient)
-        llm.generate.return_value = _make_llm_response(json.dumps({
-            "tasks": [
-                {"description": "", "people": [], "urgency": "low"},
-                {"description": "Valid task", "people": [], "urgency": "medium"},
-            ],
-            "incomplete_items": [
-                {"description": "", "missing": "everything"},
-                {"description": "Valid incomplete", "missing": "details"},
-            ],
-        }))
+    def test_empty_description_filtered(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response(_EMPTY_DESCRIPTIONS_JSON)
 
         extractor = TaskExtractor(llm)
         result = extractor.extract("some conversation")
@@ -184,9 +194,9 @@ class TestTaskExtractorExtraction:
 
 
 class TestTaskExtractorErrors:
-    def test_connection_error(self) -> None:
-        llm = MagicMock(spec=OllamaClient)
-        llm.generate.side_effect = ConnectionError("refused")
+    @pytest.mark.parametrize("error", [ConnectionError("refused"), RuntimeError("timeout")])
+    def test_llm_error(self, llm: StubLLM, error: Exception) -> None:
+        llm.generate.side_effect = error
 
         extractor = TaskExtractor(llm)
         result = extractor.extract("some text")
@@ -194,17 +204,7 @@ class TestTaskExtractorErrors:
         assert result.tasks == []
         assert result.incomplete_items == []
 
-    def test_runtime_error(self) -> None:
-        llm = MagicMock(spec=OllamaClient)
-        llm.generate.side_effect = RuntimeError("timeout")
-
-        extractor = TaskExtractor(llm)
-        result = extractor.extract("some text")
-
-        assert result.tasks == []
-
-    def test_malformed_json(self) -> None:
-        llm = MagicMock(spec=OllamaClient)
+    def test_malformed_json(self, llm: StubLLM) -> None:
         llm.generate.return_value = _make_llm_response("This is not valid JSON at all")
 
         extractor = TaskExtractor(llm)
@@ -213,11 +213,8 @@ class TestTaskExtractorErrors:
         assert result.tasks == []
         assert result.incomplete_items == []
 
-    def test_missing_fields_use_defaults(self) -> None:
-        llm = MagicMock(spec=OllamaClient)
-        llm.generate.return_value = _make_llm_response(json.dumps({
-            "tasks": [{"description": "Minimal task"}],
-        }))
+    def test_missing_fields_use_defaults(self, llm: StubLLM) -> None:
+        llm.generate.return_value = _make_llm_response(_MINIMAL_TASK_JSON)
 
         extractor = TaskExtractor(llm)
         result = extractor.extract("do the thing")
@@ -2,10 +2,15 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import logging
+import queue
+import secrets
 import sqlite3
-import uuid
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -14,6 +19,126 @@ logger = logging.getLogger(__name__)
 
 SCHEMA_PATH = Path(__file__).parent / "schema.sql"
 
+# Applied to file-backed databases after WAL is enabled. With WAL,
+# synchronous=NORMAL only fsyncs at checkpoints rather than every commit.
+# The raised autocheckpoint mark (pages, default 1000) keeps commits from
+# stalling on checkpoints; checkpoint() is run explicitly when quiet instead.
+_TUNING_PRAGMAS = """
+PRAGMA synchronous=NORMAL;
+PRAGMA wal_autocheckpoint=10000;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-65536;
+PRAGMA busy_timeout=5000;
+PRAGMA cache_spill=OFF;
+"""
+
+# Prepared statements kept by the sqlite3 module per connection
+_STATEMENT_CACHE_SIZE = 64
+
+# Read-only connections opened alongside the writer for file databases.
+# Under WAL they read a committed snapshot without waiting on the writer.
+_READER_POOL_SIZE = 4
+
+# --- SQL ---
+# Every statement is a module constant, so each call site passes the same
+# text and hits the connection's prepared-statement cache.
+
+_SQL_INSERT_TASK = """INSERT INTO tasks (id, description, status, created_at, due_at, next_remind_at,
+    obsidian_path, source, context, is_private)
+    VALUES (?, ?, 'pending', ?, ?, ?, ?, ?, ?, ?)"""
+_SQL_GET_TASK = "SELECT * FROM tasks WHERE id = ?"
+_SQL_PENDING_TASKS = (
+    "SELECT * FROM tasks WHERE status IN ('pending', 'reminded', 'overdue') ORDER BY due_at"
+)
+_SQL_PENDING_TASKS_PUBLIC = (
+    "SELECT * FROM tasks WHERE status IN ('pending', 'reminded', 'overdue') "
+    "AND is_private = FALSE ORDER BY due_at"
+)
+_SQL_TASKS_NEEDING_REMINDER = """SELECT * FROM tasks WHERE status IN ('pending', 'reminded')
+    AND next_remind_at IS NOT NULL AND next_remind_at <= ?
+    AND is_private = FALSE ORDER BY next_remind_at"""
+_SQL_UPDATE_TASK_STATUS = "UPDATE tasks SET status = ? WHERE id = ?"
+_SQL_UPDATE_TASK_REMINDER_COUNTED = (
+    "UPDATE tasks SET next_remind_at = ?, remind_count = remind_count + 1 WHERE id = ?"
+)
+_SQL_UPDATE_TASK_REMINDER = "UPDATE tasks SET next_remind_at = ? WHERE id = ?"
+
+_SQL_INSERT_HEARTBEAT = """INSERT INTO heartbeat_queue (scheduled_at, content_type, content, priority, is_private)
+    VALUES (?, ?, ?, ?, ?)"""
+_SQL_PENDING_HEARTBEATS = """SELECT * FROM heartbeat_queue
+    WHERE delivered_at IS NULL AND scheduled_at <= ?
+    ORDER BY priority, scheduled_at"""
+_SQL_PENDING_HEARTBEATS_PUBLIC = """SELECT * FROM heartbeat_queue
+    WHERE delivered_at IS NULL AND scheduled_at <= ? AND is_private = FALSE
+    ORDER BY priority, scheduled_at"""
+_SQL_MARK_HEARTBEAT_DELIVERED = "UPDATE heartbeat_queue SET delivered_at = ? WHERE id = ?"
+
+# Updates in place; INSERT OR REPLACE would delete and re-insert the row
+_SQL_UPSERT_DEVICE_STATE = """INSERT INTO device_state
+    (device_id, device_type, last_seen, battery_percent, audio_quality_avg, mode, headphones_connected)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(device_id) DO UPDATE SET
+    device_type = excluded.device_type,
+    last_seen = excluded.last_seen,
+    battery_percent = excluded.battery_percent,
+    audio_quality_avg = excluded.audio_quality_avg,
+    mode = excluded.mode,
+    headphones_connected = excluded.headphones_connected"""
+_SQL_GET_DEVICE_STATE = "SELECT * FROM device_state WHERE device_id = ?"
+
+_SQL_INSERT_PROCESSING_LOG = """INSERT INTO processing_log (audio_quality, transcription_confidence, action_taken, notes)
+    VALUES (?, ?, ?, ?)"""
+
+_SQL_UPSERT_DAILY_METRICS = """INSERT INTO agent_metrics (date, tasks_created, tasks_completed,
+    heartbeats_delivered, transcription_failures, avg_audio_quality)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(date) DO UPDATE SET
+    tasks_created = tasks_created + excluded.tasks_created,
+    tasks_completed = tasks_completed + excluded.tasks_completed,
+    heartbeats_delivered = heartbeats_delivered + excluded.heartbeats_delivered,
+    transcription_failures = transcription_failures + excluded.transcription_failures,
+    avg_audio_quality = COALESCE(excluded.avg_audio_quality, avg_audio_quality)"""
+_SQL_GET_DAILY_METRICS = "SELECT * FROM agent_metrics WHERE date = ?"
+
+
+class _DictRowFactory:
+    """Row factory that builds plain dicts, resolving column names once per query.
+
+    sqlite3 hands every row the same cursor.description tuple, so the
+    column-name tuple is cached against it instead of rebuilt per row.
+    """
+
+    def __init__(self) -> None:
+        # (description, column names), swapped as one tuple so concurrent
+        # cursors never see a mismatched pair
+        self._cached: tuple[Any, tuple[str, ...]] = (None, ())
+
+    def __call__(self, cursor: sqlite3.Cursor, row: tuple[Any, ...]) -> dict[str, Any]:
+        description = cursor.description
+        cached = self._cached
+        if cached[0] is not description:
+            cached = (description, tuple(column[0] for column in description))
+            self._cached = cached
+        return dict(zip(cached[1], row))
+
+
+@functools.cache
+def _schema_sql() -> str:
+    """schema.sql, read once per process and shared by every connect()."""
+    return SCHEMA_PATH.read_text()
+
+
+def _encode_content(content: dict[str, Any] | str) -> bytes | str:
+    """Heartbeat content as stored: text as-is, structured content as JSON bytes.
+
+    The BLOB storage class marks a row as JSON, so reads can tell the two
+    apart without a format column and only parse when asked.
+    """
+    if isinstance(content, dict):
+        return json.dumps(content, separators=(",", ":")).encode("utf-8")
+    return content
+
 
 class DatabaseClient:
     """SQLite client for Sotto operational database.
@@ -24,27 +149,191 @@ class DatabaseClient:
     def __init__(self, db_path: str = ":memory:") -> None:
         self._db_path = db_path
         self._conn: sqlite3.Connection | None = None
+        self._readers: queue.Queue[sqlite3.Connection] | None = None
+        # Explicit transaction state; the lock keeps other threads' writes
+        # from landing inside (or committing) a transaction they don't own
+        self._tx_lock = threading.RLock()
+        self._tx_depth = 0
+        self._tx_owner: int | None = None
+        # Timestamp shared by every write in the open transaction, taken lazily
+        self._tx_now: datetime | None = None
 
     def connect(self) -> None:
-        """Connect to the database and initialize schema."""
-        self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
-        self._conn.row_factory = sqlite3.Row
+        """Connect to the database and initialize schema.
+
+        Opens the single writer connection and, for file databases, a pool
+        of read-only connections. An in-memory database is private to its
+        connection, so there the writer serves reads too.
+        """
+        self._conn = self._open_connection()
         self._conn.execute("PRAGMA journal_mode=WAL")
+        if self._db_path != ":memory:":
+            self._conn.executescript(_TUNING_PRAGMAS)
         self._conn.execute("PRAGMA foreign_keys=ON")
         self._initialize_schema()
+
+        if self._db_path != ":memory:":
+            self._readers = queue.Queue()
+            for _ in range(_READER_POOL_SIZE):
+                reader = self._open_connection()
+                reader.executescript(_TUNING_PRAGMAS)
+                reader.execute("PRAGMA query_only=ON")
+                self._readers.put(reader)
         logger.info("Database connected: %s", self._db_path)
 
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a connection in autocommit mode with dict rows.
+
+        Transactions are always begun explicitly (see transaction()), so
+        the sqlite3 module's implicit BEGIN is switched off.
+        """
+        conn = sqlite3.connect(
+            self._db_path,
+            check_same_thread=False,
+            cached_statements=_STATEMENT_CACHE_SIZE,
+            isolation_level=None,
+        )
+        conn.row_factory = _DictRowFactory()
+        return conn
+
     def close(self) -> None:
-        """Close the database connection."""
+        """Close every pooled reader, then checkpoint and close the writer."""
+        if self._readers is not None:
+            while not self._readers.empty():
+                self._readers.get_nowait().close()
+            self._readers = None
         if self._conn:
+            self.optimize()
+            self.checkpoint(truncate=True)
             self._conn.close()
             self._conn = None
 
     def _initialize_schema(self) -> None:
         """Create tables from schema file."""
-        schema = SCHEMA_PATH.read_text()
-        self._conn.executescript(schema)
-        self._conn.commit()
+        self._conn.executescript(_schema_sql())
+
+    def optimize(self) -> None:
+        """Let SQLite refresh query-planner statistics where they are stale.
+
+        Cheap when nothing changed; call periodically on long-lived
+        connections as well as at close.
+        """
+        try:
+            self.connection.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            logger.warning("PRAGMA optimize failed: %s", e)
+
+    def checkpoint(self, truncate: bool = False) -> None:
+        """Copy WAL content back into the database file.
+
+        A PASSIVE checkpoint never waits on readers or writers. TRUNCATE
+        waits for them and then resets the WAL file to zero bytes, so it
+        belongs at quiet times such as shutdown or overnight maintenance.
+        """
+        if self._db_path == ":memory:":
+            return
+        mode = "TRUNCATE" if truncate else "PASSIVE"
+        try:
+            with self._tx_lock:
+                self.connection.execute(f"PRAGMA wal_checkpoint({mode})")
+        except sqlite3.Error as e:
+            logger.warning("WAL checkpoint (%s) failed: %s", mode, e)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Group writes into one transaction, committed once on exit.
+
+        Mutators called inside the block join it rather than committing
+        on their own. Nested blocks join the outermost transaction. Any
+        exception rolls the whole transaction back.
+        """
+        with self._tx_lock:
+            conn = self.connection
+            if self._tx_depth == 0:
+                conn.execute("BEGIN IMMEDIATE")
+                self._tx_owner = threading.get_ident()
+            self._tx_depth += 1
+            try:
+                yield conn
+            except BaseException:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    self._end_transaction()
+                    conn.rollback()
+                raise
+            self._tx_depth -= 1
+            if self._tx_depth == 0:
+                self._end_transaction()
+                conn.commit()
+
+    def _end_transaction(self) -> None:
+        """Forget the state of the transaction being closed."""
+        self._tx_owner = None
+        self._tx_now = None
+
+    def _now(self) -> datetime:
+        """Current UTC time, fixed for the duration of a transaction.
+
+        Writes grouped into one transaction share a single timestamp, so
+        bulk paths don't read the clock once per row. Other threads get
+        a fresh reading.
+        """
+        if self._tx_owner != threading.get_ident():
+            return datetime.now(timezone.utc)
+        if self._tx_now is None:
+            self._tx_now = datetime.now(timezone.utc)
+        return self._tx_now
+
+    def _now_iso(self) -> str:
+        """ISO-8601 form of _now()."""
+        return self._now().isoformat()
+
+    def _write(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        """Execute a modifying statement on the writer connection.
+
+        Outside transaction() the statement commits on its own. The
+        transaction lock keeps it from landing inside another thread's
+        explicit transaction.
+
+        The sqlite3 module keeps an LRU of prepared statements keyed on
+        the SQL text (sized by _STATEMENT_CACHE_SIZE), so routing every
+        query through constant SQL strings means each is parsed once.
+        """
+        with self._tx_lock:
+            return self.connection.execute(sql, params)
+
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for a query.
+
+        Uses a pooled reader when there is one. Inside its own transaction
+        a thread reads through the writer, so it sees its uncommitted writes.
+        """
+        if self._readers is None or self._tx_owner == threading.get_ident():
+            yield self.connection
+            return
+        reader = self._readers.get()
+        try:
+            yield reader
+        finally:
+            self._readers.put(reader)
+
+    def _fetchone(self, sql: str, params: Sequence[Any] = ()) -> dict[str, Any] | None:
+        with self._read() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def _fetchall(self, sql: str, params: Sequence[Any] = ()) -> list[dict[str, Any]]:
+        """Run a query and return every row as a dict.
+
+        Rows are fetched as plain tuples and turned into dicts in one
+        comprehension, which skips the per-row call into the row factory.
+        """
+        with self._read() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(sql, params)
+            names = tuple(column[0] for column in cursor.description)
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
 
     @property
     def connection(self) -> sqlite3.Connection:
@@ -69,66 +358,68 @@ class DatabaseClient:
         Returns:
             The generated task ID.
         """
-        task_id = str(uuid.uuid4())[:8]
-        now = datetime.now(timezone.utc).isoformat()
+        task_id = secrets.token_hex(4)
+        now = self._now_iso()
 
-        self.connection.execute(
-            """INSERT INTO tasks (id, description, status, created_at, due_at, next_remind_at,
-               obsidian_path, source, context, is_private)
-               VALUES (?, ?, 'pending', ?, ?, ?, ?, ?, ?, ?)""",
+        self._write(
+            _SQL_INSERT_TASK,
             (task_id, description, now, due_at, next_remind_at, obsidian_path, source, context, is_private),
         )
-        self.connection.commit()
         logger.info("Task created: %s - %s", task_id, description[:50])
         return task_id
 
+    def create_tasks(self, tasks: Iterable[dict[str, Any]]) -> list[str]:
+        """Create several tasks in one transaction.
+
+        Args:
+            tasks: Dicts with the keyword arguments of create_task.
+
+        Returns:
+            The generated task IDs, in input order.
+        """
+        now = self._now_iso()
+        rows = [
+            (
+                secrets.token_hex(4),
+                task["description"],
+                now,
+                task.get("due_at"),
+                task.get("next_remind_at"),
+                task.get("obsidian_path"),
+                task.get("source", "conversation"),
+                task.get("context", ""),
+                task.get("is_private", False),
+            )
+            for task in tasks
+        ]
+        with self.transaction() as conn:
+            conn.executemany(_SQL_INSERT_TASK, rows)
+        logger.info("Tasks created: %d", len(rows))
+        return [row[0] for row in rows]
+
     def get_task(self, task_id: str) -> dict[str, Any] | None:
         """Get a task by ID."""
-        row = self.connection.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
-        return dict(row) if row else None
+        return self._fetchone(_SQL_GET_TASK, (task_id,))
 
     def get_pending_tasks(self, include_private: bool = False) -> list[dict[str, Any]]:
         """Get all pending/reminded tasks."""
-        if include_private:
-            rows = self.connection.execute(
-                "SELECT * FROM tasks WHERE status IN ('pending', 'reminded', 'overdue') ORDER BY due_at"
-            ).fetchall()
-        else:
-            rows = self.connection.execute(
-                "SELECT * FROM tasks WHERE status IN ('pending', 'reminded', 'overdue') AND is_private = FALSE ORDER BY due_at"
-            ).fetchall()
-        return [dict(r) for r in rows]
+        sql = _SQL_PENDING_TASKS if include_private else _SQL_PENDING_TASKS_PUBLIC
+        return self._fetchall(sql)
 
     def get_tasks_needing_reminder(self, current_time: str | None = None) -> list[dict[str, Any]]:
         """Get tasks whose next_remind_at has passed."""
         if current_time is None:
-            current_time = datetime.now(timezone.utc).isoformat()
-        rows = self.connection.execute(
-            """SELECT * FROM tasks WHERE status IN ('pending', 'reminded')
-               AND next_remind_at IS NOT NULL AND next_remind_at <= ?
-               AND is_private = FALSE ORDER BY next_remind_at""",
-            (current_time,),
-        ).fetchall()
-        return [dict(r) for r in rows]
+            current_time = self._now_iso()
+        return self._fetchall(_SQL_TASKS_NEEDING_REMINDER, (current_time,))
 
     def update_task_status(self, task_id: str, status: str) -> None:
         """Update a task's status."""
-        self.connection.execute("UPDATE tasks SET status = ? WHERE id = ?", (status, task_id))
-        self.connection.commit()
+        self._write(_SQL_UPDATE_TASK_STATUS, (status, task_id))
 
     def update_task_reminder(self, task_id: str, next_remind_at: str, increment_count: bool = True) -> None:
         """Update a task's next reminder time."""
-        if increment_count:
-            self.connection.execute(
-                "UPDATE tasks SET next_remind_at = ?, remind_count = remind_count + 1 WHERE id = ?",
-                (next_remind_at, task_id),
-            )
-        else:
-            self.connection.execute(
-                "UPDATE tasks SET next_remind_at = ? WHERE id = ?",
-                (next_remind_at, task_id),
-            )
-        self.connection.commit()
+        sql = _SQL_UPDATE_TASK_REMINDER_COUNTED if increment_count else _SQL_UPDATE_TASK_REMINDER
+        self._write(sql, (next_remind_at, task_id))
 
     def complete_task(self, task_id: str) -> None:
         """Mark a task as completed."""
@@ -150,46 +441,61 @@ class DatabaseClient:
         Returns:
             The queue item ID.
         """
-        if isinstance(content, dict):
-            content = json.dumps(content)
-
-        cursor = self.connection.execute(
-            """INSERT INTO heartbeat_queue (scheduled_at, content_type, content, priority, is_private)
-               VALUES (?, ?, ?, ?, ?)""",
-            (scheduled_at, content_type, content, priority, is_private),
+        cursor = self._write(
+            _SQL_INSERT_HEARTBEAT,
+            (scheduled_at, content_type, _encode_content(content), priority, is_private),
         )
-        self.connection.commit()
         return cursor.lastrowid
 
-    def get_pending_heartbeats(self, current_time: str | None = None, include_private: bool = False) -> list[dict[str, Any]]:
-        """Get heartbeat items ready for delivery."""
+    def queue_heartbeats_bulk(self, items: Iterable[dict[str, Any]]) -> int:
+        """Add several heartbeat items in one transaction.
+
+        Args:
+            items: Dicts with the keyword arguments of queue_heartbeat.
+
+        Returns:
+            Number of items queued.
+        """
+        rows = [
+            (
+                item["scheduled_at"],
+                item["content_type"],
+                _encode_content(item["content"]),
+                item.get("priority", 5),
+                item.get("is_private", False),
+            )
+            for item in items
+        ]
+        with self.transaction() as conn:
+            conn.executemany(_SQL_INSERT_HEARTBEAT, rows)
+        return len(rows)
+
+    def get_pending_heartbeats(
+        self,
+        current_time: str | None = None,
+        include_private: bool = False,
+        parse_content: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Get heartbeat items ready for delivery.
+
+        Structured content comes back as JSON bytes, text content as str.
+        With parse_content, the JSON is decoded back into a dict.
+        """
         if current_time is None:
-            current_time = datetime.now(timezone.utc).isoformat()
-
-        if include_private:
-            rows = self.connection.execute(
-                """SELECT * FROM heartbeat_queue
-                   WHERE delivered_at IS NULL AND scheduled_at <= ?
-                   ORDER BY priority, scheduled_at""",
-                (current_time,),
-            ).fetchall()
-        else:
-            rows = self.connection.execute(
-                """SELECT * FROM heartbeat_queue
-                   WHERE delivered_at IS NULL AND scheduled_at <= ? AND is_private = FALSE
-                   ORDER BY priority, scheduled_at""",
-                (current_time,),
-            ).fetchall()
-        return [dict(r) for r in rows]
+            current_time = self._now_iso()
+
+        sql = _SQL_PENDING_HEARTBEATS if include_private else _SQL_PENDING_HEARTBEATS_PUBLIC
+        rows = self._fetchall(sql, (current_time,))
+        if parse_content:
+            for row in rows:
+                if isinstance(row["content"], bytes):
+                    row["content"] = json.loads(row["content"])
+        return rows
 
     def mark_heartbeat_delivered(self, heartbeat_id: int) -> None:
         """Mark a heartbeat item as delivered."""
-        now = datetime.now(timezone.utc).isoformat()
-        self.connection.execute(
-            "UPDATE heartbeat_queue SET delivered_at = ? WHERE id = ?",
-            (now, heartbeat_id),
-        )
-        self.connection.commit()
+        now = self._now_iso()
+        self._write(_SQL_MARK_HEARTBEAT_DELIVERED, (now, heartbeat_id))
 
     # --- Device State Operations ---
 
@@ -203,19 +509,15 @@ class DatabaseClient:
         audio_quality_avg: float | None = None,
     ) -> None:
         """Update or insert device state."""
-        now = datetime.now(timezone.utc).isoformat()
-        self.connection.execute(
-            """INSERT OR REPLACE INTO device_state
-               (device_id, device_type, last_seen, battery_percent, audio_quality_avg, mode, headphones_connected)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        now = self._now_iso()
+        self._write(
+            _SQL_UPSERT_DEVICE_STATE,
             (device_id, device_type, now, battery_percent, audio_quality_avg, mode, headphones_connected),
         )
-        self.connection.commit()
 
     def get_device_state(self, device_id: str) -> dict[str, Any] | None:
         """Get a device's current state."""
-        row = self.connection.execute("SELECT * FROM device_state WHERE device_id = ?", (device_id,)).fetchone()
-        return dict(row) if row else None
+        return self._fetchone(_SQL_GET_DEVICE_STATE, (device_id,))
 
     # --- Processing Log Operations ---
 
@@ -227,14 +529,34 @@ class DatabaseClient:
         notes: str = "",
     ) -> int:
         """Log a processing event."""
-        cursor = self.connection.execute(
-            """INSERT INTO processing_log (audio_quality, transcription_confidence, action_taken, notes)
-               VALUES (?, ?, ?, ?)""",
+        cursor = self._write(
+            _SQL_INSERT_PROCESSING_LOG,
             (audio_quality, transcription_confidence, action_taken, notes),
         )
-        self.connection.commit()
         return cursor.lastrowid
 
+    def log_processing_bulk(self, entries: Iterable[dict[str, Any]]) -> int:
+        """Log several processing events in one transaction.
+
+        Args:
+            entries: Dicts with the keyword arguments of log_processing.
+
+        Returns:
+            Number of events logged.
+        """
+        rows = [
+            (
+                entry.get("audio_quality"),
+                entry.get("transcription_confidence"),
+                entry.get("action_taken", "discarded"),
+                entry.get("notes", ""),
+            )
+            for entry in entries
+        ]
+        with self.transaction() as conn:
+            conn.executemany(_SQL_INSERT_PROCESSING_LOG, rows)
+        return len(rows)
+
     # --- Agent Metrics Operations ---
 
     def update_daily_metrics(
@@ -248,23 +570,13 @@ class DatabaseClient:
     ) -> None:
         """Update or create daily agent metrics."""
         if date is None:
-            date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-
-        self.connection.execute(
-            """INSERT INTO agent_metrics (date, tasks_created, tasks_completed,
-               heartbeats_delivered, transcription_failures, avg_audio_quality)
-               VALUES (?, ?, ?, ?, ?, ?)
-               ON CONFLICT(date) DO UPDATE SET
-               tasks_created = tasks_created + excluded.tasks_created,
-               tasks_completed = tasks_completed + excluded.tasks_completed,
-               heartbeats_delivered = heartbeats_delivered + excluded.heartbeats_delivered,
-               transcription_failures = transcription_failures + excluded.transcription_failures,
-               avg_audio_quality = COALESCE(excluded.avg_audio_quality, avg_audio_quality)""",
+            date = self._now().strftime("%Y-%m-%d")
+
+        self._write(
+            _SQL_UPSERT_DAILY_METRICS,
             (date, tasks_created, tasks_completed, heartbeats_delivered, transcription_failures, avg_audio_quality),
         )
-        self.connection.commit()
 
     def get_daily_metrics(self, date: str) -> dict[str, Any] | None:
         """Get metrics for a specific date."""
-        row = self.connection.execute("SELECT * FROM agent_metrics WHERE date = ?", (date,)).fetchone()
-        return dict(row) if row else None
+        return self._fetchone(_SQL_GET_DAILY_METRICS, (date,))
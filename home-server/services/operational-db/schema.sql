@@ -15,8 +15,11 @@ CREATE TABLE IF NOT EXISTS tasks (
     is_private BOOLEAN DEFAULT FALSE
 );
 
+-- Append-only queues key on the plain rowid alias. Without AUTOINCREMENT
+-- SQLite skips the sqlite_sequence update on every insert; the trade-off is
+-- that the id of the newest row can be reused if that row is deleted.
 CREATE TABLE IF NOT EXISTS heartbeat_queue (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    id INTEGER PRIMARY KEY,
     scheduled_at TIMESTAMP NOT NULL,
     delivered_at TIMESTAMP,
     content_type TEXT CHECK(content_type IN ('task_reminder', 'calendar', 'email', 'alert', 'briefing')),
@@ -36,7 +39,7 @@ CREATE TABLE IF NOT EXISTS device_state (
 );
 
 CREATE TABLE IF NOT EXISTS processing_log (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    id INTEGER PRIMARY KEY,
     timestamp TIMESTAMP NOT NULL DEFAULT (datetime('now')),
     audio_quality FLOAT,
     transcription_confidence FLOAT,
@@ -61,3 +64,11 @@ CREATE INDEX IF NOT EXISTS idx_tasks_due ON tasks(due_at);
 CREATE INDEX IF NOT EXISTS idx_heartbeat_scheduled ON heartbeat_queue(scheduled_at);
 CREATE INDEX IF NOT EXISTS idx_heartbeat_delivered ON heartbeat_queue(delivered_at);
 CREATE INDEX IF NOT EXISTS idx_processing_log_timestamp ON processing_log(timestamp);
+
+-- Partial indexes covering exactly the rows the polling queries read
+CREATE INDEX IF NOT EXISTS idx_tasks_reminder_due ON tasks(next_remind_at)
+    WHERE status IN ('pending', 'reminded') AND is_private = FALSE;
+CREATE INDEX IF NOT EXISTS idx_tasks_open_due ON tasks(due_at)
+    WHERE status IN ('pending', 'reminded', 'overdue');
+CREATE INDEX IF NOT EXISTS idx_heartbeat_pending ON heartbeat_queue(priority, scheduled_at)
+    WHERE delivered_at IS NULL;
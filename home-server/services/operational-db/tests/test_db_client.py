@@ -3,7 +3,12 @@
 from __future__ import annotations
 
 import json
+import sqlite3
+import threading
+from collections.abc import Iterator
 from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
@@ -31,11 +36,58 @@ class TestConnection:
         assert "processing_log" in table_names
         assert "agent_metrics" in table_names
 
+    def test_no_autoincrement_sequence(self, db: DatabaseClient) -> None:
+        db.queue_heartbeat("2026-02-19T07:00:00Z", "briefing", "Test")
+        db.log_processing(action_taken="discarded")
+        tables = db.connection.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'sqlite_sequence'"
+        ).fetchall()
+        assert tables == []
+
     def test_connection_property_raises_when_not_connected(self) -> None:
         client = DatabaseClient(":memory:")
         with pytest.raises(RuntimeError, match="not connected"):
             _ = client.connection
 
+    def test_file_database_tuned(self, tmp_path: Path) -> None:
+        client = DatabaseClient(str(tmp_path / "sotto.db"))
+        client.connect()
+        try:
+            conn = client.connection
+            assert conn.execute("PRAGMA journal_mode").fetchone()["journal_mode"] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()["synchronous"] == 1  # NORMAL
+            assert conn.execute("PRAGMA temp_store").fetchone()["temp_store"] == 2  # MEMORY
+            assert conn.execute("PRAGMA busy_timeout").fetchone()["timeout"] == 5000
+            assert conn.execute("PRAGMA cache_spill").fetchone()["cache_spill"] == 0
+            assert conn.execute("PRAGMA wal_autocheckpoint").fetchone()["wal_autocheckpoint"] == 10000
+        finally:
+            client.close()
+
+    def test_checkpoint_truncates_wal(self, tmp_path: Path) -> None:
+        path = tmp_path / "sotto.db"
+        client = DatabaseClient(str(path))
+        client.connect()
+        try:
+            client.create_task("Task", source="manual")
+            client.checkpoint()
+            assert Path(f"{path}-wal").stat().st_size > 0
+            client.checkpoint(truncate=True)
+            assert Path(f"{path}-wal").stat().st_size == 0
+        finally:
+            client.close()
+
+    def test_rows_are_plain_dicts(self, db: DatabaseClient) -> None:
+        task_id = db.create_task("Task", source="manual")
+        task = db.get_task(task_id)
+        assert type(task) is dict
+        assert db.get_pending_tasks() == [task]
+
+    def test_optimize(self, db: DatabaseClient) -> None:
+        statements: list[str] = []
+        db.connection.set_trace_callback(statements.append)
+        db.optimize()
+        assert statements == ["PRAGMA optimize"]
+
 
 class TestTasks:
     def test_create_task(self, db: DatabaseClient) -> None:
@@ -107,6 +159,32 @@ class TestTasks:
         task = db.get_task(task_id)
         assert task["due_at"] == "2026-02-22T00:00:00Z"
 
+    def test_create_tasks(self, db: DatabaseClient) -> None:
+        task_ids = db.create_tasks([
+            {"description": "Task 1", "source": "conversation", "due_at": "2026-02-22T00:00:00Z"},
+            {"description": "Task 2", "is_private": True},
+        ])
+        assert len(task_ids) == 2
+        assert len(set(task_ids)) == 2
+        assert db.get_task(task_ids[0])["due_at"] == "2026-02-22T00:00:00Z"
+        assert db.get_task(task_ids[1])["is_private"] == 1
+        assert db.get_task(task_ids[1])["source"] == "conversation"
+
+    def test_reminder_poll_uses_partial_index(self, db: DatabaseClient) -> None:
+        for i in range(200):
+            task_id = db.create_task(f"Task {i}", source="manual", next_remind_at="2026-02-19T09:00:00Z")
+            if i % 10:
+                db.complete_task(task_id)
+        db.connection.execute("ANALYZE")
+
+        plan = db.connection.execute(
+            """EXPLAIN QUERY PLAN SELECT * FROM tasks WHERE status IN ('pending', 'reminded')
+               AND next_remind_at IS NOT NULL AND next_remind_at <= ?
+               AND is_private = FALSE ORDER BY next_remind_at""",
+            ("2026-02-19T10:00:00Z",),
+        ).fetchall()
+        assert any("idx_tasks_reminder_due" in row["detail"] for row in plan)
+
 
 class TestHeartbeatQueue:
     def test_queue_heartbeat(self, db: DatabaseClient) -> None:
@@ -149,6 +227,30 @@ class TestHeartbeatQueue:
         assert len(public) == 1
         assert public[0]["content"] == "Public"
 
+    def test_queue_heartbeats_bulk(self, db: DatabaseClient) -> None:
+        count = db.queue_heartbeats_bulk([
+            {"scheduled_at": "2026-02-19T07:00:00Z", "content_type": "briefing",
+             "content": {"items": ["weather"]}, "priority": 3},
+            {"scheduled_at": "2026-02-19T07:05:00Z", "content_type": "alert", "content": "Alert"},
+        ])
+        assert count == 2
+
+        pending = db.get_pending_heartbeats("2026-02-19T08:00:00Z", parse_content=True)
+        assert [p["content"] for p in pending] == [{"items": ["weather"]}, "Alert"]
+        assert pending[1]["priority"] == 5
+
+    def test_structured_content_stored_as_json_bytes(self, db: DatabaseClient) -> None:
+        db.queue_heartbeat("2026-02-19T07:00:00Z", "briefing", {"items": ["weather"]})
+        db.queue_heartbeat("2026-02-19T07:01:00Z", "alert", "Plain text")
+
+        raw = db.get_pending_heartbeats("2026-02-19T08:00:00Z")
+        assert raw[0]["content"] == b'{"items":["weather"]}'
+        assert raw[1]["content"] == "Plain text"
+
+        parsed = db.get_pending_heartbeats("2026-02-19T08:00:00Z", parse_content=True)
+        assert parsed[0]["content"] == {"items": ["weather"]}
+        assert parsed[1]["content"] == "Plain text"
+
 
 class TestDeviceState:
     def test_update_device_state(self, db: DatabaseClient) -> None:
@@ -164,6 +266,18 @@ class TestDeviceState:
         state = db.get_device_state("sotto-phone")
         assert state["mode"] == "quiet"
 
+    def test_update_keeps_row_in_place(self, db: DatabaseClient) -> None:
+        db.update_device_state("sotto-phone", mode="active")
+        db.update_device_state("sotto-pi", device_type="pi5")
+        rowid = db.connection.execute(
+            "SELECT rowid FROM device_state WHERE device_id = ?", ("sotto-phone",)
+        ).fetchone()["rowid"]
+        db.update_device_state("sotto-phone", mode="quiet")
+        row = db.connection.execute(
+            "SELECT rowid FROM device_state WHERE device_id = ?", ("sotto-phone",)
+        ).fetchone()
+        assert row["rowid"] == rowid
+
     def test_get_nonexistent_device(self, db: DatabaseClient) -> None:
         state = db.get_device_state("nonexistent")
         assert state is None
@@ -183,6 +297,99 @@ class TestProcessingLog:
         log_id = db.log_processing(action_taken="discarded")
         assert log_id is not None
 
+    def test_log_processing_bulk(self, db: DatabaseClient) -> None:
+        count = db.log_processing_bulk([
+            {"action_taken": "task_created", "transcription_confidence": 0.9},
+            {"action_taken": "discarded"},
+        ])
+        assert count == 2
+        rows = db.connection.execute("SELECT action_taken FROM processing_log ORDER BY id").fetchall()
+        assert [r["action_taken"] for r in rows] == ["task_created", "discarded"]
+
+
+class TestTransaction:
+    def test_commits_once_on_exit(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "sotto.db")
+        db = DatabaseClient(path)
+        db.connect()
+        other = DatabaseClient(path)
+        other.connect()
+        try:
+            with db.transaction():
+                db.create_task("Task", source="manual")
+                db.log_processing(action_taken="task_created")
+                # Not visible to another connection until the block exits
+                assert other.get_pending_tasks() == []
+            assert len(other.get_pending_tasks()) == 1
+        finally:
+            other.close()
+            db.close()
+
+    def test_rolls_back_on_error(self, db: DatabaseClient) -> None:
+        with pytest.raises(ValueError):
+            with db.transaction():
+                db.create_task("Task", source="manual")
+                db.update_daily_metrics(date="2026-02-19", tasks_created=1)
+                raise ValueError("boom")
+        assert db.get_pending_tasks() == []
+        assert db.get_daily_metrics("2026-02-19") is None
+
+    def test_nested_blocks_join_outer(self, db: DatabaseClient) -> None:
+        with pytest.raises(ValueError):
+            with db.transaction():
+                with db.transaction():
+                    db.create_task("Inner", source="manual")
+                raise ValueError("boom")
+        assert db.get_pending_tasks() == []
+
+    def test_writes_share_transaction_timestamp(self, db: DatabaseClient) -> None:
+        with db.transaction():
+            first = db.create_task("First", source="manual")
+            second = db.create_task("Second", source="manual")
+        assert db.get_task(first)["created_at"] == db.get_task(second)["created_at"]
+
+    def test_timestamp_fresh_per_transaction(self, db: DatabaseClient) -> None:
+        first_at = datetime(2026, 2, 19, 9, 0, tzinfo=timezone.utc)
+        second_at = datetime(2026, 2, 19, 9, 5, tzinfo=timezone.utc)
+        with patch("db_client.datetime") as mock_datetime:
+            mock_datetime.now.side_effect = [first_at, second_at]
+            with db.transaction():
+                first = db.create_task("First", source="manual")
+            with db.transaction():
+                second = db.create_task("Second", source="manual")
+        assert db.get_task(first)["created_at"] == first_at.isoformat()
+        assert db.get_task(second)["created_at"] == second_at.isoformat()
+
+
+class TestReaderPool:
+    @pytest.fixture
+    def file_db(self, tmp_path: Path) -> Iterator[DatabaseClient]:
+        client = DatabaseClient(str(tmp_path / "sotto.db"))
+        client.connect()
+        yield client
+        client.close()
+
+    def test_readers_are_query_only(self, file_db: DatabaseClient) -> None:
+        with file_db._read() as conn:
+            assert conn is not file_db.connection
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM tasks")
+
+    def test_reads_see_committed_writes(self, file_db: DatabaseClient) -> None:
+        task_id = file_db.create_task("Task", source="manual")
+        assert file_db.get_task(task_id)["description"] == "Task"
+
+    def test_open_transaction_visible_only_to_owner(self, file_db: DatabaseClient) -> None:
+        seen_elsewhere: list[dict] = []
+        with file_db.transaction():
+            task_id = file_db.create_task("Task", source="manual")
+            assert file_db.get_task(task_id) is not None
+            reader = threading.Thread(target=lambda: seen_elsewhere.extend(file_db.get_pending_tasks()))
+            reader.start()
+            reader.join()
+        assert seen_elsewhere == []
+        assert len(file_db.get_pending_tasks()) == 1
+
 
 class TestAgentMetrics:
     def test_update_daily_metrics(self, db: DatabaseClient) -> None:
@@ -2,21 +2,93 @@
 
 from __future__ import annotations
 
-import base64
-import json
 import logging
 import os
+import queue
 import signal
 import sys
+import threading
 import time
+from dataclasses import dataclass
 from typing import Any
 
+import numpy as np
+import orjson
 import paho.mqtt.client as mqtt
 
-from whisper_engine import WhisperEngine
+from whisper_engine import MAX_CLIP_SECONDS, TranscriptionResult, WhisperEngine
 
 logger = logging.getLogger(__name__)
 
+# Filled buffers waiting for Whisper; the oldest is dropped beyond this
+MAX_PENDING_BUFFERS = 4
+
+# Buffers that arrive within this window of each other share one decode
+MAX_BATCH_SIZE = 4
+BATCH_WINDOW_SECONDS = 0.05
+
+# Byte length of the big-endian header-size prefix on audio messages
+BINARY_HEADER_PREFIX = 4
+
+# Voice activity gate: 16 kHz int16 PCM is judged in 20 ms frames, and a
+# frame counts as speech when its RMS clears the threshold. Quiet rooms sit
+# well under it after the edge noise filter; speech is typically 1000-5000.
+SAMPLE_RATE = 16000
+VAD_FRAME_MS = 20
+SPEECH_RMS_THRESHOLD = 500.0
+
+# Buffers shorter on speech than this are treated as noise and discarded
+MIN_UTTERANCE_MS = 300
+
+# How often the worker looks for sources that stopped sending mid-utterance
+IDLE_CHECK_SECONDS = 0.5
+
+# Audio buffers are fixed slabs holding one Whisper window of PCM; a full
+# slab is transcribed as is
+BUFFER_CAPACITY = SAMPLE_RATE * 2 * MAX_CLIP_SECONDS
+
+
+def decode_audio_message(message: bytes) -> tuple[dict[str, Any], memoryview]:
+    """Split a binary audio message into its JSON envelope and PCM body.
+
+    Messages are a 4-byte big-endian header length, the JSON envelope,
+    then raw PCM. The body is returned as a view, without copying.
+    """
+    header_end = BINARY_HEADER_PREFIX + int.from_bytes(message[:BINARY_HEADER_PREFIX], "big")
+    envelope = orjson.loads(message[BINARY_HEADER_PREFIX:header_end])
+    return envelope, memoryview(message)[header_end:]
+
+
+def speech_duration_ms(audio: bytes | memoryview, sample_rate: int = SAMPLE_RATE) -> int:
+    """Milliseconds of speech in a PCM chunk, by per-frame RMS energy.
+
+    Args:
+        audio: Raw PCM audio bytes (16-bit signed, mono).
+        sample_rate: Sample rate of the audio data.
+    """
+    samples = np.frombuffer(audio, dtype=np.int16)
+    frame_len = sample_rate * VAD_FRAME_MS // 1000
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return 0
+
+    frames = samples[: n_frames * frame_len].reshape(n_frames, frame_len).astype(np.float32)
+    rms = np.sqrt(np.mean(frames**2, axis=1))
+    return int(np.count_nonzero(rms >= SPEECH_RMS_THRESHOLD)) * VAD_FRAME_MS
+
+
+@dataclass
+class UtteranceBuffer:
+    """Audio buffered for one source until it is handed to Whisper."""
+
+    slab: bytearray
+    length: int = 0
+    voiced_length: int = 0  # End of the last chunk with speech
+    duration_ms: int = 0
+    speech_ms: int = 0
+    silence_ms: int = 0  # Trailing silence since the last speech chunk
+    last_chunk_at: float = 0.0  # time.monotonic() when the last chunk arrived
+
 
 class TranscriptionService:
     """MQTT-connected transcription service.
@@ -31,21 +103,40 @@ class TranscriptionService:
         mqtt_port: int = 1883,
         whisper_model: str = "base",
         whisper_device: str = "auto",
+        whisper_compute_type: str = "auto",
+        whisper_cpu_threads: int | None = None,
     ) -> None:
         self._mqtt_host = mqtt_host
         self._mqtt_port = mqtt_port
         self._engine = WhisperEngine(
             model_size=whisper_model,
             device=whisper_device,
+            compute_type=whisper_compute_type,
+            cpu_threads=whisper_cpu_threads,
         )
         self._client = mqtt.Client(
             callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
             client_id="sotto-transcription",
         )
         self._running = False
-        self._audio_buffer: list[bytes] = []
-        self._buffer_duration_ms = 0
-        self._min_buffer_ms = 3000  # Accumulate at least 3s before transcribing
+
+        # Slabs come back to the pool once Whisper is done with them, so
+        # steady streaming reuses a handful of allocations
+        self._free_slabs: queue.SimpleQueue[bytearray] = queue.SimpleQueue()
+
+        # One utterance in progress per source, so devices speaking at the
+        # same time never share a buffer. Only speech counts towards a
+        # flush; leading silence is never buffered.
+        self._buffers: dict[str, UtteranceBuffer] = {}
+        self._buffers_lock = threading.Lock()  # MQTT thread vs idle expiry on the worker
+        self._min_speech_ms = 1500  # Transcribe once this much speech is buffered
+        self._max_silence_ms = 2000  # End of utterance after this much quiet
+
+        # Whisper runs on a worker thread so the MQTT loop never waits on it
+        self._pending: queue.Queue[tuple[str, memoryview] | None] = queue.Queue(
+            maxsize=MAX_PENDING_BUFFERS
+        )
+        self._worker: threading.Thread | None = None
 
     def start(self) -> None:
         """Start the transcription service."""
@@ -59,6 +150,11 @@ class TranscriptionService:
         self._client.on_message = self._on_message
         self._client.connect(self._mqtt_host, self._mqtt_port)
 
+        self._worker = threading.Thread(
+            target=self._transcribe_worker, name="whisper-worker", daemon=True
+        )
+        self._worker.start()
+
         self._running = True
         self._client.loop_forever()
 
@@ -66,6 +162,9 @@ class TranscriptionService:
         """Stop the transcription service."""
         self._running = False
         self._client.disconnect()
+        if self._worker is not None:
+            self._pending.put(None)
+            self._worker.join(timeout=30)
         logger.info("Transcription service stopped")
 
     def _on_connect(self, client: Any, userdata: Any, flags: Any, rc: Any, properties: Any = None) -> None:
@@ -74,61 +173,188 @@ class TranscriptionService:
 
     def _on_message(self, client: Any, userdata: Any, message: mqtt.MQTTMessage) -> None:
         try:
-            data = json.loads(message.payload.decode("utf-8"))
+            data, audio = decode_audio_message(message.payload)
             payload = data.get("payload", {})
 
-            audio_b64 = payload.get("audio_b64", "")
-            if not audio_b64:
+            if not audio:
                 return
 
-            audio_bytes = base64.b64decode(audio_b64)
             duration_ms = payload.get("duration_ms", 0)
+            speech_ms = speech_duration_ms(audio)
 
-            self._audio_buffer.append(audio_bytes)
-            self._buffer_duration_ms += duration_ms
-
-            # Transcribe when we have enough audio
-            if self._buffer_duration_ms >= self._min_buffer_ms:
-                self._process_buffer(data.get("source", "unknown"))
+            source = data.get("source", "unknown")
+            with self._buffers_lock:
+                self._buffer_chunk(source, audio, duration_ms, speech_ms)
 
         except Exception as e:
             logger.error("Error processing audio message: %s", e)
 
-    def _process_buffer(self, source: str) -> None:
-        """Transcribe accumulated audio buffer."""
-        if not self._audio_buffer:
+    def _buffer_chunk(self, source: str, audio: memoryview, duration_ms: int, speech_ms: int) -> None:
+        """Add a chunk to a source's utterance, flushing it when complete.
+
+        Caller holds the buffers lock.
+        """
+        buffer = self._buffers.get(source)
+        if buffer is not None and buffer.length + len(audio) > len(buffer.slab):
+            # A Whisper window's worth is buffered; transcribe it as is
+            self._flush_buffer(source)
+            buffer = None
+
+        if buffer is None:
+            # Silence before any speech never reaches Whisper
+            if not speech_ms:
+                return
+            buffer = self._buffers[source] = UtteranceBuffer(self._take_slab())
+
+        end = buffer.length + len(audio)
+        buffer.slab[buffer.length : end] = audio
+        buffer.length = end
+        if speech_ms:
+            buffer.voiced_length = end
+        buffer.duration_ms += duration_ms
+        buffer.speech_ms += speech_ms
+        buffer.silence_ms = 0 if speech_ms else buffer.silence_ms + duration_ms
+        buffer.last_chunk_at = time.monotonic()
+
+        if buffer.speech_ms >= self._min_speech_ms:
+            self._flush_buffer(source)
+        elif buffer.silence_ms >= self._max_silence_ms:
+            self._end_utterance(source)
+
+    def _expire_idle_buffers(self) -> None:
+        """End utterances from sources that stopped sending chunks.
+
+        A device that disconnects or mutes mid-utterance never sends the
+        silence that would end it, so its buffer is closed once no chunk
+        has arrived for as long as the silence limit.
+        """
+        cutoff = time.monotonic() - self._max_silence_ms / 1000
+        with self._buffers_lock:
+            idle = [source for source, buffer in self._buffers.items() if buffer.last_chunk_at <= cutoff]
+            for source in idle:
+                self._end_utterance(source)
+
+    def _end_utterance(self, source: str) -> None:
+        """Close a source's utterance before the speech threshold.
+
+        A short utterance is kept; what was only a blip of noise is
+        dropped. Caller holds the buffers lock.
+        """
+        if self._buffers[source].speech_ms >= MIN_UTTERANCE_MS:
+            self._flush_buffer(source)
+        else:
+            self._free_slabs.put(self._buffers.pop(source).slab)
+
+    def _flush_buffer(self, source: str) -> None:
+        """Queue a source's buffered utterance for transcription."""
+        buffer = self._buffers.pop(source, None)
+        if buffer is None:
             return
 
-        combined = b"".join(self._audio_buffer)
-        self._audio_buffer.clear()
-        self._buffer_duration_ms = 0
+        # Hand the filled slab off as a view, so the audio is never copied
+        # on its way to the engine; trailing silence is left out
+        audio = memoryview(buffer.slab)[: buffer.voiced_length]
 
         try:
-            result = self._engine.transcribe(combined)
-
-            if result.text.strip():
-                logger.info("Transcription: %s (conf=%.2f)", result.text[:100], result.confidence)
-
-                # Publish transcription result
-                self._client.publish(
-                    "sotto/audio/transcription",
-                    json.dumps({
-                        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-                        "source": source,
-                        "type": "transcription",
-                        "payload": {
-                            "text": result.text,
-                            "language": result.language,
-                            "confidence": result.confidence,
-                            "duration_seconds": result.duration_seconds,
-                            "segments": result.segments,
-                        },
-                    }),
-                    qos=1,
-                )
+            self._pending.put_nowait((source, audio))
+        except queue.Full:
+            # Whisper is falling behind; stale audio is the least useful
+            try:
+                dropped = self._pending.get_nowait()
+                if dropped is not None:
+                    self._free_slabs.put(dropped[1].obj)
+                logger.warning("Transcription backlog full, dropped oldest buffer")
+            except queue.Empty:
+                pass
+            self._pending.put_nowait((source, audio))
+
+    def _take_slab(self) -> bytearray:
+        """A free audio slab from the pool, allocating one if none is free."""
+        try:
+            return self._free_slabs.get_nowait()
+        except queue.Empty:
+            return bytearray(BUFFER_CAPACITY)
+
+    def _transcribe_worker(self) -> None:
+        """Transcribe queued buffers in bursts until a None sentinel is received."""
+        while True:
+            try:
+                item = self._pending.get(timeout=IDLE_CHECK_SECONDS)
+            except queue.Empty:
+                self._expire_idle_buffers()
+                continue
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+
+            # Collect whatever else arrives shortly after the first buffer
+            deadline = time.monotonic() + BATCH_WINDOW_SECONDS
+            while len(batch) < MAX_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            if len(batch) == 1:
+                self._process_audio(*batch[0])
+            else:
+                self._process_batch(batch)
+            for _, audio in batch:
+                self._free_slabs.put(audio.obj)
+
+            if stopping:
+                return
+
+    def _process_audio(self, source: str, audio: memoryview) -> None:
+        """Transcribe one audio buffer and publish the result."""
+        try:
+            self._publish_result(source, self._engine.transcribe(audio))
         except Exception as e:
             logger.error("Transcription failed: %s", e)
 
+    def _process_batch(self, batch: list[tuple[str, memoryview]]) -> None:
+        """Transcribe several buffers in one decode and publish each result."""
+        try:
+            results = self._engine.transcribe_batch([audio for _, audio in batch])
+            for (source, _), result in zip(batch, results):
+                self._publish_result(source, result)
+        except Exception as e:
+            logger.error("Batch transcription of %d buffers failed: %s", len(batch), e)
+
+    def _publish_result(self, source: str, result: TranscriptionResult) -> None:
+        """Publish a non-empty transcription to the agent brain."""
+        # A confidence of 0 means an average log-probability under Whisper's
+        # own -1.0 failure threshold, usually text hallucinated from noise
+        if not result.text or result.text.isspace() or result.confidence <= 0.0:
+            return
+
+        logger.info("Transcription: %s (conf=%.2f)", result.text[:100], result.confidence)
+
+        # orjson encodes straight to the bytes paho sends, which matters
+        # for long segment lists
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        envelope = orjson.dumps({
+            "timestamp": timestamp,
+            "source": source,
+            "type": "transcription",
+            "payload": {
+                "text": result.text,
+                "language": result.language,
+                "confidence": result.confidence,
+                "duration_seconds": result.duration_seconds,
+                "segments": result.segments,
+            },
+        })
+        self._client.publish("sotto/audio/transcription", envelope, qos=1)
+
 
 def main() -> None:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
@@ -138,6 +364,8 @@ def main() -> None:
         mqtt_port=int(os.environ.get("MQTT_PORT", "1883")),
         whisper_model=os.environ.get("WHISPER_MODEL", "base"),
         whisper_device=os.environ.get("WHISPER_DEVICE", "auto"),
+        whisper_compute_type=os.environ.get("WHISPER_COMPUTE_TYPE", "auto"),
+        whisper_cpu_threads=int(os.environ.get("WHISPER_CPU_THREADS", "0")) or None,
     )
 
     def signal_handler(sig: int, frame: Any) -> None:
@@ -2,13 +2,15 @@
 
 from __future__ import annotations
 
-import base64
 import importlib.util
 import json
 import sys
+import threading
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 
 # Import the transcription main module with a unique name to avoid collision
@@ -30,6 +32,45 @@ TranscriptionService = transcription_main.TranscriptionService
 from whisper_engine import TranscriptionResult
 
 
+def _audio_message(envelope: dict, audio: bytes) -> bytes:
+    """Frame an envelope and PCM body the way the edge device does."""
+    header = json.dumps(envelope).encode("utf-8")
+    return len(header).to_bytes(4, "big") + header + audio
+
+
+def _silence(ms: int) -> bytes:
+    """16 kHz int16 PCM of digital silence."""
+    return b"\x00\x00" * (16 * ms)
+
+
+def _speech(ms: int) -> bytes:
+    """16 kHz int16 PCM square wave loud enough to pass the speech gate."""
+    return (np.array([3000, -3000], dtype=np.int16).tobytes()) * (8 * ms)
+
+
+def _buffered(svc: TranscriptionService, source: str = "edge-1") -> bytes:
+    """The audio currently buffered for a source."""
+    buffer = svc._buffers[source]
+    return bytes(buffer.slab[: buffer.length])
+
+
+def _fill(svc: TranscriptionService, audio: bytes, source: str = "edge-1") -> bytearray:
+    """Buffer voiced audio for a source directly, returning its slab."""
+    slab = svc._take_slab()
+    slab[: len(audio)] = audio
+    svc._buffers[source] = transcription_main.UtteranceBuffer(slab, len(audio), len(audio))
+    return slab
+
+
+class TestDecodeAudioMessage:
+    def test_splits_envelope_and_body(self) -> None:
+        envelope, audio = transcription_main.decode_audio_message(
+            _audio_message({"source": "edge-1", "payload": {"duration_ms": 100}}, b"\x01\x02")
+        )
+        assert envelope["payload"]["duration_ms"] == 100
+        assert bytes(audio) == b"\x01\x02"
+
+
 class TestTranscriptionServiceInit:
     @patch("transcription_main.WhisperEngine")
     @patch("transcription_main.mqtt.Client")
@@ -37,8 +78,7 @@ class TestTranscriptionServiceInit:
         svc = TranscriptionService()
         assert svc._mqtt_host == "localhost"
         assert svc._mqtt_port == 1883
-        assert svc._buffer_duration_ms == 0
-        assert svc._audio_buffer == []
+        assert svc._buffers == {}
 
     @patch("transcription_main.WhisperEngine")
     @patch("transcription_main.mqtt.Client")
@@ -62,98 +102,313 @@ class TestTranscriptionServiceOnConnect:
         svc._client.subscribe.assert_called_once_with("sotto/audio/raw", qos=0)
 
 
+class TestSpeechDuration:
+    def test_silence(self) -> None:
+        assert transcription_main.speech_duration_ms(_silence(100)) == 0
+
+    def test_speech(self) -> None:
+        assert transcription_main.speech_duration_ms(_speech(100)) == 100
+
+    def test_counts_only_loud_frames(self) -> None:
+        assert transcription_main.speech_duration_ms(_silence(60) + _speech(40)) == 40
+
+    def test_partial_frame_ignored(self) -> None:
+        assert transcription_main.speech_duration_ms(_speech(10)) == 0
+
+
+def _chunk_message(audio: bytes, duration_ms: int) -> MagicMock:
+    msg = MagicMock()
+    msg.payload = _audio_message({"source": "edge-1", "payload": {"duration_ms": duration_ms}}, audio)
+    return msg
+
+
 class TestTranscriptionServiceOnMessage:
     @patch("transcription_main.WhisperEngine")
     @patch("transcription_main.mqtt.Client")
     def test_buffers_audio(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
         svc = TranscriptionService()
-        svc._min_buffer_ms = 5000  # Set high so it just buffers
 
-        audio = b"\x00\x01\x02\x03"
-        msg = MagicMock()
-        msg.payload = json.dumps({
-            "source": "edge-1",
-            "payload": {
-                "audio_b64": base64.b64encode(audio).decode("ascii"),
-                "duration_ms": 100,
-            },
-        }).encode("utf-8")
+        audio = _speech(100)
+        svc._on_message(None, None, _chunk_message(audio, 100))
 
-        svc._on_message(None, None, msg)
-
-        assert len(svc._audio_buffer) == 1
-        assert svc._buffer_duration_ms == 100
+        assert _buffered(svc) == audio
+        assert svc._buffers["edge-1"].duration_ms == 100
+        assert svc._buffers["edge-1"].speech_ms == 100
+        assert len(svc._buffers["edge-1"].slab) == transcription_main.BUFFER_CAPACITY
 
     @patch("transcription_main.WhisperEngine")
     @patch("transcription_main.mqtt.Client")
     def test_ignores_empty_audio(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
         svc = TranscriptionService()
 
-        msg = MagicMock()
-        msg.payload = json.dumps({
-            "source": "edge-1",
-            "payload": {"audio_b64": "", "duration_ms": 100},
-        }).encode("utf-8")
+        svc._on_message(None, None, _chunk_message(b"", 100))
+
+        assert svc._buffers == {}
+
+    @patch("transcription_main.WhisperEngine")
+    @patch("transcription_main.mqtt.Client")
+    def test_drops_leading_silence(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
+        svc = TranscriptionService()
+
+        svc._on_message(None, None, _chunk_message(_silence(100), 100))
+
+        assert svc._buffers == {}
+
+    @patch("transcription_main.WhisperEngine")
+    @patch("transcription_main.mqtt.Client")
+    def test_keeps_pauses_after_speech(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
+        svc = TranscriptionService()
+
+        svc._on_message(None, None, _chunk_message(_speech(100), 100))
+        svc._on_message(None, None, _chunk_message(_silence(100), 100))
+
+        assert _buffered(svc) == _speech(100) + _silence(100)
+        assert svc._buffers["edge-1"].silence_ms == 100
+
+    @patch("transcription_main.WhisperEngine")
+    @patch("transcription_main.mqtt.Client")
+    def test_sources_buffered_separately(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
+        svc = TranscriptionService()
+        svc._min_speech_ms = 200
+
+        for source, audio in (("edge-1", _speech(100)), ("edge-2", _speech(40)), ("edge-1", _speech(100))):
+            msg = MagicMock()
+            msg.payload = _audio_message({"source": source, "payload": {"duration_ms": 100}}, audio)
+            svc._on_message(None, None, msg)
+
+        assert svc._pending.get_nowait() == ("edge-1", _speech(200))
+        assert _buffered(svc, "edge-2") == _speech(40)
+
+    @patch("transcription_main.WhisperEngine")
+    @patch("transcription_main.mqtt.Client")
+    def test_flush_keeps_pauses_between_speech(
+        self, mock_mqtt: MagicMock, mock_whisper: MagicMock
+    ) -> None:
+        svc = TranscriptionService()
+
+        for chunk in (_speech(100), _silence(100), _speech(100), _silence(100)):
+            svc._on_message(None, None, _chunk_message(chunk, 100))
+        svc._flush_buffer("edge-1")
+
+        assert svc._pending.get_nowait() == ("edge-1", _speech(100) + _silence(100) + _speech(100))
+
+    @patch("transcription_main.WhisperEngine")
+    @patch("transcription_main.mqtt.Client")
+    def test_triggers_processing_at_speech_threshold(
+        self, mock_mqtt: MagicMock, mock_whisper: MagicMock
+    ) -> None:
+        svc = TranscriptionService()
+        svc._min_speech_ms = 200
+
+        audio = _speech(300)
+        svc._on_message(None, None, _chunk_message(audio, 300))
 
-        svc._on_message(None, None, msg)
+        # Buffer is handed to the worker queue, not transcribed inline
+        assert svc._buffers == {}
+        assert svc._pending.get_nowait() == ("edge-1", audio)
+        svc._engine.transcribe.assert_not_called()
+
+    @patch("transcription_main.WhisperEngine")
+    @patch("transcription_main.mqtt.Client")
+    def test_short_utterance_flushed_after_silence(
+        self, mock_mqtt: MagicMock, mock_whisper: MagicMock
+    ) -> None:
+        svc = TranscriptionService()
+        svc._max_silence_ms = 200
 
-        assert len(svc._audio_buffer) == 0
+        svc._on_message(None, None, _chunk_message(_speech(500), 500))
+        svc._on_message(None, None, _chunk_message(_silence(200), 200))
+
+        # The trailing silence that ended the utterance isn't transcribed
+        assert svc._pending.get_nowait() == ("edge-1", _speech(500))
+        assert svc._buffers == {}
 
     @patch("transcription_main.WhisperEngine")
     @patch("transcription_main.mqtt.Client")
-    def test_triggers_processing_at_threshold(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
+    def test_noise_blip_discarded_after_silence(
+        self, mock_mqtt: MagicMock, mock_whisper: MagicMock
+    ) -> None:
         svc = TranscriptionService()
-        svc._min_buffer_ms = 200
+        svc._max_silence_ms = 200
+
+        svc._on_message(None, None, _chunk_message(_speech(40), 40))
+        svc._on_message(None, None, _chunk_message(_silence(200), 200))
 
-        # Mock the engine to return a result
+        assert svc._pending.empty()
+        assert svc._buffers == {}
+        assert svc._free_slabs.qsize() == 1
+
+    @patch("transcription_main.WhisperEngine")
+    @patch("transcription_main.mqtt.Client")
+    def test_flushes_source_that_stops_sending(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
+        svc = TranscriptionService()
+        svc._max_silence_ms = 200
+
+        with patch("transcription_main.time.monotonic", return_value=100.0):
+            svc._on_message(None, None, _chunk_message(_speech(500), 500))
+        with patch("transcription_main.time.monotonic", return_value=100.1):
+            svc._expire_idle_buffers()
+        assert svc._pending.empty()
+
+        with patch("transcription_main.time.monotonic", return_value=100.2):
+            svc._expire_idle_buffers()
+        assert svc._pending.get_nowait() == ("edge-1", _speech(500))
+        assert svc._buffers == {}
+
+    @patch("transcription_main.WhisperEngine")
+    @patch("transcription_main.mqtt.Client")
+    def test_idle_noise_blip_recycled(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
+        svc = TranscriptionService()
+
+        with patch("transcription_main.time.monotonic", return_value=100.0):
+            svc._on_message(None, None, _chunk_message(_speech(40), 40))
+        with patch("transcription_main.time.monotonic", return_value=110.0):
+            svc._expire_idle_buffers()
+
+        assert svc._pending.empty()
+        assert svc._buffers == {}
+        assert svc._free_slabs.qsize() == 1
+
+    @patch("transcription_main.WhisperEngine")
+    @patch("transcription_main.mqtt.Client")
+    def test_worker_expires_idle_buffers_while_waiting(
+        self, mock_mqtt: MagicMock, mock_whisper: MagicMock
+    ) -> None:
+        svc = TranscriptionService()
         svc._engine.transcribe.return_value = TranscriptionResult(
-            text="Hello",
-            language="en",
-            confidence=0.9,
-            segments=[],
-            duration_seconds=0.3,
+            text="Hello", language="en", confidence=0.9, segments=[], duration_seconds=0.5,
         )
+        svc._max_silence_ms = 50
+        svc._on_message(None, None, _chunk_message(_speech(500), 500))
+        assert svc._pending.empty()
+
+        with patch.object(transcription_main, "IDLE_CHECK_SECONDS", 0.01):
+            worker = threading.Thread(target=svc._transcribe_worker)
+            worker.start()
+            for _ in range(500):
+                if svc._engine.transcribe.called:
+                    break
+                time.sleep(0.01)
+            svc._pending.put(None)
+            worker.join(timeout=5)
 
-        audio = b"\x00" * 100
-        msg = MagicMock()
-        msg.payload = json.dumps({
-            "source": "edge-1",
-            "payload": {
-                "audio_b64": base64.b64encode(audio).decode("ascii"),
-                "duration_ms": 300,
-            },
-        }).encode("utf-8")
-
-        svc._on_message(None, None, msg)
-
-        # Buffer should be cleared after processing
-        assert svc._audio_buffer == []
-        assert svc._buffer_duration_ms == 0
         svc._engine.transcribe.assert_called_once()
+        svc._client.publish.assert_called_once()
+
+    @patch("transcription_main.WhisperEngine")
+    @patch("transcription_main.mqtt.Client")
+    def test_flushes_when_slab_full(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
+        svc = TranscriptionService()
+        svc._min_speech_ms = 10**9
+        chunk = _speech(1000)
+        chunks = transcription_main.BUFFER_CAPACITY // len(chunk)
+
+        for _ in range(chunks + 1):
+            svc._on_message(None, None, _chunk_message(chunk, 1000))
+
+        assert svc._pending.get_nowait() == ("edge-1", chunk * chunks)
+        assert _buffered(svc) == chunk
+
+
+class TestTranscriptionServiceFlushBuffer:
+    @patch("transcription_main.WhisperEngine")
+    @patch("transcription_main.mqtt.Client")
+    def test_empty_buffer_noop(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
+        svc = TranscriptionService()
+
+        svc._flush_buffer("edge-1")
 
+        assert svc._pending.empty()
 
-class TestTranscriptionServiceProcessBuffer:
+    @patch("transcription_main.WhisperEngine")
+    @patch("transcription_main.mqtt.Client")
+    def test_drops_oldest_when_backlog_full(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
+        svc = TranscriptionService()
+        for i in range(transcription_main.MAX_PENDING_BUFFERS + 1):
+            _fill(svc, bytes([i]))
+            svc._flush_buffer("edge-1")
+
+        queued = [svc._pending.get_nowait()[1] for _ in range(svc._pending.qsize())]
+        assert queued == [bytes([i]) for i in range(1, transcription_main.MAX_PENDING_BUFFERS + 1)]
+        # The dropped buffer's slab went back to the pool
+        assert svc._free_slabs.qsize() == 1
+
+    @patch("transcription_main.WhisperEngine")
+    @patch("transcription_main.mqtt.Client")
+    def test_worker_transcribes_until_sentinel(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
+        svc = TranscriptionService()
+        svc._engine.transcribe.return_value = TranscriptionResult(
+            text="Hello", language="en", confidence=0.9, segments=[], duration_seconds=0.3,
+        )
+        _fill(svc, b"\x00" * 100)
+        svc._flush_buffer("edge-1")
+        svc._pending.put(None)
+
+        svc._transcribe_worker()
+
+        svc._engine.transcribe.assert_called_once()
+        svc._client.publish.assert_called_once()
+
+    @patch("transcription_main.WhisperEngine")
+    @patch("transcription_main.mqtt.Client")
+    def test_worker_recycles_slabs(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
+        svc = TranscriptionService()
+        svc._engine.transcribe.return_value = TranscriptionResult(
+            text="", language="en", confidence=0.0, segments=[], duration_seconds=0.0,
+        )
+        first = _fill(svc, b"\x01" * 10)
+        svc._flush_buffer("edge-1")
+        svc._pending.put(None)
+
+        svc._transcribe_worker()
+
+        assert _fill(svc, b"\x02" * 10) is first
+
+    @patch("transcription_main.WhisperEngine")
+    @patch("transcription_main.mqtt.Client")
+    def test_worker_batches_queued_buffers(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
+        svc = TranscriptionService()
+        svc._engine.transcribe_batch.return_value = [
+            TranscriptionResult(text="One", language="en", confidence=0.9, segments=[], duration_seconds=1.0),
+            TranscriptionResult(text="Two", language="en", confidence=0.9, segments=[], duration_seconds=1.0),
+        ]
+        svc._pending.put(("edge-1", memoryview(bytearray(b"\x01" * 10))))
+        svc._pending.put(("edge-2", memoryview(bytearray(b"\x02" * 10))))
+        svc._pending.put(None)
+
+        svc._transcribe_worker()
+
+        svc._engine.transcribe_batch.assert_called_once_with(
+            [bytearray(b"\x01" * 10), bytearray(b"\x02" * 10)]
+        )
+        svc._engine.transcribe.assert_not_called()
+        sources = [json.loads(c[0][1])["source"] for c in svc._client.publish.call_args_list]
+        assert sources == ["edge-1", "edge-2"]
+
+
+class TestTranscriptionServiceProcessAudio:
     @patch("transcription_main.WhisperEngine")
     @patch("transcription_main.mqtt.Client")
     def test_publishes_transcription(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
         svc = TranscriptionService()
-        svc._audio_buffer = [b"\x00" * 100, b"\x01" * 100]
-        svc._buffer_duration_ms = 3000
+        audio = bytearray(b"\x00" * 100 + b"\x01" * 100)
 
         svc._engine.transcribe.return_value = TranscriptionResult(
             text="Test transcription",
             language="en",
             confidence=0.85,
-            segments=[{"start": 0, "end": 1, "text": "Test transcription"}],
+            segments=[(0.0, 1.0, "Test transcription", -0.2)],
             duration_seconds=3.0,
         )
 
-        svc._process_buffer("edge-1")
+        svc._process_audio("edge-1", audio)
 
         svc._client.publish.assert_called_once()
+        assert svc._engine.transcribe.call_args[0][0] is audio
         call_args = svc._client.publish.call_args
         assert call_args[0][0] == "sotto/audio/transcription"
 
+        assert isinstance(call_args[0][1], bytes)
         published = json.loads(call_args[0][1])
         assert published["source"] == "edge-1"
         assert published["type"] == "transcription"
@@ -162,28 +417,32 @@ class TestTranscriptionServiceProcessBuffer:
 
     @patch("transcription_main.WhisperEngine")
     @patch("transcription_main.mqtt.Client")
-    def test_empty_buffer_noop(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
+    def test_empty_transcription_not_published(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
         svc = TranscriptionService()
-        svc._audio_buffer = []
 
-        svc._process_buffer("edge-1")
+        svc._engine.transcribe.return_value = TranscriptionResult(
+            text="   ",
+            language="en",
+            confidence=0.1,
+            segments=[],
+            duration_seconds=0.1,
+        )
 
-        svc._engine.transcribe.assert_not_called()
+        svc._process_audio("edge-1", bytearray(b"\x00" * 100))
+        svc._client.publish.assert_not_called()
 
     @patch("transcription_main.WhisperEngine")
     @patch("transcription_main.mqtt.Client")
-    def test_empty_transcription_not_published(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
+    def test_zero_confidence_not_published(self, mock_mqtt: MagicMock, mock_whisper: MagicMock) -> None:
         svc = TranscriptionService()
-        svc._audio_buffer = [b"\x00" * 100]
-        svc._buffer_duration_ms = 3000
 
         svc._engine.transcribe.return_value = TranscriptionResult(
-            text="   ",
+            text="Thank you for watching.",
             language="en",
-            confidence=0.1,
+            confidence=0.0,
             segments=[],
-            duration_seconds=0.1,
+            duration_seconds=1.0,
         )
 
-        svc._process_buffer("edge-1")
+        svc._process_audio("edge-1", bytearray(b"\x00" * 100))
         svc._client.publish.assert_not_called()
@@ -12,7 +12,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from whisper_engine import TranscriptionResult, WhisperEngine
+from whisper_engine import EMPTY_RESULT, TranscriptionResult, WhisperEngine
 
 
 class TestTranscriptionResult:
@@ -21,7 +21,7 @@ class TestTranscriptionResult:
             text="hello world",
             language="en",
             confidence=0.95,
-            segments=[{"start": 0, "end": 1, "text": "hello world"}],
+            segments=[(0.0, 1.0, "hello world", -0.1)],
             duration_seconds=1.5,
         )
         assert r.text == "hello world"
@@ -47,6 +47,15 @@ class TestWhisperEngineInit:
         assert engine._compute_type == "float16"
 
 
+def _libraries(model_class: MagicMock | None = None, cuda_devices: int = 0) -> dict[str, MagicMock]:
+    """Stand-ins for faster-whisper and CTranslate2, for patching sys.modules."""
+    ctranslate2 = MagicMock()
+    ctranslate2.get_cuda_device_count.return_value = cuda_devices
+    faster_whisper = MagicMock(WhisperModel=model_class or MagicMock())
+    faster_whisper.BatchedInferencePipeline.return_value.transcribe.return_value = (iter([]), MagicMock())
+    return {"faster_whisper": faster_whisper, "ctranslate2": ctranslate2}
+
+
 class TestWhisperEngineInitialize:
     @patch("whisper_engine.WhisperModel", create=True)
     def test_successful_init(self, mock_model_class: MagicMock) -> None:
@@ -54,11 +63,80 @@ class TestWhisperEngineInitialize:
         mock_model = MagicMock()
         mock_model_class.return_value = mock_model
 
-        with patch.dict("sys.modules", {"faster_whisper": MagicMock(WhisperModel=mock_model_class)}):
+        with patch.dict("sys.modules", _libraries(mock_model_class)):
             engine = WhisperEngine()
             engine.initialize()
             assert engine.is_ready is True
 
+    @pytest.mark.parametrize(("device", "expected"), [("cuda", 16), ("cpu", 4)])
+    def test_batch_size_follows_device(self, device: str, expected: int) -> None:
+        mock_model_class = MagicMock()
+        mock_model_class.return_value.model.device = device
+
+        with patch.dict("sys.modules", _libraries(mock_model_class)):
+            engine = WhisperEngine()
+            engine.initialize()
+        assert engine._batch_size == expected
+
+    def test_explicit_batch_size_kept(self) -> None:
+        with patch.dict("sys.modules", _libraries()):
+            engine = WhisperEngine(batch_size=8)
+            engine.initialize()
+        assert engine._batch_size == 8
+
+    @pytest.mark.parametrize(("cuda_devices", "expected"), [(0, "int8"), (1, "int8_float16")])
+    def test_auto_compute_type_quantizes(self, cuda_devices: int, expected: str) -> None:
+        libraries = _libraries(cuda_devices=cuda_devices)
+        with patch.dict("sys.modules", libraries):
+            engine = WhisperEngine()
+            engine.initialize()
+        model_class = libraries["faster_whisper"].WhisperModel
+        assert model_class.call_args.kwargs["compute_type"] == expected
+
+    def test_explicit_device_skips_cuda_probe(self) -> None:
+        libraries = _libraries(cuda_devices=1)
+        with patch.dict("sys.modules", libraries):
+            engine = WhisperEngine(device="cpu")
+            engine.initialize()
+        assert engine._compute_type == "int8"
+        libraries["ctranslate2"].get_cuda_device_count.assert_not_called()
+
+    def test_cpu_threads_leave_one_core_free(self) -> None:
+        libraries = _libraries()
+        with patch.dict("sys.modules", libraries), patch(
+            "whisper_engine.os.sched_getaffinity", return_value={0, 1, 2, 3}
+        ):
+            WhisperEngine().initialize()
+        assert libraries["faster_whisper"].WhisperModel.call_args.kwargs["cpu_threads"] == 3
+
+    def test_explicit_cpu_threads_kept(self) -> None:
+        libraries = _libraries()
+        with patch.dict("sys.modules", libraries):
+            WhisperEngine(cpu_threads=2).initialize()
+        assert libraries["faster_whisper"].WhisperModel.call_args.kwargs["cpu_threads"] == 2
+
+    def test_explicit_compute_type_kept(self) -> None:
+        with patch.dict("sys.modules", _libraries()):
+            engine = WhisperEngine(compute_type="float16")
+            engine.initialize()
+        assert engine._compute_type == "float16"
+
+    def test_warms_up_with_one_silent_clip(self) -> None:
+        libraries = _libraries()
+        pipeline = libraries["faster_whisper"].BatchedInferencePipeline.return_value
+        segments = MagicMock()
+        segments.__iter__.return_value = iter([])
+        pipeline.transcribe.return_value = (segments, MagicMock())
+
+        with patch.dict("sys.modules", libraries):
+            WhisperEngine().initialize()
+
+        pipeline.transcribe.assert_called_once()
+        audio = pipeline.transcribe.call_args[0][0]
+        assert not audio.any()
+        assert pipeline.transcribe.call_args.kwargs["vad_filter"] is False
+        segments.__iter__.assert_called_once()  # segments are lazy until consumed
+
     def test_not_ready_before_init(self) -> None:
         engine = WhisperEngine()
         assert engine.is_ready is False
@@ -73,9 +151,9 @@ class TestWhisperEngineTranscribe:
     def test_transcribe_success(self) -> None:
         engine = WhisperEngine()
 
-        # Create mock model
-        mock_model = MagicMock()
-        engine._model = mock_model
+        # Create mock batched pipeline
+        mock_pipeline = MagicMock()
+        engine._batched = mock_pipeline
 
         # Create mock segment
         mock_segment = MagicMock()
@@ -87,7 +165,7 @@ class TestWhisperEngineTranscribe:
         mock_info = MagicMock()
         mock_info.language = "en"
 
-        mock_model.transcribe.return_value = (iter([mock_segment]), mock_info)
+        mock_pipeline.transcribe.return_value = (iter([mock_segment]), mock_info)
 
         # Create 1 second of silence (16-bit PCM, 16kHz)
         audio_data = np.zeros(16000, dtype=np.int16).tobytes()
@@ -98,27 +176,30 @@ class TestWhisperEngineTranscribe:
         assert result.confidence > 0
         assert len(result.segments) == 1
         assert result.duration_seconds == 1.0
+        kwargs = mock_pipeline.transcribe.call_args.kwargs
+        assert kwargs["vad_filter"] is True
+        assert kwargs["batch_size"] == engine._batch_size
 
     def test_transcribe_empty_audio(self) -> None:
         engine = WhisperEngine()
-        mock_model = MagicMock()
-        engine._model = mock_model
+        mock_pipeline = MagicMock()
+        engine._batched = mock_pipeline
 
         mock_info = MagicMock()
         mock_info.language = "en"
-        mock_model.transcribe.return_value = (iter([]), mock_info)
+        mock_pipeline.transcribe.return_value = (iter([]), mock_info)
 
         audio_data = np.zeros(1600, dtype=np.int16).tobytes()
         result = engine.transcribe(audio_data)
 
+        assert result is EMPTY_RESULT
         assert result.text == ""
-        # With no segments, avg_logprob is 0, so confidence = min(max(1.0 + 0, 0), 1.0) = 1.0
-        assert result.confidence == 1.0
+        assert result.confidence == 0.0
 
     def test_transcribe_multiple_segments(self) -> None:
         engine = WhisperEngine()
-        mock_model = MagicMock()
-        engine._model = mock_model
+        mock_pipeline = MagicMock()
+        engine._batched = mock_pipeline
 
         seg1 = MagicMock()
         seg1.start, seg1.end, seg1.text, seg1.avg_logprob = 0.0, 1.0, "First part", -0.1
@@ -128,14 +209,104 @@ class TestWhisperEngineTranscribe:
 
         mock_info = MagicMock()
         mock_info.language = "en"
-        mock_model.transcribe.return_value = (iter([seg1, seg2]), mock_info)
+        mock_pipeline.transcribe.return_value = (iter([seg1, seg2]), mock_info)
 
         audio_data = np.zeros(32000, dtype=np.int16).tobytes()
         result = engine.transcribe(audio_data)
 
         assert "First part" in result.text
         assert "second part" in result.text
-        assert len(result.segments) == 2
+        assert result.segments == [(0.0, 1.0, "First part", -0.1), (1.0, 2.5, "second part", -0.3)]
+        assert result.confidence == 0.8
+
+
+def _segment(start: float, end: float, text: str) -> MagicMock:
+    segment = MagicMock()
+    segment.start = start
+    segment.end = end
+    segment.text = text
+    segment.avg_logprob = -0.2
+    return segment
+
+
+class TestWhisperEngineTranscribeBatch:
+    def test_not_initialized(self) -> None:
+        engine = WhisperEngine()
+        with pytest.raises(RuntimeError, match="not initialized"):
+            engine.transcribe_batch([b"\x00" * 100, b"\x00" * 100])
+
+    def test_segments_assigned_to_their_clip(self) -> None:
+        engine = WhisperEngine()
+        engine._model = MagicMock()
+        engine._batched = MagicMock()
+        mock_info = MagicMock()
+        mock_info.language = "en"
+        engine._batched.transcribe.return_value = (
+            iter([_segment(0.1, 0.9, "First"), _segment(1.2, 1.8, "Second"), _segment(1.8, 2.4, "too")]),
+            mock_info,
+        )
+
+        one_second = np.zeros(16000, dtype=np.int16).tobytes()
+        results = engine.transcribe_batch([one_second, one_second + one_second])
+
+        assert [r.text for r in results] == ["First", "Second too"]
+        assert [r.duration_seconds for r in results] == [1.0, 2.0]
+        assert [s[:2] for s in results[0].segments] == [(0.1, 0.9)]
+        assert [s[:2] for s in results[1].segments] == [
+            (pytest.approx(0.2), pytest.approx(0.8)),
+            (pytest.approx(0.8), pytest.approx(1.4)),
+        ]
+        kwargs = engine._batched.transcribe.call_args.kwargs
+        assert kwargs["clip_timestamps"] == [
+            {"start": 0, "end": 16000},
+            {"start": 16000, "end": 48000},
+        ]
+        assert kwargs["batch_size"] == 2
+        engine._model.transcribe.assert_not_called()
+
+    def test_clip_too_long_for_one_window(self) -> None:
+        engine = WhisperEngine()
+        engine._batched = MagicMock()
+        mock_info = MagicMock()
+        mock_info.language = "en"
+        engine._batched.transcribe.side_effect = lambda *a, **kw: (iter([]), mock_info)
+
+        long_clip = np.zeros(31 * 16000, dtype=np.int16).tobytes()
+        results = engine.transcribe_batch([long_clip, b"\x00" * 100])
+
+        # Each buffer is transcribed on its own, VAD-split
+        assert len(results) == 2
+        assert engine._batched.transcribe.call_count == 2
+        assert all(c.kwargs["vad_filter"] for c in engine._batched.transcribe.call_args_list)
+
+
+class TestWhisperEngineFloatBuffer:
+    def test_converts_pcm_into_reused_buffer(self) -> None:
+        engine = WhisperEngine()
+        engine._batched = MagicMock()
+        received: list[np.ndarray] = []
+
+        def fake_transcribe(audio: np.ndarray, **kwargs: object) -> tuple:
+            received.append(audio.copy())
+            return iter([]), MagicMock(language="en")
+
+        engine._batched.transcribe.side_effect = fake_transcribe
+
+        pcm = np.array([0, 16384, -32768, 32767], dtype=np.int16)
+        engine.transcribe(pcm.tobytes())
+        first_buffer = engine._f32_buf
+        engine.transcribe(pcm[:3].tobytes())
+
+        np.testing.assert_array_equal(received[0], pcm.astype(np.float32) / 32768.0)
+        np.testing.assert_array_equal(received[1], pcm[:3].astype(np.float32) / 32768.0)
+        assert engine._f32_buf is first_buffer
+
+    def test_grows_to_power_of_two(self) -> None:
+        engine = WhisperEngine()
+        assert engine._float_buffer(1000).size == 1000
+        assert engine._f32_buf.size == 1024
+        engine._float_buffer(1025)
+        assert engine._f32_buf.size == 2048
 
 
 class TestWhisperEngineTranscribeFile:
@@ -2,14 +2,39 @@
 
 from __future__ import annotations
 
+import bisect
 import logging
+import os
+import threading
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Final
 
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Longest clip Whisper decodes in one window; batched clips must fit in it
+MAX_CLIP_SECONDS = 30
+
+# Speech segments decoded together when batch_size isn't given
+GPU_BATCH_SIZE = 16
+CPU_BATCH_SIZE = 4
+
+# Silero VAD speech probability threshold for splitting a buffer. Audio
+# is already speech-gated upstream, so this is kept permissive.
+VAD_PARAMETERS: dict[str, Any] = {"threshold": 0.1}
+
+# Length of the silent clip decoded once at startup. Whisper pads every
+# clip to a 30 s window, so any length exercises the same shapes.
+WARMUP_SECONDS = 1
+
+# int16 PCM to [-1, 1) float; a power of two, so exact as a multiplier
+_PCM_SCALE = np.float32(1.0 / 32768.0)
+
+
+# One decoded segment: (start, end, text, avg_logprob), times in seconds
+Segment = tuple[float, float, str, float]
+
 
 @dataclass
 class TranscriptionResult:
@@ -18,10 +43,17 @@ class TranscriptionResult:
     text: str
     language: str
     confidence: float
-    segments: list[dict[str, Any]]
+    segments: list[Segment]
     duration_seconds: float
 
 
+# Shared result for audio with no decoded speech, which is most buffers on
+# a quiet stream. Callers must not mutate it.
+EMPTY_RESULT: Final = TranscriptionResult(
+    text="", language="unknown", confidence=0.0, segments=[], duration_seconds=0.0
+)
+
+
 class WhisperEngine:
     """Speech-to-text using faster-whisper.
 
@@ -33,11 +65,20 @@ class WhisperEngine:
         model_size: str = "base",
         device: str = "auto",
         compute_type: str = "auto",
+        batch_size: int | None = None,
+        cpu_threads: int | None = None,
     ) -> None:
         self._model_size = model_size
         self._device = device
         self._compute_type = compute_type
+        self._batch_size = batch_size
+        self._cpu_threads = cpu_threads
         self._model = None
+        self._batched = None
+        # Reused float32 slab for converted audio. The model reads it while
+        # decoding, so the lock is held until a transcription is complete.
+        self._f32_buf: np.ndarray | None = None
+        self._buf_lock = threading.RLock()
 
     def initialize(self) -> None:
         """Load the Whisper model.
@@ -47,18 +88,27 @@ class WhisperEngine:
             RuntimeError: If model loading fails.
         """
         try:
-            from faster_whisper import WhisperModel
+            from faster_whisper import BatchedInferencePipeline, WhisperModel
 
+            if self._compute_type == "auto":
+                self._compute_type = self._default_compute_type()
             self._model = WhisperModel(
                 self._model_size,
                 device=self._device,
                 compute_type=self._compute_type,
+                cpu_threads=self._cpu_threads or _default_cpu_threads(),
             )
+            self._batched = BatchedInferencePipeline(model=self._model)
+            if self._batch_size is None:
+                on_gpu = self._model.model.device == "cuda"
+                self._batch_size = GPU_BATCH_SIZE if on_gpu else CPU_BATCH_SIZE
+            self._warm_up()
             logger.info(
-                "Whisper model loaded: %s (device=%s, compute=%s)",
+                "Whisper model loaded: %s (device=%s, compute=%s, batch=%d)",
                 self._model_size,
                 self._device,
                 self._compute_type,
+                self._batch_size,
             )
         except ImportError:
             logger.error("faster-whisper not installed")
@@ -67,13 +117,44 @@ class WhisperEngine:
             logger.error("Failed to load Whisper model: %s", e)
             raise RuntimeError(f"Whisper model load failed: {e}") from e
 
+    def _default_compute_type(self) -> str:
+        """int8 weights for the device the model will run on.
+
+        CTranslate2's own "auto" keeps float32 weights on CPU; int8 halves
+        memory and roughly doubles speed at no measurable WER cost, and
+        lets large-v3 fit on a 6 GB GPU.
+        """
+        on_gpu = self._device == "cuda"
+        if self._device == "auto":
+            import ctranslate2
+
+            on_gpu = ctranslate2.get_cuda_device_count() > 0
+        return "int8_float16" if on_gpu else "int8"
+
+    def _warm_up(self) -> None:
+        """Decode one silent clip so the first utterance isn't paying for
+        kernel selection and allocator growth."""
+        samples = WARMUP_SECONDS * 16000
+        segments, _ = self._batched.transcribe(
+            np.zeros(samples, dtype=np.float32),
+            beam_size=5,
+            vad_filter=False,
+            clip_timestamps=[{"start": 0, "end": samples}],
+            batch_size=1,
+        )
+        for _ in segments:
+            pass
+
     @property
     def is_ready(self) -> bool:
         return self._model is not None
 
-    def transcribe(self, audio_data: bytes, sample_rate: int = 16000) -> TranscriptionResult:
+    def transcribe(self, audio_data: bytes | bytearray | memoryview, sample_rate: int = 16000) -> TranscriptionResult:
         """Transcribe audio data to text.
 
+        Uses faster-whisper's batched pipeline, so the speech segments VAD
+        finds in the buffer are decoded in parallel rather than in turn.
+
         Args:
             audio_data: Raw PCM audio bytes (16-bit signed, mono).
             sample_rate: Sample rate of the audio data.
@@ -84,49 +165,102 @@ class WhisperEngine:
         Raises:
             RuntimeError: If the model is not loaded.
         """
-        if self._model is None:
+        if self._batched is None:
             raise RuntimeError("Whisper model not initialized. Call initialize() first.")
 
-        # Convert bytes to float32 numpy array
-        audio_array = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
+        pcm = np.frombuffer(audio_data, dtype=np.int16)
+        with self._buf_lock:
+            audio_array = self._float_buffer(len(pcm))
+            np.multiply(pcm, _PCM_SCALE, out=audio_array, casting="unsafe")
+
+            # VAD splits the buffer into speech segments that decode as one batch
+            segments_iter, info = self._batched.transcribe(
+                audio_array,
+                beam_size=5,
+                language=None,  # Auto-detect
+                vad_filter=True,
+                vad_parameters=VAD_PARAMETERS,
+                batch_size=self._batch_size,
+            )
+            segments = list(segments_iter)
 
-        segments_iter, info = self._model.transcribe(
-            audio_array,
-            beam_size=5,
-            language=None,  # Auto-detect
-            vad_filter=False,
-        )
+        return _build_result(segments, info, len(pcm) / sample_rate)
 
-        segments = []
-        full_text_parts = []
-        total_confidence = 0
-        segment_count = 0
+    def transcribe_batch(
+        self, audio_buffers: list[bytes | bytearray | memoryview], sample_rate: int = 16000
+    ) -> list[TranscriptionResult]:
+        """Transcribe several utterances with one batched decode.
 
-        for segment in segments_iter:
-            segments.append({
-                "start": segment.start,
-                "end": segment.end,
-                "text": segment.text,
-                "avg_logprob": segment.avg_logprob,
-            })
-            full_text_parts.append(segment.text)
-            total_confidence += segment.avg_logprob
-            segment_count += 1
+        The buffers are laid end to end and passed as separate clips to
+        faster-whisper's batched pipeline, which runs the encoder and
+        decoder over all clips together. Segments are then assigned back
+        to the buffer whose span contains their start time, and their times
+        rebased to the start of that buffer.
 
-        full_text = " ".join(full_text_parts).strip()
-        avg_confidence = (total_confidence / segment_count) if segment_count > 0 else 0
-        # Convert log prob to a 0-1 scale (rough approximation)
-        confidence_score = min(max(1.0 + avg_confidence, 0.0), 1.0)
+        Language is detected once for the whole batch, so every result
+        carries the same language even when the buffers come from
+        different speakers.
 
-        duration = len(audio_array) / sample_rate
+        Args:
+            audio_buffers: Raw PCM audio buffers (16-bit signed, mono).
+            sample_rate: Sample rate of the audio data.
 
-        return TranscriptionResult(
-            text=full_text,
-            language=info.language if info else "unknown",
-            confidence=round(confidence_score, 3),
-            segments=segments,
-            duration_seconds=round(duration, 2),
-        )
+        Returns:
+            One TranscriptionResult per buffer, in the same order.
+
+        Raises:
+            RuntimeError: If the model is not loaded.
+        """
+        if self._batched is None:
+            raise RuntimeError("Whisper model not initialized. Call initialize() first.")
+
+        clips = [np.frombuffer(audio, dtype=np.int16) for audio in audio_buffers]
+        if len(clips) == 1 or any(len(c) > MAX_CLIP_SECONDS * sample_rate for c in clips):
+            return [self.transcribe(audio, sample_rate) for audio in audio_buffers]
+
+        starts: list[int] = []
+        clip_timestamps: list[dict[str, int]] = []
+        offset = 0
+        for clip in clips:
+            starts.append(offset)
+            clip_timestamps.append({"start": offset, "end": offset + len(clip)})
+            offset += len(clip)
+
+        per_clip: list[list[Any]] = [[] for _ in clips]
+        with self._buf_lock:
+            audio_array = self._float_buffer(offset)
+            for clip, span in zip(clips, clip_timestamps):
+                np.multiply(
+                    clip, _PCM_SCALE, out=audio_array[span["start"] : span["end"]], casting="unsafe"
+                )
+
+            segments_iter, info = self._batched.transcribe(
+                audio_array,
+                beam_size=5,
+                language=None,  # Auto-detect
+                vad_filter=False,
+                clip_timestamps=clip_timestamps,
+                batch_size=len(clips),
+            )
+            for segment in segments_iter:
+                index = bisect.bisect_right(starts, int(segment.start * sample_rate)) - 1
+                per_clip[max(index, 0)].append(segment)
+
+        return [
+            _build_result(segments, info, len(clip) / sample_rate, start / sample_rate)
+            for segments, clip, start in zip(per_clip, clips, starts)
+        ]
+
+    def _float_buffer(self, n_samples: int) -> np.ndarray:
+        """View of the first n_samples of the reusable float32 slab.
+
+        The slab grows to the next power of two when too small, so a
+        stream of similar-sized buffers settles on one allocation.
+        Caller holds _buf_lock.
+        """
+        if self._f32_buf is None or self._f32_buf.size < n_samples:
+            self._f32_buf = np.empty(1 << max(n_samples - 1, 0).bit_length(), dtype=np.float32)
+        return self._f32_buf[:n_samples]
 
     def transcribe_file(self, file_path: str) -> TranscriptionResult:
         """Transcribe an audio file.
@@ -146,15 +280,11 @@ class WhisperEngine:
             vad_filter=True,
         )
 
-        segments = []
+        segments: list[Segment] = []
         full_text_parts = []
 
         for segment in segments_iter:
-            segments.append({
-                "start": segment.start,
-                "end": segment.end,
-                "text": segment.text,
-            })
+            segments.append((segment.start, segment.end, segment.text, segment.avg_logprob))
             full_text_parts.append(segment.text)
 
         return TranscriptionResult(
@@ -164,3 +294,44 @@ class WhisperEngine:
             segments=segments,
             duration_seconds=0.0,
         )
+
+
+def _default_cpu_threads() -> int:
+    """CTranslate2 threads: every core this process may run on but one.
+
+    The spare core keeps the MQTT network thread and the rest of the
+    service responsive while a decode saturates the others. Counting the
+    affinity mask rather than os.cpu_count() respects a container cpuset.
+    """
+    return max(1, len(os.sched_getaffinity(0)) - 1)
+
+
+def _build_result(
+    segments: list[Any], info: Any, duration: float, offset: float = 0.0
+) -> TranscriptionResult:
+    """Collect decoded segments into a TranscriptionResult in one pass.
+
+    Segment times are shifted back by offset seconds, for clips that were
+    decoded as part of a longer array.
+    """
+    if not segments:
+        return EMPTY_RESULT
+
+    rows: list[Segment] = []
+    texts: list[str] = []
+    total_logprob = 0.0
+    for segment in segments:
+        rows.append((segment.start - offset, segment.end - offset, segment.text, segment.avg_logprob))
+        texts.append(segment.text)
+        total_logprob += segment.avg_logprob
+    avg_confidence = total_logprob / len(rows) if rows else 0
+    # Convert log prob to a 0-1 scale (rough approximation)
+    confidence_score = min(max(1.0 + avg_confidence, 0.0), 1.0)
+
+    return TranscriptionResult(
+        text=" ".join(texts).strip(),
+        language=info.language if info else "unknown",
+        confidence=round(confidence_score, 3),
+        segments=rows,
+        duration_seconds=round(duration, 2),
+    )
@@ -2,21 +2,95 @@
 
 from __future__ import annotations
 
-import base64
-import json
+import heapq
+import itertools
 import logging
 import os
+import secrets
 import signal
 import sys
+import threading
 import time
 from typing import Any
 
+import orjson
 import paho.mqtt.client as mqtt
 
-from piper_engine import PiperEngine
+from piper_engine import PiperEngine, SpeechCache
 
 logger = logging.getLogger(__name__)
 
+# Replies waiting for Piper; beyond this the least urgent is dropped
+MAX_PENDING_TEXTS = 8
+
+# Reply priority when the message gives none (1 = most urgent, 10 = least)
+DEFAULT_PRIORITY = 5
+
+# Byte length of the big-endian header-size prefix on binary messages
+BINARY_HEADER_PREFIX = 4
+
+
+def encode_audio_message(envelope: dict[str, Any], audio: bytes) -> bytes:
+    """Frame an envelope and PCM body as a binary audio message.
+
+    Messages are a 4-byte big-endian header length, the JSON envelope,
+    then raw PCM, so audio goes over the wire without base64.
+    """
+    header = orjson.dumps(envelope)
+    return len(header).to_bytes(BINARY_HEADER_PREFIX, "big") + header + audio
+
+
+class ReplyBacklog:
+    """Bounded queue of replies waiting for Piper, most urgent first.
+
+    Replies of equal priority come out in arrival order. When full, the
+    least urgent reply is dropped (the oldest among equals), or the new
+    one if it is less urgent than everything queued. Once closed, get()
+    drains what is left and then returns None.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        # (priority, arrival, text); the arrival counter keeps texts out of comparisons
+        self._heap: list[tuple[int, int, str]] = []
+        self._arrivals = itertools.count()
+        self._closed = False
+        self._ready = threading.Condition()
+
+    def put(self, priority: int, text: str) -> None:
+        """Queue a reply, making room by dropping the least urgent if full."""
+        item = (priority, next(self._arrivals), text)
+        with self._ready:
+            if len(self._heap) >= self._maxsize:
+                victim = max(self._heap, key=lambda queued: (queued[0], -queued[1]))
+                if priority > victim[0]:
+                    logger.warning("TTS backlog full, dropped new priority %d reply", priority)
+                    return
+                self._heap.remove(victim)
+                heapq.heapify(self._heap)
+                logger.warning("TTS backlog full, dropped queued priority %d reply", victim[0])
+            heapq.heappush(self._heap, item)
+            self._ready.notify()
+
+    def get(self) -> str | None:
+        """Most urgent reply, waiting for one; None once closed and empty."""
+        with self._ready:
+            while not self._heap:
+                if self._closed:
+                    return None
+                self._ready.wait()
+            return heapq.heappop(self._heap)[2]
+
+    def close(self) -> None:
+        """Let get() return None once the queued replies are used up."""
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+
+    def __len__(self) -> int:
+        with self._ready:
+            return len(self._heap)
+
 
 class TTSService:
     """MQTT-connected TTS service.
@@ -30,12 +104,15 @@ class TTSService:
         mqtt_host: str = "localhost",
         mqtt_port: int = 1883,
         piper_model: str | None = None,
+        piper_workers: int = 1,
     ) -> None:
         self._mqtt_host = mqtt_host
         self._mqtt_port = mqtt_port
         self._engine = PiperEngine(
             model_path=piper_model,
             piper_binary=os.environ.get("PIPER_BINARY", "piper"),
+            workers=piper_workers,
+            cache=SpeechCache(),
         )
         self._client = mqtt.Client(
             callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
@@ -43,6 +120,10 @@ class TTSService:
         )
         self._running = False
 
+        # Piper runs on a worker thread so the MQTT loop never waits on it
+        self._pending = ReplyBacklog(MAX_PENDING_TEXTS)
+        self._worker: threading.Thread | None = None
+
     def start(self) -> None:
         """Start the TTS service."""
         logger.info("Starting TTS service")
@@ -52,6 +133,9 @@ class TTSService:
         self._client.on_message = self._on_message
         self._client.connect(self._mqtt_host, self._mqtt_port)
 
+        self._worker = threading.Thread(target=self._synthesis_worker, name="piper-worker", daemon=True)
+        self._worker.start()
+
         self._running = True
         self._client.loop_forever()
 
@@ -59,6 +143,10 @@ class TTSService:
         """Stop the TTS service."""
         self._running = False
         self._client.disconnect()
+        if self._worker is not None:
+            self._pending.close()
+            self._worker.join(timeout=30)
+        self._engine.stop()
         logger.info("TTS service stopped")
 
     def _on_connect(self, client: Any, userdata: Any, flags: Any, rc: Any, properties: Any = None) -> None:
@@ -67,36 +155,66 @@ class TTSService:
 
     def _on_message(self, client: Any, userdata: Any, message: mqtt.MQTTMessage) -> None:
         try:
-            data = json.loads(message.payload.decode("utf-8"))
+            data = orjson.loads(message.payload)
             payload = data.get("payload", {})
             text = payload.get("text", "")
 
-            if not text.strip():
+            if not text or text.isspace():
                 return
 
+            try:
+                priority = int(payload.get("priority", DEFAULT_PRIORITY))
+            except (TypeError, ValueError):
+                priority = DEFAULT_PRIORITY
+            self._pending.put(priority, text)
+
+        except Exception as e:
+            logger.error("TTS message error: %s", e)
+
+    def _synthesis_worker(self) -> None:
+        """Synthesize queued replies, most urgent first, until the backlog is closed."""
+        while True:
+            text = self._pending.get()
+            if text is None:
+                return
+            self._speak(text)
+
+    def _speak(self, text: str) -> None:
+        """Synthesize one reply and publish its audio."""
+        try:
             logger.info("Synthesizing: %s", text[:80])
-            audio_bytes = self._engine.synthesize(text)
-
-            if audio_bytes:
-                self._client.publish(
-                    "sotto/audio/tts",
-                    json.dumps({
-                        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-                        "source": "tts-service",
-                        "type": "tts_audio",
-                        "payload": {
-                            "audio_b64": base64.b64encode(audio_bytes).decode("ascii"),
-                            "sample_rate": 22050,
-                            "text": text,
-                            "encoding": "pcm_s16le",
-                        },
-                    }),
-                    qos=1,
-                )
+            # Each sentence goes out as soon as it is rendered, so the device
+            # starts speaking before the rest of the reply is synthesized
+            utterance_id = secrets.token_hex(4)
+            seq = 0
+            for audio_bytes in self._engine.synthesize_stream(text):
+                if audio_bytes:
+                    self._publish_audio(utterance_id, seq, {
+                        "sample_rate": 22050,
+                        "encoding": "pcm_s16le",
+                    }, audio_bytes)
+                    seq += 1
+            if seq:
+                self._publish_audio(utterance_id, seq, {"final": True, "text": text})
 
         except Exception as e:
             logger.error("TTS processing error: %s", e)
 
+    def _publish_audio(
+        self, utterance_id: str, seq: int, payload: dict[str, Any], audio: bytes = b""
+    ) -> None:
+        """Publish one part of an utterance on the TTS audio topic."""
+        self._client.publish(
+            "sotto/audio/tts",
+            encode_audio_message({
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "source": "tts-service",
+                "type": "tts_audio",
+                "payload": {"utterance_id": utterance_id, "seq": seq, **payload},
+            }, audio),
+            qos=1,
+        )
+
 
 def main() -> None:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
@@ -105,6 +223,7 @@ def main() -> None:
         mqtt_host=os.environ.get("MQTT_HOST", "localhost"),
         mqtt_port=int(os.environ.get("MQTT_PORT", "1883")),
         piper_model=os.environ.get("PIPER_MODEL"),
+        piper_workers=int(os.environ.get("PIPER_WORKERS", "2")),
     )
 
     def signal_handler(sig: int, frame: Any) -> None:
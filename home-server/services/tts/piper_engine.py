@@ -2,20 +2,86 @@
 
 from __future__ import annotations
 
+import itertools
+import json
 import logging
+import queue
+import re
+import select
+import struct
 import subprocess
+import tempfile
+import threading
 import wave
-from io import BytesIO
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for Piper to finish one utterance
+SYNTHESIS_TIMEOUT = 30
+
+# Whitespace after terminal punctuation separates sentences
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+
+# Canonical 44-byte RIFF header for mono 16-bit PCM
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text at sentence boundaries, dropping empty pieces."""
+    return [sentence for sentence in _SENTENCE_BREAK.split(text.strip()) if sentence]
+
+
+class SpeechCache:
+    """Bounded LRU cache of synthesized audio keyed on sentence text.
+
+    Briefings and acknowledgements repeat the same sentences day after
+    day; serving those from memory skips a Piper round-trip entirely.
+    """
+
+    def __init__(self, maxsize: int = 64) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text: str) -> bytes | None:
+        with self._lock:
+            audio = self._entries.get(text)
+            if audio is not None:
+                self._entries.move_to_end(text)
+            return audio
+
+    def put(self, text: str, audio: bytes) -> None:
+        with self._lock:
+            self._entries[text] = audio
+            self._entries.move_to_end(text)
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass
+class _PiperSlot:
+    """One Piper process; used by a single synthesis at a time."""
+
+    proc: subprocess.Popen[bytes] | None = None
+
 
 class PiperEngine:
     """Text-to-speech using Piper.
 
-    Piper is a fast, local neural text-to-speech system.
+    Piper is a fast, local neural text-to-speech system. Piper processes
+    are kept running in JSON-input mode so the voice model is loaded once
+    per process; each utterance is a JSON line naming the WAV file to
+    write, and Piper echoes that path on stdout when the file is complete.
+    With several workers, the sentences of a long text are synthesized on
+    separate processes at once.
     """
 
     def __init__(
@@ -23,33 +89,54 @@ class PiperEngine:
         model_path: str | None = None,
         piper_binary: str = "piper",
         sample_rate: int = 22050,
+        workers: int = 1,
+        cache: SpeechCache | None = None,
     ) -> None:
         self._model_path = model_path
         self._piper_binary = piper_binary
         self._sample_rate = sample_rate
+        self._cache = cache
         self._ready = False
+        self._output_dir: tempfile.TemporaryDirectory[str] | None = None
+        self._dir_lock = threading.Lock()
+        self._file_ids = itertools.count()
+        # Piper handles one line at a time, so each synthesis checks a
+        # process out of the idle queue and returns it when done
+        self._slots = [_PiperSlot() for _ in range(max(1, workers))]
+        self._idle: queue.Queue[_PiperSlot] = queue.Queue()
+        for slot in self._slots:
+            self._idle.put(slot)
 
     def initialize(self) -> None:
-        """Verify Piper is available and the model exists.
+        """Start the persistent Piper processes.
 
         Raises:
-            RuntimeError: If Piper binary or model not found.
+            RuntimeError: If the Piper binary is not found.
         """
-        # Check if piper binary exists
+        slots = self._checkout_all()
         try:
-            result = subprocess.run(
-                [self._piper_binary, "--help"],
-                capture_output=True,
-                timeout=10,
-            )
-            self._ready = True
-            logger.info("Piper TTS initialized (model=%s)", self._model_path)
-        except FileNotFoundError:
-            logger.error("Piper binary not found: %s", self._piper_binary)
-            raise RuntimeError(f"Piper binary not found: {self._piper_binary}")
-        except subprocess.TimeoutExpired:
-            self._ready = True  # Binary exists but timed out on --help (acceptable)
-            logger.info("Piper TTS initialized (timeout on help, but binary found)")
+            for slot in slots:
+                self._start_process(slot)
+        finally:
+            for slot in slots:
+                self._idle.put(slot)
+        self._ready = True
+        logger.info("Piper TTS initialized (model=%s, workers=%d)", self._model_path, len(self._slots))
+
+    def stop(self) -> None:
+        """Close Piper's input and wait for every process to exit."""
+        for slot in self._checkout_all():
+            self._stop_process(slot)
+            self._idle.put(slot)
+        with self._dir_lock:
+            if self._output_dir is not None:
+                self._output_dir.cleanup()
+                self._output_dir = None
+        self._ready = False
+
+    def _checkout_all(self) -> list[_PiperSlot]:
+        """Take every slot, waiting for in-flight syntheses to finish."""
+        return [self._idle.get() for _ in self._slots]
 
     @property
     def is_ready(self) -> bool:
@@ -58,6 +145,9 @@ class PiperEngine:
     def synthesize(self, text: str) -> bytes:
         """Synthesize text to audio.
 
+        Cached audio is returned without involving Piper. Otherwise Piper
+        is restarted first if the previous process has exited.
+
         Args:
             text: Text to synthesize.
 
@@ -67,33 +157,108 @@ class PiperEngine:
         Raises:
             RuntimeError: If synthesis fails.
         """
-        if not text.strip():
+        if not text or text.isspace():
             return b""
+        if self._cache is not None:
+            audio = self._cache.get(text)
+            if audio is not None:
+                return audio
 
-        cmd = [self._piper_binary, "--output-raw"]
+        slot = self._idle.get()
+        try:
+            if slot.proc is None or slot.proc.poll() is not None:
+                self._start_process(slot)
+            proc = slot.proc
+            output_file = Path(self._output_dir.name) / f"{next(self._file_ids)}.wav"
+            request = json.dumps({"text": text, "output_file": str(output_file)}) + "\n"
+
+            try:
+                proc.stdin.write(request.encode("utf-8"))
+                proc.stdin.flush()
+
+                ready, _, _ = select.select([proc.stdout], [], [], SYNTHESIS_TIMEOUT)
+                if not ready:
+                    self._stop_process(slot)
+                    raise RuntimeError("Piper TTS timed out")
+
+                if not proc.stdout.readline():
+                    self._stop_process(slot)
+                    raise RuntimeError("Piper TTS failed: process exited")
+
+                with wave.open(str(output_file), "rb") as wav:
+                    audio = wav.readframes(wav.getnframes())
+            except (BrokenPipeError, OSError, wave.Error) as e:
+                self._stop_process(slot)
+                logger.error("Piper TTS failed: %s", e)
+                raise RuntimeError(f"Piper TTS failed: {e}") from e
+            finally:
+                output_file.unlink(missing_ok=True)
+        finally:
+            self._idle.put(slot)
+
+        if self._cache is not None:
+            self._cache.put(text, audio)
+        logger.debug("Synthesized %d bytes for text: %s", len(audio), text[:50])
+        return audio
+
+    def synthesize_stream(self, text: str) -> Iterator[bytes]:
+        """Synthesize text one sentence at a time.
+
+        Sentences are spread over the worker processes and their audio is
+        yielded in order as soon as each is ready, so playback of a long
+        reply can begin while the rest is rendered.
+
+        Args:
+            text: Text to synthesize.
+
+        Yields:
+            Raw PCM audio bytes (16-bit signed, mono), one item per sentence.
+
+        Raises:
+            RuntimeError: If synthesis fails.
+        """
+        sentences = split_sentences(text)
+        if len(self._slots) == 1 or len(sentences) == 1:
+            for sentence in sentences:
+                yield self.synthesize(sentence)
+            return
+
+        with ThreadPoolExecutor(max_workers=len(self._slots), thread_name_prefix="piper") as pool:
+            futures = [pool.submit(self.synthesize, sentence) for sentence in sentences]
+            for future in futures:
+                yield future.result()
+
+    def _start_process(self, slot: _PiperSlot) -> None:
+        """Launch Piper in JSON-input mode. Caller has the slot checked out."""
+        with self._dir_lock:
+            if self._output_dir is None:
+                self._output_dir = tempfile.TemporaryDirectory(prefix="sotto-tts-")
+
+        cmd = [self._piper_binary, "--json-input", "--output_dir", self._output_dir.name]
         if self._model_path:
             cmd.extend(["--model", self._model_path])
 
         try:
-            result = subprocess.run(
-                cmd,
-                input=text.encode("utf-8"),
-                capture_output=True,
-                timeout=30,
+            # stderr is inherited so Piper's own logging reaches the service log
+            slot.proc = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=0
             )
-
-            if result.returncode != 0:
-                error = result.stderr.decode("utf-8", errors="replace")
-                logger.error("Piper TTS failed: %s", error)
-                raise RuntimeError(f"Piper TTS failed: {error}")
-
-            logger.debug("Synthesized %d bytes for text: %s", len(result.stdout), text[:50])
-            return result.stdout
-
         except FileNotFoundError:
+            logger.error("Piper binary not found: %s", self._piper_binary)
             raise RuntimeError(f"Piper binary not found: {self._piper_binary}")
-        except subprocess.TimeoutExpired:
-            raise RuntimeError("Piper TTS timed out")
+
+    def _stop_process(self, slot: _PiperSlot) -> None:
+        """Shut down the slot's Piper process, if any. Caller has the slot checked out."""
+        proc, slot.proc = slot.proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
 
     def synthesize_to_wav(self, text: str, output_path: str) -> str:
         """Synthesize text to a WAV file.
@@ -105,13 +270,16 @@ class PiperEngine:
         Returns:
             The output file path.
         """
-        raw_audio = self.synthesize(text)
+        raw_audio = b"".join(self.synthesize_stream(text))
+        header = _WAV_HEADER.pack(
+            b"RIFF", 36 + len(raw_audio), b"WAVE",
+            b"fmt ", 16, 1, 1, self._sample_rate, self._sample_rate * 2, 2, 16,
+            b"data", len(raw_audio),
+        )
 
-        with wave.open(output_path, "w") as wav:
-            wav.setnchannels(1)
-            wav.setsampwidth(2)
-            wav.setframerate(self._sample_rate)
-            wav.writeframes(raw_audio)
+        with open(output_path, "wb") as f:
+            f.write(header)
+            f.write(raw_audio)
 
         logger.info("Wrote WAV file: %s (%d bytes)", output_path, len(raw_audio))
         return output_path
@@ -2,10 +2,9 @@
 
 from __future__ import annotations
 
-import os
-import tempfile
+import json
 import wave
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 
@@ -14,7 +13,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from piper_engine import PiperEngine
+from piper_engine import PiperEngine, SpeechCache, split_sentences
 
 
 class TestPiperEngineInit:
@@ -36,70 +35,97 @@ class TestPiperEngineInit:
         assert engine._sample_rate == 16000
 
 
-class TestPiperEngineInitialize:
-    @patch("piper_engine.subprocess.run")
-    def test_successful_init(self, mock_run: MagicMock) -> None:
-        mock_run.return_value = MagicMock(returncode=0)
+_FAKE_PIPER = """\
+import json, sys, wave
+from pathlib import Path
 
-        engine = PiperEngine()
-        engine.initialize()
-        assert engine.is_ready is True
+log = Path(__file__).with_suffix(".log")
+with log.open("a") as f:
+    f.write(json.dumps(sys.argv[1:]) + "\\n")
 
-        mock_run.assert_called_once_with(
-            ["piper", "--help"],
-            capture_output=True,
-            timeout=10,
-        )
+for line in sys.stdin:
+    request = json.loads(line)
+    if request["text"] == "crash":
+        sys.exit(1)
+    with wave.open(request["output_file"], "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(22050)
+        wav.writeframes(b"\\x01\\x00" * len(request["text"]))
+    print(request["output_file"], flush=True)
+"""
 
-    @patch("piper_engine.subprocess.run")
-    def test_binary_not_found(self, mock_run: MagicMock) -> None:
-        mock_run.side_effect = FileNotFoundError()
 
-        engine = PiperEngine()
-        with pytest.raises(RuntimeError, match="not found"):
-            engine.initialize()
-        assert engine.is_ready is False
+@pytest.fixture
+def fake_piper(tmp_path: Path) -> Path:
+    """Executable that speaks Piper's JSON-input protocol.
 
-    @patch("piper_engine.subprocess.run")
-    def test_timeout_still_ready(self, mock_run: MagicMock) -> None:
-        import subprocess
-        mock_run.side_effect = subprocess.TimeoutExpired(cmd="piper", timeout=10)
+    Each utterance is one frame per character of text, and every launch
+    appends its arguments to fake_piper.log.
+    """
+    script = tmp_path / "fake_piper"
+    script.write_text(f"#!{sys.executable}\n{_FAKE_PIPER}")
+    script.chmod(0o755)
+    return script
 
-        engine = PiperEngine()
-        engine.initialize()
+
+def _launches(fake_piper: Path) -> list[list[str]]:
+    log = fake_piper.with_suffix(".log")
+    if not log.exists():
+        return []
+    return [json.loads(line) for line in log.read_text().splitlines()]
+
+
+@pytest.fixture
+def engine(fake_piper: Path) -> PiperEngine:
+    engine = PiperEngine(model_path="/models/test.onnx", piper_binary=str(fake_piper))
+    engine.initialize()
+    yield engine
+    engine.stop()
+
+
+class TestPiperEngineInitialize:
+    def test_successful_init(self, engine: PiperEngine, fake_piper: Path) -> None:
         assert engine.is_ready is True
+        engine.synthesize("Hi")  # Piper has surely started once it answers
+        args = _launches(fake_piper)[0]
+        assert args[:2] == ["--json-input", "--output_dir"]
+        assert args[-2:] == ["--model", "/models/test.onnx"]
 
+    def test_no_model(self, fake_piper: Path) -> None:
+        engine = PiperEngine(piper_binary=str(fake_piper))
+        engine.initialize()
+        engine.synthesize("Hi")
+        engine.stop()
+        assert "--model" not in _launches(fake_piper)[0]
 
-class TestPiperEngineSynthesize:
-    @patch("piper_engine.subprocess.run")
-    def test_synthesize_success(self, mock_run: MagicMock) -> None:
-        fake_audio = b"\x00\x01" * 1000
-        mock_run.return_value = MagicMock(
-            returncode=0,
-            stdout=fake_audio,
-            stderr=b"",
-        )
+    def test_binary_not_found(self, tmp_path: Path) -> None:
+        engine = PiperEngine(piper_binary=str(tmp_path / "missing"))
+        with pytest.raises(RuntimeError, match="not found"):
+            engine.initialize()
+        assert engine.is_ready is False
 
-        engine = PiperEngine(model_path="/models/test.onnx")
-        engine._ready = True
-        result = engine.synthesize("Hello world")
+    def test_stop(self, fake_piper: Path) -> None:
+        engine = PiperEngine(piper_binary=str(fake_piper))
+        engine.initialize()
+        proc = engine._slots[0].proc
+        engine.stop()
+        assert proc.returncode == 0
+        assert engine.is_ready is False
 
-        assert result == fake_audio
-        cmd = mock_run.call_args[0][0]
-        assert cmd == ["piper", "--output-raw", "--model", "/models/test.onnx"]
-        assert mock_run.call_args[1]["input"] == b"Hello world"
 
-    @patch("piper_engine.subprocess.run")
-    def test_synthesize_no_model(self, mock_run: MagicMock) -> None:
-        mock_run.return_value = MagicMock(returncode=0, stdout=b"\x00", stderr=b"")
+class TestPiperEngineSynthesize:
+    def test_synthesize_success(self, engine: PiperEngine) -> None:
+        assert engine.synthesize("Hello") == b"\x01\x00" * 5
 
-        engine = PiperEngine()  # No model_path
-        engine._ready = True
-        engine.synthesize("Test")
+    def test_process_reused(self, engine: PiperEngine, fake_piper: Path) -> None:
+        engine.synthesize("One")
+        engine.synthesize("Two")
+        assert len(_launches(fake_piper)) == 1
 
-        cmd = mock_run.call_args[0][0]
-        assert cmd == ["piper", "--output-raw"]
-        assert "--model" not in cmd
+    def test_output_files_removed(self, engine: PiperEngine) -> None:
+        engine.synthesize("Hello")
+        assert list(Path(engine._output_dir.name).iterdir()) == []
 
     def test_synthesize_empty_text(self) -> None:
         engine = PiperEngine()
@@ -113,65 +139,92 @@ class TestPiperEngineSynthesize:
         result = engine.synthesize("   \n  ")
         assert result == b""
 
-    @patch("piper_engine.subprocess.run")
-    def test_synthesize_nonzero_return(self, mock_run: MagicMock) -> None:
-        mock_run.return_value = MagicMock(
-            returncode=1,
-            stdout=b"",
-            stderr=b"Error: model not found",
-        )
-
-        engine = PiperEngine()
-        engine._ready = True
+    def test_process_exit_raises_then_restarts(self, engine: PiperEngine, fake_piper: Path) -> None:
         with pytest.raises(RuntimeError, match="Piper TTS failed"):
-            engine.synthesize("Hello")
+            engine.synthesize("crash")
+        assert engine.synthesize("Back") == b"\x01\x00" * 4
+        assert len(_launches(fake_piper)) == 2
+
+    def test_synthesize_timeout(self, engine: PiperEngine) -> None:
+        with patch("piper_engine.select.select", return_value=([], [], [])):
+            with pytest.raises(RuntimeError, match="timed out"):
+                engine.synthesize("Hello")
+        assert engine._slots[0].proc is None
+
+
+class TestSpeechCache:
+    def test_miss_then_hit(self) -> None:
+        cache = SpeechCache()
+        assert cache.get("Hello.") is None
+        cache.put("Hello.", b"\x01\x00")
+        assert cache.get("Hello.") == b"\x01\x00"
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = SpeechCache(maxsize=2)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        cache.get("a")
+        cache.put("c", b"3")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1"
+        assert len(cache) == 2
+
+    def test_engine_serves_repeats_from_cache(self, fake_piper: Path) -> None:
+        engine = PiperEngine(piper_binary=str(fake_piper), cache=SpeechCache())
+        engine.initialize()
+        try:
+            first = engine.synthesize("Good morning.")
+            with patch.object(engine._idle, "get", side_effect=AssertionError("Piper used")):
+                assert engine.synthesize("Good morning.") == first
+        finally:
+            engine.stop()
 
-    @patch("piper_engine.subprocess.run")
-    def test_synthesize_binary_not_found(self, mock_run: MagicMock) -> None:
-        mock_run.side_effect = FileNotFoundError()
 
-        engine = PiperEngine()
-        engine._ready = True
-        with pytest.raises(RuntimeError, match="not found"):
-            engine.synthesize("Hello")
+class TestSplitSentences:
+    def test_splits_after_terminal_punctuation(self) -> None:
+        assert split_sentences(" Hi there. How are you?  Fine!\nBye ") == [
+            "Hi there.", "How are you?", "Fine!", "Bye",
+        ]
 
-    @patch("piper_engine.subprocess.run")
-    def test_synthesize_timeout(self, mock_run: MagicMock) -> None:
-        import subprocess
-        mock_run.side_effect = subprocess.TimeoutExpired(cmd="piper", timeout=30)
+    def test_keeps_inner_punctuation(self) -> None:
+        assert split_sentences("It's 3.5 degrees, e.g.cold.") == ["It's 3.5 degrees, e.g.cold."]
 
-        engine = PiperEngine()
-        engine._ready = True
-        with pytest.raises(RuntimeError, match="timed out"):
-            engine.synthesize("Hello")
 
+class TestPiperEngineSynthesizeStream:
+    def test_yields_audio_per_sentence(self, engine: PiperEngine, fake_piper: Path) -> None:
+        chunks = list(engine.synthesize_stream("Hi. Hello there!"))
+        assert chunks == [b"\x01\x00" * 3, b"\x01\x00" * 12]
+        assert len(_launches(fake_piper)) == 1
 
-class TestPiperEngineSynthesizeToWav:
-    @patch("piper_engine.subprocess.run")
-    def test_writes_wav_file(self, mock_run: MagicMock) -> None:
-        # 1 second of silence at 22050Hz, 16-bit mono
-        fake_audio = b"\x00\x00" * 22050
-        mock_run.return_value = MagicMock(
-            returncode=0,
-            stdout=fake_audio,
-            stderr=b"",
-        )
+    def test_empty_text_yields_nothing(self, engine: PiperEngine) -> None:
+        assert list(engine.synthesize_stream("  ")) == []
 
-        engine = PiperEngine(sample_rate=22050)
-        engine._ready = True
+    def test_workers_keep_sentence_order(self, fake_piper: Path) -> None:
+        engine = PiperEngine(piper_binary=str(fake_piper), workers=3)
+        engine.initialize()
+        try:
+            chunks = list(engine.synthesize_stream("A. Bb. Ccc. Dddd. Eeeee."))
+        finally:
+            engine.stop()
+        assert chunks == [b"\x01\x00" * n for n in range(2, 7)]
+        assert len(_launches(fake_piper)) == 3
 
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            output_path = f.name
+
+class TestPiperEngineSynthesizeToWav:
+    def test_writes_wav_file(self, fake_piper: Path, tmp_path: Path) -> None:
+        engine = PiperEngine(piper_binary=str(fake_piper), sample_rate=22050)
+        engine.initialize()
+        output_path = str(tmp_path / "out.wav")
 
         try:
             result = engine.synthesize_to_wav("Hello", output_path)
-            assert result == output_path
-            assert os.path.exists(output_path)
-
-            with wave.open(output_path, "r") as wav:
-                assert wav.getnchannels() == 1
-                assert wav.getsampwidth() == 2
-                assert wav.getframerate() == 22050
-                assert wav.getnframes() == 22050
         finally:
-            os.unlink(output_path)
+            engine.stop()
+
+        assert result == output_path
+        with wave.open(output_path, "r") as wav:
+            assert wav.getnchannels() == 1
+            assert wav.getsampwidth() == 2
+            assert wav.getframerate() == 22050
+            assert wav.getnframes() == 5
+        assert Path(output_path).stat().st_size == 44 + 10
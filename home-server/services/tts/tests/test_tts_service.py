@@ -2,10 +2,10 @@
 
 from __future__ import annotations
 
-import base64
 import importlib.util
 import json
 import sys
+import threading
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -28,6 +28,25 @@ _spec.loader.exec_module(tts_main)
 TTSService = tts_main.TTSService
 
 
+def _decode(message: bytes) -> tuple[dict, bytes]:
+    """Split a binary audio message into its envelope and PCM body."""
+    header_end = 4 + int.from_bytes(message[:4], "big")
+    return json.loads(message[4:header_end]), message[header_end:]
+
+
+def _deliver(svc: TTSService, msg: MagicMock) -> None:
+    """Hand a message to the service and let its worker drain the queue."""
+    svc._on_message(None, None, msg)
+    svc._pending.close()
+    svc._synthesis_worker()
+
+
+def _queued(svc: TTSService) -> list[str]:
+    """Close the backlog and take every queued reply, in speaking order."""
+    svc._pending.close()
+    return list(iter(svc._pending.get, None))
+
+
 class TestTTSServiceInit:
     @patch("tts_main.PiperEngine")
     @patch("tts_main.mqtt.Client")
@@ -63,7 +82,7 @@ class TestTTSServiceOnMessage:
     def test_synthesizes_and_publishes(self, mock_mqtt: MagicMock, mock_piper: MagicMock) -> None:
         svc = TTSService()
         fake_audio = b"\x00\x01" * 500
-        svc._engine.synthesize.return_value = fake_audio
+        svc._engine.synthesize_stream.return_value = iter([fake_audio])
 
         msg = MagicMock()
         msg.payload = json.dumps({
@@ -72,23 +91,42 @@ class TestTTSServiceOnMessage:
             "payload": {"text": "Good morning. Here's your day.", "priority": 3},
         }).encode("utf-8")
 
-        svc._on_message(None, None, msg)
+        _deliver(svc, msg)
 
-        svc._engine.synthesize.assert_called_once_with("Good morning. Here's your day.")
-        svc._client.publish.assert_called_once()
+        svc._engine.synthesize_stream.assert_called_once_with("Good morning. Here's your day.")
+        assert svc._client.publish.call_count == 2
 
-        call_args = svc._client.publish.call_args
+        call_args = svc._client.publish.call_args_list[0]
         assert call_args[0][0] == "sotto/audio/tts"
 
-        published = json.loads(call_args[0][1])
+        assert isinstance(call_args[0][1], bytes)
+        published, audio = _decode(call_args[0][1])
         assert published["type"] == "tts_audio"
         assert published["source"] == "tts-service"
+        assert published["payload"]["seq"] == 0
         assert published["payload"]["sample_rate"] == 22050
         assert published["payload"]["encoding"] == "pcm_s16le"
-        assert published["payload"]["text"] == "Good morning. Here's your day."
 
-        decoded_audio = base64.b64decode(published["payload"]["audio_b64"])
-        assert decoded_audio == fake_audio
+        assert audio == fake_audio
+
+    @patch("tts_main.PiperEngine")
+    @patch("tts_main.mqtt.Client")
+    def test_publishes_each_sentence_then_final(self, mock_mqtt: MagicMock, mock_piper: MagicMock) -> None:
+        svc = TTSService()
+        svc._engine.synthesize_stream.return_value = iter([b"\x01\x00", b"", b"\x02\x00"])
+
+        msg = MagicMock()
+        msg.payload = json.dumps({"payload": {"text": "One. ... Two."}}).encode("utf-8")
+        _deliver(svc, msg)
+
+        messages = [_decode(c[0][1]) for c in svc._client.publish.call_args_list]
+        parts = [envelope["payload"] for envelope, _ in messages]
+        assert [p["seq"] for p in parts] == [0, 1, 2]
+        assert len({p["utterance_id"] for p in parts}) == 1
+        assert [audio for _, audio in messages] == [b"\x01\x00", b"\x02\x00", b""]
+        assert parts[2] == {
+            "utterance_id": parts[0]["utterance_id"], "seq": 2, "final": True, "text": "One. ... Two.",
+        }
 
     @patch("tts_main.PiperEngine")
     @patch("tts_main.mqtt.Client")
@@ -101,9 +139,9 @@ class TestTTSServiceOnMessage:
             "payload": {"text": "", "priority": 5},
         }).encode("utf-8")
 
-        svc._on_message(None, None, msg)
+        _deliver(svc, msg)
 
-        svc._engine.synthesize.assert_not_called()
+        svc._engine.synthesize_stream.assert_not_called()
         svc._client.publish.assert_not_called()
 
     @patch("tts_main.PiperEngine")
@@ -117,15 +155,15 @@ class TestTTSServiceOnMessage:
             "payload": {"text": "   \n  "},
         }).encode("utf-8")
 
-        svc._on_message(None, None, msg)
+        _deliver(svc, msg)
 
-        svc._engine.synthesize.assert_not_called()
+        svc._engine.synthesize_stream.assert_not_called()
 
     @patch("tts_main.PiperEngine")
     @patch("tts_main.mqtt.Client")
     def test_empty_audio_not_published(self, mock_mqtt: MagicMock, mock_piper: MagicMock) -> None:
         svc = TTSService()
-        svc._engine.synthesize.return_value = b""
+        svc._engine.synthesize_stream.return_value = iter([b""])
 
         msg = MagicMock()
         msg.payload = json.dumps({
@@ -133,16 +171,16 @@ class TestTTSServiceOnMessage:
             "payload": {"text": "Hello"},
         }).encode("utf-8")
 
-        svc._on_message(None, None, msg)
+        _deliver(svc, msg)
 
-        svc._engine.synthesize.assert_called_once()
+        svc._engine.synthesize_stream.assert_called_once()
         svc._client.publish.assert_not_called()
 
     @patch("tts_main.PiperEngine")
     @patch("tts_main.mqtt.Client")
     def test_synthesis_error_handled(self, mock_mqtt: MagicMock, mock_piper: MagicMock) -> None:
         svc = TTSService()
-        svc._engine.synthesize.side_effect = RuntimeError("synthesis failed")
+        svc._engine.synthesize_stream.side_effect = RuntimeError("synthesis failed")
 
         msg = MagicMock()
         msg.payload = json.dumps({
@@ -150,6 +188,87 @@ class TestTTSServiceOnMessage:
             "payload": {"text": "Hello"},
         }).encode("utf-8")
 
-        # Should not raise
-        svc._on_message(None, None, msg)
+        # Should not raise, nor stop the worker
+        _deliver(svc, msg)
         svc._client.publish.assert_not_called()
+
+    @patch("tts_main.PiperEngine")
+    @patch("tts_main.mqtt.Client")
+    def test_synthesis_left_to_worker(self, mock_mqtt: MagicMock, mock_piper: MagicMock) -> None:
+        svc = TTSService()
+
+        msg = MagicMock()
+        msg.payload = json.dumps({"payload": {"text": "Hello"}}).encode("utf-8")
+        svc._on_message(None, None, msg)
+
+        assert _queued(svc) == ["Hello"]
+        svc._engine.synthesize_stream.assert_not_called()
+
+    @patch("tts_main.PiperEngine")
+    @patch("tts_main.mqtt.Client")
+    def test_drops_oldest_when_backlog_full(self, mock_mqtt: MagicMock, mock_piper: MagicMock) -> None:
+        svc = TTSService()
+        for i in range(tts_main.MAX_PENDING_TEXTS + 1):
+            msg = MagicMock()
+            msg.payload = json.dumps({"payload": {"text": f"Reply {i}"}}).encode("utf-8")
+            svc._on_message(None, None, msg)
+
+        queued = _queued(svc)
+        assert queued == [f"Reply {i}" for i in range(1, tts_main.MAX_PENDING_TEXTS + 1)]
+
+    @patch("tts_main.PiperEngine")
+    @patch("tts_main.mqtt.Client")
+    def test_speaks_most_urgent_first(self, mock_mqtt: MagicMock, mock_piper: MagicMock) -> None:
+        svc = TTSService()
+        for text, priority in [("Ping", 5), ("Alert", 1), ("Briefing", 3), ("Later ping", 5)]:
+            msg = MagicMock()
+            msg.payload = json.dumps({"payload": {"text": text, "priority": priority}}).encode("utf-8")
+            svc._on_message(None, None, msg)
+
+        queued = _queued(svc)
+        assert queued == ["Alert", "Briefing", "Ping", "Later ping"]
+
+    @patch("tts_main.PiperEngine")
+    @patch("tts_main.mqtt.Client")
+    def test_full_backlog_drops_least_urgent(self, mock_mqtt: MagicMock, mock_piper: MagicMock) -> None:
+        svc = TTSService()
+        texts = [("Ping", 7)] + [(f"Briefing {i}", 3) for i in range(tts_main.MAX_PENDING_TEXTS - 1)]
+        texts += [("Alert", 1), ("Chatter", 9)]
+        for text, priority in texts:
+            msg = MagicMock()
+            msg.payload = json.dumps({"payload": {"text": text, "priority": priority}}).encode("utf-8")
+            svc._on_message(None, None, msg)
+
+        queued = _queued(svc)
+        assert queued == ["Alert"] + [f"Briefing {i}" for i in range(tts_main.MAX_PENDING_TEXTS - 1)]
+
+    @patch("tts_main.PiperEngine")
+    @patch("tts_main.mqtt.Client")
+    @pytest.mark.parametrize("priority", ["2", 2.0, "urgent", None, [1]])
+    def test_priority_coerced_to_int(self, mock_mqtt: MagicMock, mock_piper: MagicMock, priority: object) -> None:
+        svc = TTSService()
+        for text, given in [("Odd", priority), ("Normal", 5), ("Alert", 1)]:
+            msg = MagicMock()
+            msg.payload = json.dumps({"payload": {"text": text, "priority": given}}).encode("utf-8")
+            svc._on_message(None, None, msg)
+
+        queued = _queued(svc)
+        assert queued[0] == "Alert"
+        assert sorted(queued) == ["Alert", "Normal", "Odd"]
+
+    @patch("tts_main.PiperEngine")
+    @patch("tts_main.mqtt.Client")
+    def test_worker_stops_with_full_backlog(self, mock_mqtt: MagicMock, mock_piper: MagicMock) -> None:
+        svc = TTSService()
+        svc._engine.synthesize_stream.return_value = iter([])
+        for i in range(tts_main.MAX_PENDING_TEXTS + 2):
+            msg = MagicMock()
+            msg.payload = json.dumps({"payload": {"text": f"Reply {i}", "priority": 10}}).encode("utf-8")
+            svc._on_message(None, None, msg)
+
+        svc._pending.close()
+        worker = threading.Thread(target=svc._synthesis_worker)
+        worker.start()
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+        assert svc._engine.synthesize_stream.call_count == tts_main.MAX_PENDING_TEXTS
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
@@ -30,6 +31,13 @@ class TestInitialize:
         assert (vault.path / "agent").is_dir()
         assert (vault.path / "templates").is_dir()
 
+    def test_restores_missing_directory(self, vault: VaultClient) -> None:
+        (vault.path / "health" / "sleep").rmdir()
+        (vault.path / "daily" / "note.md").write_text("kept")
+        vault.initialize()
+        assert (vault.path / "health" / "sleep").is_dir()
+        assert (vault.path / "daily" / "note.md").read_text() == "kept"
+
 
 class TestDailyNotes:
     def test_create_daily_note(self, vault: VaultClient) -> None:
@@ -58,6 +66,15 @@ class TestDailyNotes:
         assert "07:00-07:30" in content
         assert "Conversation with wife" in content
 
+    def test_append_time_blocks_in_order_before_evening_summary(self, vault: VaultClient) -> None:
+        vault.create_daily_note("2026-02-19")
+        vault.append_time_block("2026-02-19", "07:00-07:30", "- Breakfast")
+        vault.append_time_block("2026-02-19", "09:00-09:30", "- Standup")
+        content = vault.get_daily_note_path("2026-02-19").read_text()
+        assert content.index("07:00-07:30") < content.index("09:00-09:30") < content.index("## Evening Summary")
+        assert content.count("## Evening Summary") == 1
+        assert content.endswith("## Links\n")
+
     def test_append_time_block_creates_note_if_missing(self, vault: VaultClient) -> None:
         vault.append_time_block("2026-03-01", "08:00-08:30", "- Meeting notes")
         assert vault.get_daily_note_path("2026-03-01").exists()
@@ -75,6 +92,14 @@ class TestDailyNotes:
         content = vault.get_daily_note_path("2026-02-19").read_text()
         assert "Productive day" in content
 
+    def test_update_daily_summary_missing_note(self, vault: VaultClient) -> None:
+        vault.update_daily_summary("2026-02-20", "Quiet day")
+        assert not vault.get_daily_note_path("2026-02-20").exists()
+
+    def test_update_morning_briefing_creates_note_if_missing(self, vault: VaultClient) -> None:
+        vault.update_morning_briefing("2026-03-02", "Dentist at 10", "none")
+        assert "- Calendar: Dentist at 10" in vault.get_daily_note_path("2026-03-02").read_text()
+
 
 class TestTaskNotes:
     def test_create_task_note(self, vault: VaultClient) -> None:
@@ -94,6 +119,12 @@ class TestTaskNotes:
         assert "[[daughter]]" in content
         assert "2026-02-22" in content
 
+    def test_create_task_note_at_given_time(self, vault: VaultClient) -> None:
+        now = datetime(2026, 3, 31, 23, 59, 59, tzinfo=timezone.utc)
+        path = vault.create_task_note(task_id="t1", title="Pay rent", context="", now=now)
+        assert path.name == "pay-rent-2026-03.md"
+        assert "created: 2026-03-31T23:59:59+00:00" in path.read_text()
+
     def test_create_private_task_note(self, vault: VaultClient) -> None:
         path = vault.create_task_note(
             task_id="prv12345",
@@ -119,6 +150,23 @@ class TestPeopleNotes:
         assert "Jane Smith" in content
         assert "coworker" in content
 
+    def test_person_note_slug(self, vault: VaultClient) -> None:
+        path = vault.create_person_note("  José O'Brien-Smith, Jr. the Third of Many Names ")
+        assert path.name == "jos--o-brien-smith--jr--the.md"
+
+    def test_update_person_conversation_creates_note(self, vault: VaultClient) -> None:
+        vault.update_person_conversation("Carol", "2026-02-19", "Lunch plans")
+        content = (vault.path / "people" / "carol.md").read_text()
+        assert "## Conversation Log\n- [[2026-02-19]]: Lunch plans\n" in content
+        assert 'last_seen: "2026-02-19"' in content
+
+    def test_create_daily_note_leaves_existing_untouched(self, vault: VaultClient) -> None:
+        path = vault.get_daily_note_path("2026-02-19")
+        original = "---\ndate: 2026-02-19\n---\nEdited by hand: café\n".encode("utf-8")
+        path.write_bytes(original)
+        assert vault.create_daily_note("2026-02-19") == path
+        assert path.read_bytes() == original
+
     def test_create_person_note_idempotent(self, vault: VaultClient) -> None:
         path1 = vault.create_person_note("Bob")
         path1.write_text("custom")
@@ -144,6 +192,10 @@ class TestPrivateNotes:
         assert "private" in content.lower()
         assert "Some private content" in content
 
+    def test_notes_written_as_utf8(self, vault: VaultClient) -> None:
+        path = vault.create_private_note("Café", "Crème brûlée recipe")
+        assert "Crème brûlée recipe" in path.read_bytes().decode("utf-8")
+
 
 class TestSearch:
     def test_search_finds_matching_notes(self, vault: VaultClient) -> None:
@@ -158,6 +210,11 @@ class TestSearch:
         results = vault.search_notes("hidden content 12345")
         assert len(results) == 0
 
+    def test_search_private_section_explicitly(self, vault: VaultClient) -> None:
+        vault.create_private_note("Secret", "hidden content 12345")
+        results = vault.search_notes("hidden content 12345", section="private")
+        assert [r["path"].split("/")[:2] for r in results] == [["private", "notes"]]
+
     def test_search_in_specific_section(self, vault: VaultClient) -> None:
         vault.create_person_note("TestPerson", context="unique_keyword_xyz")
         results = vault.search_notes("unique_keyword_xyz", section="people")
@@ -167,6 +224,38 @@ class TestSearch:
         results = vault.search_notes("nonexistent_query_string")
         assert len(results) == 0
 
+    def test_search_snippet_context_in_characters(self, vault: VaultClient) -> None:
+        (vault.path / "projects" / "trip.md").write_text("é" * 100 + "Rocket" + "ü" * 100, encoding="utf-8")
+        results = vault.search_notes("rocket")
+        assert results[0]["snippet"] == "é" * 50 + "Rocket" + "ü" * 50
+
+    def test_search_case_insensitive_snippet(self, vault: VaultClient) -> None:
+        (vault.path / "projects" / "plan.md").write_text("x" * 200 + "ROCKET\nlaunch" + "y" * 200)
+        results = vault.search_notes("rocket")
+        assert results == [{"path": "projects/plan.md", "snippet": "x" * 50 + "ROCKET launch" + "y" * 43}]
+
+    def test_search_non_ascii_query(self, vault: VaultClient) -> None:
+        (vault.path / "projects" / "cafe.md").write_text("Meet at the CAFÉ on Main")
+        results = vault.search_notes("café")
+        assert [r["path"] for r in results] == ["projects/cafe.md"]
+
+    def test_search_mixed_case_non_ascii(self, vault: VaultClient) -> None:
+        (vault.path / "projects" / "cafe.md").write_text("Meet at the CaFÉ on Main")
+        assert len(vault.search_notes("CAFé")) == 1
+
+    def test_search_multi_one_pass(self, vault: VaultClient) -> None:
+        (vault.path / "projects" / "a.md").write_text("alpha and beta")
+        (vault.path / "projects" / "b.md").write_text("only beta")
+        results = vault.search_notes_multi(["alpha", "BETA", "gamma", "alpha"])
+        assert list(results) == ["alpha", "BETA", "gamma"]
+        assert [r["path"] for r in results["alpha"]] == ["projects/a.md"]
+        assert sorted(r["path"] for r in results["BETA"]) == ["projects/a.md", "projects/b.md"]
+        assert results["gamma"] == []
+
+    def test_search_skips_empty_files(self, vault: VaultClient) -> None:
+        (vault.path / "projects" / "empty.md").write_text("")
+        assert vault.search_notes("anything") == []
+
 
 class TestAgentNotes:
     def test_update_self_assessment(self, vault: VaultClient) -> None:
@@ -181,3 +270,5 @@ class TestAgentNotes:
         content = (vault.path / "agent" / "patterns.md").read_text()
         assert "calendar" in content
         assert "concise" in content
+        assert content.startswith("# Behavioral Patterns\n\n- [")
+        assert content.count("# Behavioral Patterns") == 1
@@ -3,13 +3,56 @@
 from __future__ import annotations
 
 import logging
+import os
 import re
+from collections.abc import Callable
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Characters either side of a match included in a search snippet
+SNIPPET_CONTEXT = 50
+
+# Bytes read either side of a match: enough for SNIPPET_CONTEXT UTF-8
+# characters of up to 4 bytes each, even with a partial one at the edge
+_SNIPPET_BYTES = 4 * (SNIPPET_CONTEXT + 1)
+
+# Byte table for slugs: lowercase ASCII letters, digits and dashes map to
+# themselves, every other byte to a dash
+_SLUG_CHARS = b"abcdefghijklmnopqrstuvwxyz0123456789-"
+_SLUG_TABLE = bytes(b if b in _SLUG_CHARS else ord("-") for b in range(256))
+
+# Daily note skeleton, kept encoded since only the date (filled in twice)
+# changes between days
+_DAILY_NOTE_TEMPLATE = b"""---
+date: %s
+summary: ""
+mood: ""
+---
+
+# %s -- Daily Log
+
+## Morning Briefing
+- Calendar: (pending)
+- Pending tasks: (pending)
+
+## Time Blocks
+
+## Evening Summary
+- Tasks completed: (pending)
+- Tasks created: (pending)
+- Notable moments: (pending)
+
+## Links
+"""
+
+# Compiled once at import rather than looked up in re's cache on every call
+_SUMMARY_RE = re.compile(r'summary: ".*?"')
+_STATUS_RE = re.compile(r'status: \w+')
+_LAST_SEEN_RE = re.compile(r'last_seen: ".*?"')
+
 
 class VaultClient:
     """Manages the Obsidian vault filesystem for Sotto.
@@ -28,8 +71,12 @@ class VaultClient:
             "private/notes", "private/suggestions",
             "agent", "templates",
         ]
+        # One listing per parent directory finds what already exists, so a
+        # vault that is already set up costs no mkdir calls at all
+        existing = _list_subdirectories(self._vault_path, {d.rpartition("/")[0] for d in directories})
         for d in directories:
-            (self._vault_path / d).mkdir(parents=True, exist_ok=True)
+            if d not in existing:
+                os.makedirs(self._vault_path / d, exist_ok=True)
         logger.info("Vault initialized at %s", self._vault_path)
 
     @property
@@ -50,72 +97,44 @@ class VaultClient:
             date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
         path = self.get_daily_note_path(date)
-        if path.exists():
-            return path
-
-        content = f"""---
-date: {date}
-summary: ""
-mood: ""
----
-
-# {date} -- Daily Log
-
-## Morning Briefing
-- Calendar: (pending)
-- Pending tasks: (pending)
-
-## Time Blocks
-
-## Evening Summary
-- Tasks completed: (pending)
-- Tasks created: (pending)
-- Notable moments: (pending)
-
-## Links
-"""
-        path.write_text(content)
-        logger.info("Created daily note: %s", path)
+        encoded = date.encode("utf-8")
+        if _create_file(path, _DAILY_NOTE_TEMPLATE % (encoded, encoded)):
+            logger.info("Created daily note: %s", path)
         return path
 
     def append_time_block(self, date: str, time_range: str, content: str) -> None:
         """Append a time block entry to the daily note."""
-        path = self.get_daily_note_path(date)
-        if not path.exists():
-            self.create_daily_note(date)
-
-        existing = path.read_text()
-
-        # Insert before Evening Summary
-        block = f"\n### {time_range}\n{content}\n"
-        if "## Evening Summary" in existing:
-            existing = existing.replace("## Evening Summary", f"{block}## Evening Summary")
-        else:
-            existing += block
-
-        path.write_text(existing)
+        path = self.create_daily_note(date)
+
+        # Insert before Evening Summary; only the note from there on is
+        # rewritten, not the whole day's log
+        block = f"\n### {time_range}\n{content}\n".encode("utf-8")
+        with open(path, "r+b") as f:
+            existing = f.read()
+            offset = existing.find(b"## Evening Summary")
+            if offset == -1:
+                f.write(block)
+            else:
+                f.seek(offset)
+                f.write(block + existing[offset:])
         logger.debug("Appended time block %s to %s", time_range, date)
 
     def update_daily_summary(self, date: str, summary: str) -> None:
         """Update the summary field in the daily note frontmatter."""
         path = self.get_daily_note_path(date)
-        if not path.exists():
-            return
-
-        content = path.read_text()
-        content = re.sub(r'summary: ".*?"', f'summary: "{summary}"', content)
-        path.write_text(content)
+        _rewrite_file(path, lambda content: _SUMMARY_RE.sub(f'summary: "{summary}"', content))
 
     def update_morning_briefing(self, date: str, calendar: str, tasks: str) -> None:
         """Update the morning briefing section."""
         path = self.get_daily_note_path(date)
-        if not path.exists():
-            self.create_daily_note(date)
 
-        content = path.read_text()
-        content = content.replace("- Calendar: (pending)", f"- Calendar: {calendar}")
-        content = content.replace("- Pending tasks: (pending)", f"- Pending tasks: {tasks}")
-        path.write_text(content)
+        def fill_briefing(content: str) -> str:
+            content = content.replace("- Calendar: (pending)", f"- Calendar: {calendar}")
+            return content.replace("- Pending tasks: (pending)", f"- Pending tasks: {tasks}")
+
+        if not _rewrite_file(path, fill_briefing):
+            self.create_daily_note(date)
+            _rewrite_file(path, fill_briefing)
 
     # --- Task Notes ---
 
@@ -128,11 +147,18 @@ mood: ""
         due_date: str | None = None,
         people: list[str] | None = None,
         is_private: bool = False,
+        now: datetime | None = None,
     ) -> Path:
-        """Create a task note in the vault."""
-        now = datetime.now(timezone.utc).isoformat()
-        slug = re.sub(r'[^a-z0-9-]', '-', title.lower())[:50].strip('-')
-        date_prefix = datetime.now(timezone.utc).strftime("%Y-%m")
+        """Create a task note in the vault.
+
+        The creation time is ``now`` if the caller has one, otherwise it is
+        sampled once here so the timestamp and filename always agree.
+        """
+        if now is None:
+            now = datetime.now(timezone.utc)
+        slug = _slugify(title, 50)
+        date_prefix = now.strftime("%Y-%m")
+        created = now.isoformat()
 
         if is_private:
             path = self._vault_path / "private" / "notes" / f"{slug}-{date_prefix}.md"
@@ -145,7 +171,7 @@ mood: ""
 
         content = f"""---
 status: pending
-created: {now}
+created: {created}
 source: {source}
 due: {due_date or ""}
 remind_at: ""
@@ -165,32 +191,22 @@ task_id: {task_id}
 ## Agent Notes
 
 ## History
-- {now[:10]} -- Task created from {source}
+- {created[:10]} -- Task created from {source}
 """
-        path.write_text(content)
+        _write_file(path, content)
         logger.info("Created task note: %s", path)
         return path
 
     def update_task_note_status(self, path: str | Path, status: str) -> None:
         """Update the status in a task note's frontmatter."""
-        path = Path(path)
-        if not path.exists():
-            return
-
-        content = path.read_text()
-        content = re.sub(r'status: \w+', f'status: {status}', content)
-        path.write_text(content)
+        _rewrite_file(Path(path), lambda content: _STATUS_RE.sub(f'status: {status}', content))
 
     # --- People Notes ---
 
     def create_person_note(self, name: str, relationship: str = "", context: str = "") -> Path:
         """Create a person note in the vault."""
-        slug = re.sub(r'[^a-z0-9-]', '-', name.lower())[:30].strip('-')
+        slug = _slugify(name, 30)
         path = self._vault_path / "people" / f"{slug}.md"
-
-        if path.exists():
-            return path
-
         today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
         content = f"""---
 name: "{name}"
@@ -208,44 +224,44 @@ last_seen: "{today}"
 
 ## Things to Remember
 """
-        path.write_text(content)
-        logger.info("Created person note: %s", path)
+        if _create_file(path, content.encode("utf-8")):
+            logger.info("Created person note: %s", path)
         return path
 
     def update_person_conversation(self, name: str, date: str, summary: str) -> None:
         """Append a conversation entry to a person note."""
-        slug = re.sub(r'[^a-z0-9-]', '-', name.lower())[:30].strip('-')
+        slug = _slugify(name, 30)
         path = self._vault_path / "people" / f"{slug}.md"
-
-        if not path.exists():
-            self.create_person_note(name)
-            path = self._vault_path / "people" / f"{slug}.md"
-
-        content = path.read_text()
         entry = f"- [[{date}]]: {summary}\n"
 
-        if "## Conversation Log" in content:
-            content = content.replace(
-                "## Conversation Log\n",
-                f"## Conversation Log\n{entry}",
-            )
-        else:
-            content += f"\n## Conversation Log\n{entry}"
+        def log_conversation(content: str) -> str:
+            if "## Conversation Log" in content:
+                content = content.replace(
+                    "## Conversation Log\n",
+                    f"## Conversation Log\n{entry}",
+                )
+            else:
+                content += f"\n## Conversation Log\n{entry}"
+
+            # Update last_seen
+            return _LAST_SEEN_RE.sub(f'last_seen: "{date}"', content)
 
-        # Update last_seen
-        content = re.sub(r'last_seen: ".*?"', f'last_seen: "{date}"', content)
-        path.write_text(content)
+        if not _rewrite_file(path, log_conversation):
+            self.create_person_note(name)
+            _rewrite_file(path, log_conversation)
 
     # --- Private Notes ---
 
-    def create_private_note(self, title: str, content: str) -> Path:
+    def create_private_note(self, title: str, content: str, now: datetime | None = None) -> Path:
         """Create a note in the private section."""
-        slug = re.sub(r'[^a-z0-9-]', '-', title.lower())[:50].strip('-')
-        date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        if now is None:
+            now = datetime.now(timezone.utc)
+        slug = _slugify(title, 50)
+        date = now.strftime("%Y-%m-%d")
         path = self._vault_path / "private" / "notes" / f"{slug}-{date}.md"
 
         note_content = f"""---
-created: {datetime.now(timezone.utc).isoformat()}
+created: {now.isoformat()}
 classification: private
 ---
 
@@ -253,7 +269,7 @@ classification: private
 
 {content}
 """
-        path.write_text(note_content)
+        _write_file(path, note_content)
         logger.info("Created private note: %s", path.name)
         return path
 
@@ -269,36 +285,54 @@ classification: private
         Returns:
             List of matching notes with path and snippet.
         """
+        return self.search_notes_multi([query], section)[query]
+
+    def search_notes_multi(
+        self, queries: list[str], section: str | None = None
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Search notes for several queries in one walk of the vault.
+
+        Each note is read once and checked against every
+        query, instead of walking and reading the vault once per query.
+
+        Args:
+            queries: Texts to search for (case-insensitive).
+            section: Optional section to limit search (daily, tasks, people, etc.)
+
+        Returns:
+            Matching notes with path and snippet, keyed by query.
+        """
         search_path = self._vault_path / section if section else self._vault_path
         search_path = search_path.resolve()
-        results = []
-        query_lower = query.lower()
-
-        for md_file in search_path.rglob("*.md"):
-            try:
-                rel_path = str(md_file.relative_to(self._vault_path))
-            except ValueError:
-                rel_path = str(md_file)
-
-            # Skip private section in general search (check relative path)
-            if section is None and rel_path.startswith("private"):
-                continue
-
-            try:
-                content = md_file.read_text()
-                if query_lower in content.lower():
-                    # Extract a snippet around the match
-                    idx = content.lower().find(query_lower)
-                    start = max(0, idx - 50)
-                    end = min(len(content), idx + len(query) + 50)
-                    snippet = content[start:end].replace("\n", " ")
-
-                    results.append({
-                        "path": rel_path,
-                        "snippet": snippet,
-                    })
-            except Exception as e:
-                logger.error("Error reading %s: %s", md_file, e)
+        queries = list(dict.fromkeys(queries))
+        patterns = [_compile_query(query) for query in queries]
+        results: dict[str, list[dict[str, Any]]] = {query: [] for query in queries}
+
+        for root, dirnames, filenames in os.walk(search_path):
+            # Skip private section in general search without descending into it
+            if section is None and root == str(search_path) and "private" in dirnames:
+                dirnames.remove("private")
+
+            for filename in filenames:
+                if not filename.endswith(".md"):
+                    continue
+                md_file = Path(root) / filename
+                try:
+                    rel_path = str(md_file.relative_to(self._vault_path))
+                except ValueError:
+                    rel_path = str(md_file)
+
+                try:
+                    snippets = _search_file(md_file, patterns)
+                except Exception as e:
+                    logger.error("Error reading %s: %s", md_file, e)
+                    continue
+                for query, snippet in zip(queries, snippets):
+                    if snippet is not None:
+                        results[query].append({
+                            "path": rel_path,
+                            "snippet": snippet,
+                        })
 
         return results
 
@@ -307,15 +341,133 @@ classification: private
     def update_agent_self_assessment(self, content: str) -> None:
         """Update the agent's self-assessment note."""
         path = self._vault_path / "agent" / "self-assessment.md"
-        path.write_text(content)
+        _write_file(path, content)
 
-    def append_agent_pattern(self, pattern: str) -> None:
+    def append_agent_pattern(self, pattern: str, date: str | None = None) -> None:
         """Append a behavioral pattern to the agent's patterns note."""
         path = self._vault_path / "agent" / "patterns.md"
-        if not path.exists():
-            path.write_text("# Behavioral Patterns\n\n")
+        if date is None:
+            date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        # The log only ever grows, so entries are appended without reading it
+        with open(path, "a", encoding="utf-8") as f:
+            if f.tell() == 0:
+                f.write("# Behavioral Patterns\n\n")
+            f.write(f"- [{date}] {pattern}\n")
+
+
+def _slugify(text: str, max_length: int) -> str:
+    """Filename-safe slug: lowercase, other characters dashed, then truncated.
+
+    Slugs are ASCII only. Each non-ASCII character encodes to a single
+    "?" and so becomes one dash, like any other disallowed character.
+    """
+    slug = text.lower().encode("ascii", "replace").translate(_SLUG_TABLE)
+    return slug[:max_length].decode("ascii").strip("-")
+
+
+def _write_file(path: Path, text: str) -> None:
+    """Replace a file's contents with text, encoded as UTF-8."""
+    _write_bytes(path, text.encode("utf-8"), os.O_TRUNC)
+
+
+def _create_file(path: Path, data: bytes) -> bool:
+    """Write data to a new file. Returns False, leaving it as is, if path exists."""
+    try:
+        _write_bytes(path, data, os.O_EXCL)
+    except FileExistsError:
+        return False
+    return True
+
+
+def _write_bytes(path: Path, data: bytes, flags: int) -> None:
+    """Write data through a raw descriptor opened with flags added.
+
+    Skips the buffered stream that Path.write_text and write_bytes set up
+    for every call.
+    """
+    view = memoryview(data)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | flags, 0o666)
+    try:
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _rewrite_file(path: Path, edit: Callable[[str], str]) -> bool:
+    """Apply edit to a file's text in place, writing only if it changed.
+
+    The file is opened once for both the read and the write. Returns
+    False, creating nothing, if the file does not exist.
+    """
+    try:
+        with open(path, "r+", encoding="utf-8") as f:
+            content = f.read()
+            updated = edit(content)
+            if updated != content:
+                f.seek(0)
+                f.write(updated)
+                f.truncate()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _list_subdirectories(root: Path, parents: set[str]) -> set[str]:
+    """Subdirectories of each parent (relative to root, "" for root itself).
+
+    Returned as root-relative paths; missing parents are skipped.
+    """
+    found: set[str] = set()
+    for parent in parents:
+        try:
+            with os.scandir(root / parent) as entries:
+                found.update(
+                    f"{parent}/{entry.name}" if parent else entry.name
+                    for entry in entries
+                    if entry.is_dir()
+                )
+        except FileNotFoundError:
+            continue
+    return found
+
+
+def _compile_query(query: str) -> re.Pattern[bytes]:
+    """Case-insensitive bytes pattern matching query in UTF-8 text.
+
+    re.IGNORECASE only folds ASCII in bytes patterns, so other cased
+    characters get an explicit lower/upper alternation.
+    """
+    parts = []
+    for char in query:
+        lower, upper = char.lower(), char.upper()
+        if char.isascii() or lower == upper:
+            parts.append(re.escape(char.encode("utf-8")))
+        else:
+            parts.append(
+                b"(?:" + re.escape(lower.encode("utf-8")) + b"|" + re.escape(upper.encode("utf-8")) + b")"
+            )
+    return re.compile(b"".join(parts), re.IGNORECASE)
 
-        content = path.read_text()
-        date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        content += f"- [{date}] {pattern}\n"
-        path.write_text(content)
+
+def _search_file(path: Path, patterns: list[re.Pattern[bytes]]) -> list[str | None]:
+    """Snippet around the first match of each pattern in a file, or None.
+
+    The note is searched as raw bytes, so notes that don't match are never
+    decoded; only the bytes around a match are.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    snippets: list[str | None] = []
+    for pattern in patterns:
+        match = pattern.search(data)
+        if match is None:
+            snippets.append(None)
+            continue
+        # Enough bytes either side to hold SNIPPET_CONTEXT characters; a
+        # character split at the far edge is dropped before slicing
+        before = data[max(0, match.start() - _SNIPPET_BYTES) : match.start()].decode("utf-8", errors="ignore")
+        after = data[match.end() : match.end() + _SNIPPET_BYTES].decode("utf-8", errors="ignore")
+        snippet = before[-SNIPPET_CONTEXT:] + match.group().decode("utf-8") + after[:SNIPPET_CONTEXT]
+        snippets.append(snippet.replace("\n", " "))
+    return snippets